@@ -1,17 +1,31 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
-from typing import Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Optional, Dict, Any
 import os
+import time
+import asyncio
 import tempfile
 import shutil
 import logging
 import uuid
+import json
 from datetime import datetime
 from app.services.multi_api_processor import MultiAPIProcessor
 from app.services.audio_processor import AudioProcessor
 from app.services.summarizer import Summarizer
-from app.models.schemas import ProcessResponse, AudioProcessRequest, UserProfile
+from app.models.schemas import ProcessResponse, AudioProcessRequest, UserProfile, SummaryStreamRequest
 from app.services.user_profile import UserProfileService
+from app.services.model_registry import model_registry
+from app.services.inference_executor import inference_executor
+from app.services.llm_client import llm_client
+from app.services.edit_protocol import correction_metrics
+from app.services.provider_router import provider_router
+from app.services.realtime_scheduler import realtime_scheduler
+from app.services.speech_gate import speech_gate_metrics
+from app.services.transcription_cache import transcription_cache, audio_cache_key, file_cache_key
+from app.services.single_flight import SingleFlight
+from app import config
+from app.config import GROQ_MODEL, OPENROUTER_MODEL, ENSEMBLE_MODELS, SUMMARY_MODE
 
 logger = logging.getLogger(__name__)
 
@@ -22,17 +36,157 @@ multi_processor = MultiAPIProcessor()
 audio_processor = AudioProcessor()
 summarizer = Summarizer()
 user_profile_service = UserProfileService()
+# Identical uploads that arrive together are processed once
+processing_flights = SingleFlight("process-audio")
+
+PROCESSING_MODES = ("2_model", "ultra_fast", "ensemble")
+
+# Every config setting that changes what the pipeline returns for the same audio.
+# Their values are part of the transcription cache keys, so a setting missing
+# here would serve results produced under its old value.
+PIPELINE_CONFIG = (
+    "TRANSCRIPTION_LANGUAGE",
+    "VAD_CHUNKING", "VAD_MAX_CHUNK_SECONDS", "VAD_MIN_SILENCE_SECONDS", "VAD_SPEECH_PAD_SECONDS",
+    "VAD_MIN_SPEECH_SECONDS", "VAD_MAX_MERGE_GAP_SECONDS", "VAD_THRESHOLD_DB",
+    "WHISPER_CHUNK_SECONDS", "WHISPER_CHUNK_OVERLAP_SECONDS",
+    "IMPROVEMENT_MODE",
+    "COMBINER",
+    "LLM_CORRECTION_CHUNK_TOKENS",
+    "CORRECTION_PROTOCOL",
+    "SELECTIVE_CORRECTION", "SELECTIVE_LOGPROB_THRESHOLD", "SELECTIVE_NO_SPEECH_THRESHOLD",
+    "SELECTIVE_COMPRESSION_THRESHOLD", "SELECTIVE_CONTEXT_SEGMENTS",
+    "SUMMARY_MAP_REDUCE_TOKENS", "SUMMARY_SECTION_TOKENS", "SUMMARY_REDUCE_TOKENS",
+)
+
+async def _run_pipeline(audio_data, sample_rate: int, mode: str, summary: bool = True) -> Dict[str, Any]:
+    """
+    Diarize, transcribe and summarize decoded audio; returns the cacheable payload.
+    With `summary` off the summary is left empty for the client to stream separately.
+    """
+    # Perform fast speaker diarization
+    diarization_result = audio_processor.perform_speaker_diarization_fast(audio_data, sample_rate)
+
+    if mode == "2_model":
+        # Get transcription using 2-model parallel approach (~20 seconds)
+        transcription_result = await multi_processor.process_transcription_2_model(audio_data)
+    elif mode == "ensemble":
+        # One Whisper decode fanned out to every ensemble model
+        transcription_result = await multi_processor.process_transcription_ensemble(audio_data)
+    else:
+        transcription_result = await multi_processor.process_transcription_ultra_fast(audio_data)
+
+    # Generate comprehensive summary with key points, action items, and conclusion
+    comprehensive_summary = {}
+    if summary:
+        comprehensive_summary = await summarizer.generate_comprehensive_summary(transcription_result['transcription'])
+
+    return {
+        "transcription": transcription_result['transcription'],
+        "segments": transcription_result.get('segments', []),
+        "summary": comprehensive_summary,
+        "processing_time": transcription_result['processing_time'],
+        "confidence": transcription_result.get('confidence'),
+        "speaker_count": diarization_result.get('speaker_count', 1),
+        "speakers": diarization_result.get('segments', []),
+        "selective_correction": transcription_result.get('selective_correction'),
+        "chunked_correction": transcription_result.get('chunked_correction')
+    }
+
+def _correction_failed(payload: Dict[str, Any]) -> bool:
+    """Whether the LLM correction of any span or chunk failed and kept the raw Whisper text."""
+    return any((payload.get(stage) or {}).get("failed") for stage in ("selective_correction", "chunked_correction"))
+
+def _pipeline_settings(mode: str, summary: bool = True) -> Dict[str, Any]:
+    """Everything besides the audio that changes the result, for cache keys."""
+    return {
+        "mode": mode,
+        "summary": SUMMARY_MODE if summary else False,
+        "whisper": list(multi_processor.whisper_key),
+        "llm": ENSEMBLE_MODELS if mode == "ensemble" else [GROQ_MODEL, OPENROUTER_MODEL],
+        "config": {name: getattr(config, name) for name in PIPELINE_CONFIG}
+    }
+
+async def _process_audio_cached(source_path: str, mode: str, summary: bool = True) -> Dict[str, Any]:
+    """
+    Serve a recording from the transcription cache, or process and cache it.
+    The raw-file hash is checked first so identical re-uploads skip decoding too.
+    Concurrent requests for the same file or the same audio share one run.
+    """
+    start_time = time.time()
+    settings = _pipeline_settings(mode, summary)
+    file_key = await asyncio.to_thread(file_cache_key, source_path, settings)
+    cached = await asyncio.to_thread(transcription_cache.get_by_alias, file_key)
+    if cached is not None:
+        logger.info(f"Transcription cache hit (file) for {source_path}")
+        return {**cached, "processing_time": time.time() - start_time, "cached": True}
+
+    payload, shared = await processing_flights.run(
+        f"file:{file_key}", lambda: _decode_and_process(source_path, mode, settings, file_key, summary)
+    )
+    if shared:
+        return {**payload, "processing_time": time.time() - start_time}
+    return payload
+
+async def _decode_and_process(source_path: str, mode: str, settings: Dict[str, Any], file_key: str,
+                              summary: bool = True) -> Dict[str, Any]:
+    start_time = time.time()
+    audio_data, sample_rate = audio_processor.load_audio(source_path)
+
+    audio_key = await asyncio.to_thread(audio_cache_key, audio_data, settings)
+    cached = await asyncio.to_thread(transcription_cache.get, audio_key)
+    if cached is not None:
+        logger.info(f"Transcription cache hit (audio) for {source_path}")
+        await asyncio.to_thread(transcription_cache.add_alias, audio_key, file_key)
+        return {**cached, "processing_time": time.time() - start_time, "cached": True}
+
+    # A different file with the same audio may already be in flight
+    payload, shared = await processing_flights.run(
+        f"audio:{audio_key}", lambda: _run_pipeline(audio_data, sample_rate, mode, summary)
+    )
+    if shared:
+        await asyncio.to_thread(transcription_cache.add_alias, audio_key, file_key)
+        return payload
+
+    # Fallback summaries and uncorrected text mean the LLMs failed; let the next request try again
+    if payload["transcription"] and not payload["summary"].get("fallback") and not _correction_failed(payload):
+        await asyncio.to_thread(transcription_cache.put, audio_key, payload, [file_key])
+    return payload
+
+def _process_response(payload: Dict[str, Any]) -> ProcessResponse:
+    summary = payload["summary"]
+    return ProcessResponse(
+        transcription=payload['transcription'],
+        full_summary=summary.get('full_summary'),
+        key_points=summary.get('key_points', []),
+        action_items=summary.get('action_items', []),
+        conclusion=summary.get('conclusion'),
+        processing_time=payload['processing_time'],
+        api_used="transcription_cache" if payload.get("cached") else "fast_multi_api",
+        confidence=payload.get('confidence'),
+        speaker_count=payload.get('speaker_count', 1),
+        speakers=payload.get('speakers', []),
+        selective_correction=payload.get('selective_correction')
+    )
 
 @router.post("/process-audio", response_model=ProcessResponse)
 async def process_audio_file(
     background_tasks: BackgroundTasks,
     file_path: Optional[str] = None,
-    file: Optional[UploadFile] = File(None)
+    file: Optional[UploadFile] = File(None),
+    mode: Optional[str] = None,
+    summary: bool = True
 ):
     """
     Process audio file using multi-API approach.
     Can accept either a file path or uploaded file.
+    `mode` picks the pipeline: "2_model" (default for file paths), "ultra_fast"
+    (default for uploads) or "ensemble".
+    `summary=false` returns the transcription without waiting for the summary;
+    the client then streams it from /summary/stream.
     """
+    if mode is not None and mode not in PROCESSING_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown mode '{mode}', expected one of {list(PROCESSING_MODES)}")
+
     try:
         if file_path:
             # Process from file path
@@ -41,29 +195,8 @@ async def process_audio_file(
 
             logger.info(f"Processing audio from path: {file_path}")
 
-            # Extract audio features
-            audio_data, sample_rate = audio_processor.load_audio(file_path)
-
-            # Perform fast speaker diarization
-            diarization_result = audio_processor.perform_speaker_diarization_fast(audio_data, sample_rate)
-
-            # Get transcription using 2-model parallel approach (~20 seconds)
-            transcription_result = await multi_processor.process_transcription_2_model(audio_data)
-
-            # Generate comprehensive summary with key points, action items, and conclusion
-            comprehensive_summary = await summarizer.generate_comprehensive_summary(transcription_result['transcription'])
-
-            return ProcessResponse(
-                transcription=transcription_result['transcription'],
-                full_summary=comprehensive_summary.get('full_summary'),
-                key_points=comprehensive_summary.get('key_points', []),
-                action_items=comprehensive_summary.get('action_items', []),
-                conclusion=comprehensive_summary.get('conclusion'),
-                processing_time=transcription_result['processing_time'],
-                api_used="fast_multi_api",
-                speaker_count=diarization_result.get('speaker_count', 1),
-                speakers=diarization_result.get('segments', [])
-            )
+            payload = await _process_audio_cached(file_path, mode=mode or "2_model", summary=summary)
+            return _process_response(payload)
 
         elif file:
             # Process uploaded file
@@ -86,15 +219,7 @@ async def process_audio_file(
                 logger.info(f"File saved to: {temp_path} (original: {filename})")
 
                 # Process
-                audio_data, sample_rate = audio_processor.load_audio(temp_path)
-
-                # Perform fast speaker diarization
-                diarization_result = audio_processor.perform_speaker_diarization_fast(audio_data, sample_rate)
-
-                transcription_result = await multi_processor.process_transcription_ultra_fast(audio_data)
-                
-                # Generate comprehensive summary
-                comprehensive_summary = await summarizer.generate_comprehensive_summary(transcription_result['transcription'])
+                payload = await _process_audio_cached(temp_path, mode=mode or "ultra_fast", summary=summary)
 
                 # Cleanup immediately after processing (don't wait for background task)
                 try:
@@ -104,17 +229,7 @@ async def process_audio_file(
                 except Exception as cleanup_error:
                     logger.warning(f"Failed to cleanup temp file: {cleanup_error}")
 
-                return ProcessResponse(
-                    transcription=transcription_result['transcription'],
-                    full_summary=comprehensive_summary.get('full_summary'),
-                    key_points=comprehensive_summary.get('key_points', []),
-                    action_items=comprehensive_summary.get('action_items', []),
-                    conclusion=comprehensive_summary.get('conclusion'),
-                    processing_time=transcription_result['processing_time'],
-                    api_used="fast_multi_api",
-                    speaker_count=diarization_result.get('speaker_count', 1),
-                    speakers=diarization_result.get('segments', [])
-                )
+                return _process_response(payload)
             
             except Exception as file_error:
                 # Cleanup on error
@@ -133,6 +248,24 @@ async def process_audio_file(
         logger.error(f"Error processing audio: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
 
+@router.post("/summary/stream")
+async def stream_summary(request: SummaryStreamRequest):
+    """
+    Stream the comprehensive summary of a transcription as server-sent events.
+    Sends a `draft` event with an instant extractive summary, `field_delta` events
+    while the summary text is written, an `item` event per finished key point or
+    action item, and a final `done` event with the complete summary.
+    """
+    async def events():
+        async for event in summarizer.stream_comprehensive_summary(request.text):
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/process-realtime-chunk")
 async def process_realtime_chunk(request: AudioProcessRequest):
     """
@@ -181,6 +314,13 @@ async def get_user_profile():
         logger.error(f"Error getting profile: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Profile retrieval failed: {str(e)}")
 
+@router.get("/router-status")
+async def get_router_status():
+    """
+    Get LLM provider health (latency, errors, circuit breakers) and the routing order per task.
+    """
+    return provider_router.status()
+
 @router.get("/system-info")
 async def get_system_info():
     """
@@ -189,5 +329,13 @@ async def get_system_info():
     return {
         "gpu_available": audio_processor.check_gpu(),
         "apis_status": await multi_processor.check_apis(),
+        "whisper_models": model_registry.stats(),
+        "inference": inference_executor.stats(),
+        "llm": llm_client.stats(),
+        "realtime_batching": realtime_scheduler.stats(),
+        "speech_gate": speech_gate_metrics.stats(),
+        "transcription_cache": transcription_cache.stats(),
+        "coalesced_requests": processing_flights.stats(),
+        "corrections": correction_metrics.stats(),
         "version": "2.0.0"
     }
\ No newline at end of file
@@ -6,7 +6,9 @@ import numpy as np
 from app.services.multi_api_processor import MultiAPIProcessor
 from app.services.audio_processor import AudioProcessor
 from app.services.user_profile import UserProfileService
-from app.config import TRANSCRIPTION_LANGUAGE
+from app.services.summarizer import Summarizer
+from app.services.rolling_summary import RollingSummary
+from app.config import TRANSCRIPTION_LANGUAGE, REALTIME_STREAMING, ROLLING_SUMMARY
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +18,59 @@ router = APIRouter()
 multi_processor = MultiAPIProcessor()
 audio_processor = AudioProcessor()
 user_profile_service = UserProfileService()
+summarizer = Summarizer()
+
+def _track_summary(websocket: WebSocket, rolling_summary, text: str):
+    """Add committed text to the session's rolling summary and update it in the background when due."""
+    if rolling_summary is None or not text or not text.strip():
+        return
+    rolling_summary.add(text)
+    rolling_summary.schedule(summarizer.fold_rolling_summary, websocket.send_json)
+
+async def _send_final_summary(websocket: WebSocket, rolling_summary, data: dict):
+    """Fold the rest of the session into its rolling summary and send the comprehensive summary."""
+    if await rolling_summary.finish(summarizer.fold_rolling_summary):
+        await websocket.send_json(rolling_summary.update_message())
+    summary = await summarizer.finalize_rolling_summary(rolling_summary.state, rolling_summary.text)
+    await websocket.send_json({
+        "type": "final_summary",
+        "full_summary": summary.get("full_summary"),
+        "key_points": summary.get("key_points", []),
+        "action_items": summary.get("action_items", []),
+        "conclusion": summary.get("conclusion"),
+        "timestamp": data.get("timestamp")
+    })
+    logger.info(f"Rolling summary stats: {rolling_summary.stats()}")
+
+async def _send_streaming_update(websocket: WebSocket, update: dict, data: dict, language: str,
+                                 rolling_summary=None):
+    """Send the committed text as a final message (with alerts) and the rest as a partial."""
+    if update["final"]:
+        _track_summary(websocket, rolling_summary, update["final"])
+        await websocket.send_json({
+            "type": "final",
+            "text": update["final"],
+            "start": update["final_start"],
+            "end": update["final_end"],
+            "speaker_id": 0,
+            "timestamp": data.get("timestamp"),
+            "language": language
+        })
+        for alert in user_profile_service.check_for_alerts(update["final"]):
+            await websocket.send_json({
+                "type": "speaker_alert",
+                "alert_type": alert.alert_type,
+                "message": f"Alert triggered: {alert.triggered_text}",
+                "confidence": alert.confidence,
+                "timestamp": alert.timestamp.isoformat()
+            })
+    if update["decoded"]:
+        await websocket.send_json({
+            "type": "partial",
+            "text": update["partial"],
+            "timestamp": data.get("timestamp"),
+            "language": language
+        })
 
 @router.websocket("/ws/audio")
 async def websocket_audio(websocket: WebSocket):
@@ -24,6 +79,12 @@ async def websocket_audio(websocket: WebSocket):
     """
     await websocket.accept()
     logger.info("WebSocket connection established")
+    # Rolling-buffer transcription state, created when the client streams
+    streaming_session = None
+    # Noise floor for this connection's no-speech gate
+    speech_gate = multi_processor.create_speech_gate()
+    # Running summary of the committed transcript, pushed as summary_update messages
+    rolling_summary = RollingSummary() if ROLLING_SUMMARY else None
 
     try:
         while True:
@@ -44,14 +105,25 @@ async def websocket_audio(websocket: WebSocket):
                 else:
                     audio_data = audio_data_list
 
+                if data.get("streaming", REALTIME_STREAMING):
+                    if streaming_session is None:
+                        streaming_session = multi_processor.create_streaming_session(language)
+                    audio_array = audio_processor.process_audio_chunk(audio_data, sample_rate)
+                    update = await streaming_session.add_audio(audio_array)
+                    await _send_streaming_update(websocket, update, data, language, rolling_summary)
+                    continue
+
                 # Process chunk with optimized single model for real-time speed
-                result = await multi_processor.process_realtime_chunk(audio_data, sample_rate, language=language)
+                result = await multi_processor.process_realtime_chunk(audio_data, sample_rate, language=language,
+                                                                     speech_gate=speech_gate)
                 
                 # Log processing strategy for debugging
                 logger.debug(f"Processed audio chunk using strategy: {strategy}")
 
                 # Only send back transcription if there's actual text
                 if result['transcription'] and result['transcription'].strip():
+                    _track_summary(websocket, rolling_summary, result['transcription'])
+
                     # Check for speaker alerts
                     alerts = user_profile_service.check_for_alerts(result['transcription'])
 
@@ -93,12 +165,14 @@ async def websocket_audio(websocket: WebSocket):
                             audio_data = raw_data
                         
                         # Process raw audio data
-                        result = await multi_processor.process_realtime_chunk(audio_data, 16000, language=language)
+                        result = await multi_processor.process_realtime_chunk(audio_data, 16000, language=language,
+                                                                             speech_gate=speech_gate)
                         
                         logger.debug(f"Processed raw audio chunk: {size} bytes using {strategy} strategy")
 
                         # Send back transcription if available
                         if result['transcription'] and result['transcription'].strip():
+                            _track_summary(websocket, rolling_summary, result['transcription'])
                             await websocket.send_json({
                                 "type": "transcription",
                                 "text": result['transcription'],
@@ -142,10 +216,12 @@ async def websocket_audio(websocket: WebSocket):
                         audio_data = base64.b64decode(base64_data)
                         
                         # Process with audio processor to convert to PCM
-                        result = await multi_processor.process_realtime_chunk(audio_data, sample_rate, language=language)
+                        result = await multi_processor.process_realtime_chunk(audio_data, sample_rate, language=language,
+                                                                     speech_gate=speech_gate)
 
                         # Send back transcription if available
                         if result['transcription'] and result['transcription'].strip():
+                            _track_summary(websocket, rolling_summary, result['transcription'])
                             await websocket.send_json({
                                 "type": "transcription",
                                 "text": result['transcription'],
@@ -161,6 +237,19 @@ async def websocket_audio(websocket: WebSocket):
                             "message": "Failed to process audio data"
                         })
 
+            elif data.get("type") == "end_session":
+                # Commit whatever the streaming buffer still holds
+                if streaming_session is not None:
+                    language = streaming_session.language or TRANSCRIPTION_LANGUAGE
+                    update = await streaming_session.finish()
+                    await _send_streaming_update(websocket, update, data, language, rolling_summary)
+                    logger.info(f"Streaming session stats: {streaming_session.stats()}")
+                    streaming_session = None
+                if rolling_summary is not None and rolling_summary.transcript:
+                    await _send_final_summary(websocket, rolling_summary, data)
+                    rolling_summary = RollingSummary()
+                await websocket.send_json({"type": "session_ended", "timestamp": data.get("timestamp")})
+
             elif data.get("type") == "ping":
                 await websocket.send_json({"type": "pong"})
 
@@ -179,6 +268,8 @@ async def websocket_audio(websocket: WebSocket):
             # Connection might already be closed
             logger.error("Failed to send error message - connection already closed")
     finally:
+        if rolling_summary is not None:
+            rolling_summary.cancel()
         logger.info("Audio WebSocket session ended")
 
 @router.websocket("/ws/progress")
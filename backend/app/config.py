@@ -40,4 +40,144 @@ OPENROUTER_MODEL_3 = os.getenv("OPENROUTER_MODEL_3", "google/gemini-flash-1.5")
 HOST = os.getenv("HOST", "localhost")
 PORT = int(os.getenv("PORT", "8000"))
 # Default transcription language used by real-time processing (e.g. 'en')
-TRANSCRIPTION_LANGUAGE = os.getenv("TRANSCRIPTION_LANGUAGE", "en")
\ No newline at end of file
+TRANSCRIPTION_LANGUAGE = os.getenv("TRANSCRIPTION_LANGUAGE", "en")
+# Whisper model shared by all services (see app/services/model_registry.py)
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "large-v3")
+# 'auto' picks cuda when available, otherwise cpu
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "auto")
+# 'fp16', 'fp32' or 'auto' (fp16 on cuda, fp32 on cpu)
+WHISPER_PRECISION = os.getenv("WHISPER_PRECISION", "auto")
+# Whisper inference executor (see app/services/inference_executor.py)
+WHISPER_INFERENCE_WORKERS = int(os.getenv("WHISPER_INFERENCE_WORKERS", "2"))
+# torch intra-op threads per decode; 0 uses the number of physical cores
+WHISPER_TORCH_THREADS = int(os.getenv("WHISPER_TORCH_THREADS", "0"))
+# Seconds before a caller stops waiting on a decode; 0 disables the timeout
+WHISPER_JOB_TIMEOUT = float(os.getenv("WHISPER_JOB_TIMEOUT", "0"))
+# Shared LLM HTTP pool (see app/services/llm_client.py)
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_CONNECTIONS_PER_HOST = int(os.getenv("LLM_MAX_CONNECTIONS_PER_HOST", "20"))
+LLM_KEEPALIVE_TIMEOUT = float(os.getenv("LLM_KEEPALIVE_TIMEOUT", "60"))
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))
+# Chunks decoded per batched Whisper pass in ultra-fast mode; 1 decodes chunks one by one
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "8"))
+# Multi-process transcription for long uploads (see app/services/process_transcriber.py)
+# 0 workers disables the process pool
+WHISPER_PROCESS_WORKERS = int(os.getenv("WHISPER_PROCESS_WORKERS", "0"))
+# torch threads pinned per worker; 0 splits the physical cores evenly
+WHISPER_PROCESS_THREADS = int(os.getenv("WHISPER_PROCESS_THREADS", "0"))
+# Uploads shorter than this stay on the in-process path
+WHISPER_PROCESS_MIN_SECONDS = float(os.getenv("WHISPER_PROCESS_MIN_SECONDS", "600"))
+# VAD chunk planning for file transcription (see app/services/chunk_planner.py)
+VAD_CHUNKING = os.getenv("VAD_CHUNKING", "1").strip().lower() in ("1", "true", "yes", "on")
+VAD_MAX_CHUNK_SECONDS = float(os.getenv("VAD_MAX_CHUNK_SECONDS", "20"))
+VAD_MIN_SILENCE_SECONDS = float(os.getenv("VAD_MIN_SILENCE_SECONDS", "0.5"))
+VAD_SPEECH_PAD_SECONDS = float(os.getenv("VAD_SPEECH_PAD_SECONDS", "0.2"))
+VAD_MIN_SPEECH_SECONDS = float(os.getenv("VAD_MIN_SPEECH_SECONDS", "0.25"))
+VAD_MAX_MERGE_GAP_SECONDS = float(os.getenv("VAD_MAX_MERGE_GAP_SECONDS", "2.0"))
+# Frames this many dB above the estimated noise floor count as speech
+VAD_THRESHOLD_DB = float(os.getenv("VAD_THRESHOLD_DB", "8"))
+# Fixed chunk windows used when VAD chunking is off; neighbouring windows overlap
+# so the stitcher can deduplicate words at the seams
+WHISPER_CHUNK_SECONDS = float(os.getenv("WHISPER_CHUNK_SECONDS", "20"))
+WHISPER_CHUNK_OVERLAP_SECONDS = float(os.getenv("WHISPER_CHUNK_OVERLAP_SECONDS", "2"))
+# Streaming real-time transcription (see app/services/streaming_transcriber.py)
+# Sends partial/final messages on /ws/audio; clients can also opt in per message
+REALTIME_STREAMING = os.getenv("REALTIME_STREAMING", "0").strip().lower() in ("1", "true", "yes", "on")
+# New audio needed before the rolling buffer is decoded again
+STREAMING_MIN_DECODE_SECONDS = float(os.getenv("STREAMING_MIN_DECODE_SECONDS", "1.0"))
+# Uncommitted audio kept before the hypothesis is force-committed (capped below Whisper's 30 s window)
+STREAMING_MAX_BUFFER_SECONDS = float(os.getenv("STREAMING_MAX_BUFFER_SECONDS", "15"))
+# Characters of committed text passed as the decoding prompt
+STREAMING_PROMPT_CHARS = int(os.getenv("STREAMING_PROMPT_CHARS", "200"))
+# Cross-session micro-batching of real-time chunks (see app/services/realtime_scheduler.py)
+# A max batch size of 1 decodes every chunk on its own
+REALTIME_BATCH_MAX_SIZE = int(os.getenv("REALTIME_BATCH_MAX_SIZE", "8"))
+# Longest a chunk waits for other sessions' chunks before its batch is decoded
+REALTIME_BATCH_MAX_WAIT_MS = float(os.getenv("REALTIME_BATCH_MAX_WAIT_MS", "50"))
+# No-speech gate in front of real-time decodes (see app/services/speech_gate.py)
+SPEECH_GATE = os.getenv("SPEECH_GATE", "1").strip().lower() in ("1", "true", "yes", "on")
+# Frames this many dB above the session's noise floor can count as speech
+SPEECH_GATE_THRESHOLD_DB = float(os.getenv("SPEECH_GATE_THRESHOLD_DB", "9"))
+# Speech needed in a chunk before it is decoded
+SPEECH_GATE_MIN_SPEECH_SECONDS = float(os.getenv("SPEECH_GATE_MIN_SPEECH_SECONDS", "0.15"))
+# The noise floor never drops below this level (dBFS), so digital silence stays gated
+SPEECH_GATE_ABSOLUTE_FLOOR_DB = float(os.getenv("SPEECH_GATE_ABSOLUTE_FLOOR_DB", "-60"))
+# Content-addressed cache of processed uploads (see app/services/transcription_cache.py)
+TRANSCRIPTION_CACHE = os.getenv("TRANSCRIPTION_CACHE", "1").strip().lower() in ("1", "true", "yes", "on")
+TRANSCRIPTION_CACHE_DIR = os.getenv("TRANSCRIPTION_CACHE_DIR", os.path.join(".cache", "transcriptions"))
+TRANSCRIPTION_CACHE_MAX_MB = float(os.getenv("TRANSCRIPTION_CACHE_MAX_MB", "512"))
+# How the 2-model path picks an LLM improvement:
+# "race" returns the first acceptable result and cancels the other call,
+# "hedge" only calls the backup once the primary is slower than its usual latency,
+# "all" waits for both and prefers Groq
+IMPROVEMENT_MODE = os.getenv("IMPROVEMENT_MODE", "race").strip().lower()
+# Primary latency percentile after which the backup provider is called (hedge mode)
+IMPROVEMENT_HEDGE_PERCENTILE = float(os.getenv("IMPROVEMENT_HEDGE_PERCENTILE", "95"))
+# Hedge delay used until enough primary latencies have been seen
+IMPROVEMENT_HEDGE_DEFAULT_DELAY = float(os.getenv("IMPROVEMENT_HEDGE_DEFAULT_DELAY", "3.0"))
+# Members of the decode-once ensemble mode, by key (see ENSEMBLE_MEMBERS in multi_api_processor.py)
+ENSEMBLE_MODELS = [m.strip() for m in os.getenv(
+    "ENSEMBLE_MODELS",
+    "groq_llama33_70b,groq_llama31_70b,openrouter_gpt4o_mini,openrouter_claude_haiku,openrouter_gemini_flash"
+).split(",") if m.strip()]
+# How candidate transcriptions are merged: "rover" (local word alignment and voting)
+# or "llm" (an extra merge call on the fastest healthy provider)
+COMBINER = os.getenv("COMBINER", "rover").strip().lower()
+# Long transcripts are corrected as sentence-aligned chunks of about this many tokens
+LLM_CORRECTION_CHUNK_TOKENS = int(os.getenv("LLM_CORRECTION_CHUNK_TOKENS", "600"))
+# Chunk corrections in flight at once
+LLM_CORRECTION_CONCURRENCY = int(os.getenv("LLM_CORRECTION_CONCURRENCY", "4"))
+# How LLM corrections come back: "edits" (a compact list of word edits applied locally,
+# falling back to full text when the list is unusable) or "full" (the whole corrected text)
+CORRECTION_PROTOCOL = os.getenv("CORRECTION_PROTOCOL", "edits").strip().lower()
+# Only low-confidence Whisper segments are sent for LLM correction (see app/services/selective_correction.py)
+SELECTIVE_CORRECTION = os.getenv("SELECTIVE_CORRECTION", "1").strip().lower() in ("1", "true", "yes", "on")
+# A segment is corrected when its average token log-probability is below this...
+SELECTIVE_LOGPROB_THRESHOLD = float(os.getenv("SELECTIVE_LOGPROB_THRESHOLD", "-0.6"))
+# ...its no-speech probability is above this, or its compression ratio is above this
+SELECTIVE_NO_SPEECH_THRESHOLD = float(os.getenv("SELECTIVE_NO_SPEECH_THRESHOLD", "0.6"))
+SELECTIVE_COMPRESSION_THRESHOLD = float(os.getenv("SELECTIVE_COMPRESSION_THRESHOLD", "2.4"))
+# Neighbouring segments on each side passed along as read-only context
+SELECTIVE_CONTEXT_SEGMENTS = int(os.getenv("SELECTIVE_CONTEXT_SEGMENTS", "1"))
+# Cache of LLM replies to identical low-temperature requests (see app/services/llm_cache.py)
+LLM_CACHE = os.getenv("LLM_CACHE", "1").strip().lower() in ("1", "true", "yes", "on")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+# SQLite file for a cache tier that survives restarts; empty keeps the cache in memory only
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", os.path.join(".cache", "llm_responses.sqlite3"))
+# Requests sampled above this temperature (or without one) are never cached
+LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.3"))
+# Routing of LLM tasks to the fastest healthy provider (see app/services/provider_router.py)
+ROUTER_EWMA_ALPHA = float(os.getenv("ROUTER_EWMA_ALPHA", "0.3"))
+# Consecutive failures that open a backend's circuit; a 429 opens it at once
+ROUTER_FAILURE_THRESHOLD = int(os.getenv("ROUTER_FAILURE_THRESHOLD", "3"))
+ROUTER_COOLDOWN_SECONDS = float(os.getenv("ROUTER_COOLDOWN_SECONDS", "30"))
+# Candidate backends per task as "provider:model,provider:model"; empty uses the built-in list
+ROUTER_CORRECT_BACKENDS = os.getenv("ROUTER_CORRECT_BACKENDS", "")
+ROUTER_SUMMARIZE_BACKENDS = os.getenv("ROUTER_SUMMARIZE_BACKENDS", "")
+ROUTER_COMBINE_BACKENDS = os.getenv("ROUTER_COMBINE_BACKENDS", "")
+# "llm" summarizes with the LLM providers (falling back to extractive summaries);
+# "extractive" never calls an API (see app/services/extractive_summary.py)
+SUMMARY_MODE = os.getenv("SUMMARY_MODE", "llm").strip().lower()
+# Transcripts estimated above this many tokens are summarized map-reduce (see app/services/map_reduce_summary.py)
+SUMMARY_MAP_REDUCE_TOKENS = int(os.getenv("SUMMARY_MAP_REDUCE_TOKENS", "6000"))
+# Size of the sections summarized separately, and of the partial summaries one reduce call takes
+SUMMARY_SECTION_TOKENS = int(os.getenv("SUMMARY_SECTION_TOKENS", "2000"))
+SUMMARY_REDUCE_TOKENS = int(os.getenv("SUMMARY_REDUCE_TOKENS", "4000"))
+# Section summaries in flight at once
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "4"))
+# Live sessions keep a rolling summary (see app/services/rolling_summary.py), updated with
+# new committed text every interval, or sooner once the max is pending, but never for less than the min
+ROLLING_SUMMARY = os.getenv("ROLLING_SUMMARY", "1").strip().lower() in ("1", "true", "yes", "on")
+ROLLING_SUMMARY_INTERVAL_SECONDS = float(os.getenv("ROLLING_SUMMARY_INTERVAL_SECONDS", "60"))
+ROLLING_SUMMARY_MIN_TOKENS = int(os.getenv("ROLLING_SUMMARY_MIN_TOKENS", "150"))
+ROLLING_SUMMARY_MAX_TOKENS = int(os.getenv("ROLLING_SUMMARY_MAX_TOKENS", "1500"))
+# Client-side rate limits per provider (requests and tokens per minute; 0 = unlimited).
+# Calls over the limit wait in a queue instead of being rejected with 429
+GROQ_REQUESTS_PER_MINUTE = float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+GROQ_TOKENS_PER_MINUTE = float(os.getenv("GROQ_TOKENS_PER_MINUTE", "0"))
+OPENROUTER_REQUESTS_PER_MINUTE = float(os.getenv("OPENROUTER_REQUESTS_PER_MINUTE", "60"))
+OPENROUTER_TOKENS_PER_MINUTE = float(os.getenv("OPENROUTER_TOKENS_PER_MINUTE", "0"))
+# Retries of a call answered with 429, after the provider's Retry-After (or an exponential backoff)
+LLM_RATE_LIMIT_RETRIES = int(os.getenv("LLM_RATE_LIMIT_RETRIES", "2"))
+LLM_RATE_LIMIT_BACKOFF_SECONDS = float(os.getenv("LLM_RATE_LIMIT_BACKOFF_SECONDS", "1.0"))
@@ -20,7 +20,13 @@ except ImportError:
 import time
 import logging
 from contextlib import asynccontextmanager
+from app.api import routes as api_routes
+from app.api import websocket as websocket_routes
 from app.api.routes import router as api_router
+from app.services.inference_executor import inference_executor
+from app.services.llm_client import llm_client
+from app.services.process_transcriber import process_transcriber
+from app.services.realtime_scheduler import realtime_scheduler
 from app.api.websocket import router as websocket_router
 
 # Set up logging
@@ -55,6 +61,13 @@ async def lifespan(app: FastAPI):
         try:
             # Clean up any resources
             await asyncio.sleep(0.1)  # Give time for connections to close
+            # Hand shared Whisper model references back to the registry and free the model
+            api_routes.multi_processor.release_models(unload=True)
+            websocket_routes.multi_processor.release_models(unload=True)
+            realtime_scheduler.shutdown()
+            inference_executor.shutdown()
+            process_transcriber.shutdown()
+            await llm_client.close()
             logger.info("✅ Graceful shutdown completed")
         except Exception as e:
             logger.error(f"❌ Error during shutdown: {e}")
@@ -21,6 +21,11 @@ class ProcessResponse(BaseModel):
     confidence: Optional[float] = None
     speaker_count: Optional[int] = None
     speakers: Optional[List[Dict]] = None
+    # Low-confidence spans sent to the LLM, how many of them failed, and the share of text skipped
+    selective_correction: Optional[Dict[str, Any]] = None
+
+class SummaryStreamRequest(BaseModel):
+    text: str
 
 class MultiAPIResult(BaseModel):
     groq_result: Dict[str, Any]
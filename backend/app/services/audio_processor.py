@@ -131,16 +131,35 @@ class AudioProcessor:
             "max_concurrent_processes": min(cpu_count or 4, 4)
         }
 
-    def detect_voice_activity(self, audio: np.ndarray, sample_rate: int, frame_length: int = 1024, hop_length: int = 512) -> np.ndarray:
+    def frame_energy(self, audio: np.ndarray, frame_length: int = 1024, hop_length: int = 512) -> np.ndarray:
+        """
+        Energy of each full frame, computed on a strided view of the signal.
+        Frames start at 0, hop_length, ... while a whole frame still fits before the end.
+        """
+        if len(audio) <= frame_length:
+            return np.array([], dtype=np.float32)
+        n_frames = (len(audio) - frame_length - 1) // hop_length + 1
+        frames = np.lib.stride_tricks.sliding_window_view(audio, frame_length)[::hop_length][:n_frames]
+        return np.einsum("ij,ij->i", frames, frames)
+
+    def detect_voice_activity(self, audio: np.ndarray, sample_rate: int, frame_length: int = 1024, hop_length: int = 512,
+                              threshold_db: Optional[float] = None) -> np.ndarray:
         """
         Detect voice activity using energy-based method.
+        By default frames above the median normalized energy count as voice; with
+        threshold_db, frames louder than the estimated noise floor by that many dB do.
         Returns: Boolean array indicating voice activity for each frame.
         """
         # Calculate energy for each frame
-        energy = np.array([
-            np.sum(audio[i:i+frame_length]**2)
-            for i in range(0, len(audio) - frame_length, hop_length)
-        ])
+        energy = self.frame_energy(audio, frame_length, hop_length)
+
+        if threshold_db is not None:
+            if len(energy) == 0:
+                return np.zeros(0, dtype=bool)
+            # Mean power in dB; the quietest frames approximate the noise floor
+            energy_db = 10.0 * np.log10(energy / frame_length + 1e-10)
+            noise_floor = np.percentile(energy_db, 10)
+            return energy_db > noise_floor + threshold_db
 
         # Normalize energy
         energy = (energy - np.min(energy)) / (np.max(energy) - np.min(energy) + 1e-10)
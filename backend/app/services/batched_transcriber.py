@@ -0,0 +1,236 @@
+import time
+import zlib
+import logging
+from typing import Dict, Any, List, Optional
+import numpy as np
+import torch
+import whisper
+from whisper.audio import SAMPLE_RATE, N_SAMPLES, log_mel_spectrogram, pad_or_trim
+from whisper.tokenizer import get_tokenizer
+from app.config import WHISPER_BATCH_SIZE
+from app.services.transcript_stitcher import segments_from_whisper
+
+logger = logging.getLogger(__name__)
+
+class BatchedTranscriber:
+    """
+    Batched Whisper decoding for short (<= 30 s) audio chunks.
+
+    Whisper's encoder always sees a padded 30 s mel window, so chunks are
+    padded, stacked and pushed through one encoder pass and one batched greedy
+    decode instead of N sequential `transcribe` calls. Chunks whose batched
+    decode looks degenerate are re-decoded on their own with Whisper's usual
+    temperature fallback.
+
+    Timestamp tokens are kept so every chunk also comes back with
+    Whisper-style segments (times relative to the chunk start). Each segment
+    gets its own avg_logprob (from one teacher-forced decoder pass over the
+    decoded tokens) and compression_ratio; no_speech_prob only exists per
+    chunk, as in `whisper.transcribe`. If the scoring pass fails the segments
+    carry no avg_logprob, so selective correction corrects them instead of
+    skipping them on chunk-wide numbers.
+    """
+
+    # Whisper timestamp tokens are 20 ms apart
+    timestamp_resolution = 0.02
+
+    # Same thresholds `whisper.transcribe` uses to reject a decode
+    compression_ratio_threshold = 2.4
+    logprob_threshold = -1.0
+    no_speech_threshold = 0.6
+
+    def __init__(self, batch_size: int = WHISPER_BATCH_SIZE):
+        self.batch_size = max(1, batch_size)
+
+    def transcribe_chunks(self, model: Any, chunks: List[np.ndarray], language: Optional[str] = None,
+                          fp16: bool = False) -> List[Dict[str, Any]]:
+        """
+        Decode chunks in batches. Blocking - run it on the inference executor.
+        Returns one dict per chunk, in input order, with text, decode metrics and timing.
+        With no language the language is detected per chunk.
+        """
+        options = whisper.DecodingOptions(
+            language=language,
+            fp16=fp16,
+            temperature=0.0,
+            without_timestamps=False
+        )
+        tokenizer = get_tokenizer(
+            model.is_multilingual,
+            num_languages=model.num_languages,
+            language=language,
+            task="transcribe"
+        )
+        results: List[Dict[str, Any]] = []
+
+        for batch_start in range(0, len(chunks), self.batch_size):
+            batch = chunks[batch_start:batch_start + self.batch_size]
+            start_time = time.perf_counter()
+
+            try:
+                with torch.no_grad():
+                    mel = torch.stack([
+                        log_mel_spectrogram(
+                            pad_or_trim(chunk.astype(np.float32, copy=False), N_SAMPLES),
+                            model.dims.n_mels,
+                            device=model.device
+                        )
+                        for chunk in batch
+                    ])
+                    # Encode once: decode accepts encoder output, and the scoring pass reuses it
+                    audio_features = model.embed_audio(mel.half() if fp16 else mel)
+                    decoded = whisper.decode(model, audio_features, options)
+            except Exception as e:
+                # One bad chunk must not fail the whole upload: decode this batch chunk by chunk
+                logger.warning(f"Batch {batch_start // self.batch_size} of {len(batch)} chunks failed, "
+                               f"decoding them one by one: {str(e)}")
+                results.extend(self._decode_separately(model, batch, batch_start, language, fp16, e))
+                continue
+
+            token_logprobs = self._token_logprobs(model, audio_features, decoded, language)
+            batch_time = time.perf_counter() - start_time
+            for offset, (chunk, result) in enumerate(zip(batch, decoded)):
+                duration = len(chunk) / SAMPLE_RATE
+                metrics = {
+                    "avg_logprob": result.avg_logprob,
+                    "no_speech_prob": result.no_speech_prob,
+                    "compression_ratio": result.compression_ratio
+                }
+                results.append({
+                    "text": result.text.strip(),
+                    "chunk_id": batch_start + offset,
+                    "duration": duration,
+                    "segments": self._segments_from_tokens(
+                        tokenizer, result.tokens, duration, result.no_speech_prob,
+                        token_logprobs[offset] if token_logprobs else None
+                    ),
+                    **metrics,
+                    "batch_index": batch_start // self.batch_size,
+                    "batch_time": round(batch_time, 4),
+                    "decode_time": round(batch_time / len(batch), 4)
+                })
+
+        for result in results:
+            if "success" in result:
+                continue
+            if self._is_silence(result):
+                result["text"] = ""
+                result["segments"] = []
+            elif self._needs_fallback(result):
+                self._redecode(model, chunks[result["chunk_id"]], result, language, fp16)
+
+        return results
+
+    def _decode_separately(self, model: Any, batch: List[np.ndarray], batch_start: int, language: Optional[str],
+                           fp16: bool, error: Exception) -> List[Dict[str, Any]]:
+        """
+        Results for a batch whose batched decode raised, each chunk decoded on its own.
+        A chunk that fails again comes back empty with success False and the error.
+        """
+        results = []
+        for offset, chunk in enumerate(batch):
+            result = {
+                "text": "",
+                "chunk_id": batch_start + offset,
+                "duration": len(chunk) / SAMPLE_RATE,
+                "segments": [],
+                "batch_index": batch_start // self.batch_size,
+                "decode_time": 0.0
+            }
+            if self._redecode(model, chunk, result, language, fp16):
+                result["success"] = True
+            else:
+                result.update({"success": False, "error": str(error)})
+            results.append(result)
+        return results
+
+    def _token_logprobs(self, model: Any, audio_features: Any, decoded: List[Any],
+                        language: Optional[str]) -> Optional[List[List[float]]]:
+        """
+        Log-probability of every decoded token, one teacher-forced decoder pass per chunk.
+        None when scoring fails; the decode itself is still used.
+        """
+        try:
+            scores = []
+            with torch.no_grad():
+                for row, result in enumerate(decoded):
+                    prompt = list(get_tokenizer(
+                        model.is_multilingual,
+                        num_languages=model.num_languages,
+                        language=getattr(result, "language", None) or language,
+                        task="transcribe"
+                    ).sot_sequence)
+                    tokens = torch.tensor([prompt + list(result.tokens)], device=audio_features.device)
+                    # Position i predicts token i + 1, so the scores start at the last prompt token
+                    logits = model.logits(tokens, audio_features[row:row + 1])[0, len(prompt) - 1:-1]
+                    logprobs = torch.log_softmax(logits.float(), dim=-1)
+                    targets = tokens[0, len(prompt):]
+                    scores.append(logprobs.gather(-1, targets.unsqueeze(-1)).squeeze(-1).tolist())
+            return scores
+        except Exception as e:
+            logger.warning(f"Per-token scoring failed, batched segments get no avg_logprob: {str(e)}")
+            return None
+
+    def _segments_from_tokens(self, tokenizer: Any, tokens: List[int], duration: float,
+                              no_speech_prob: Optional[float] = None,
+                              token_logprobs: Optional[List[float]] = None) -> List[Dict[str, Any]]:
+        """
+        Split a decoded token sequence into segments at its timestamp tokens.
+        Segments get avg_logprob over their own text tokens when token_logprobs is given.
+        """
+        timestamp_begin = tokenizer.timestamp_begin
+        segments: List[Dict[str, Any]] = []
+        segment_start = 0.0
+        text_tokens: List[int] = []
+        text_logprobs: List[float] = []
+
+        def close(end: float):
+            text = tokenizer.decode(text_tokens).strip()
+            if text:
+                encoded = text.encode("utf-8")
+                segments.append({
+                    "start": round(min(segment_start, duration), 3),
+                    "end": round(min(max(end, segment_start), duration), 3),
+                    "text": text,
+                    "avg_logprob": sum(text_logprobs) / len(text_logprobs) if text_logprobs else None,
+                    "no_speech_prob": no_speech_prob,
+                    "compression_ratio": len(encoded) / len(zlib.compress(encoded))
+                })
+
+        for index, token in enumerate(tokens):
+            if token >= timestamp_begin:
+                time_value = (token - timestamp_begin) * self.timestamp_resolution
+                if text_tokens:
+                    close(time_value)
+                    text_tokens = []
+                    text_logprobs = []
+                segment_start = time_value
+            else:
+                text_tokens.append(token)
+                if token_logprobs is not None:
+                    text_logprobs.append(token_logprobs[index])
+        if text_tokens:
+            close(duration)
+        return segments
+
+    def _is_silence(self, result: Dict[str, Any]) -> bool:
+        return (result["no_speech_prob"] > self.no_speech_threshold
+                and result["avg_logprob"] < self.logprob_threshold)
+
+    def _needs_fallback(self, result: Dict[str, Any]) -> bool:
+        return (result["compression_ratio"] > self.compression_ratio_threshold
+                or result["avg_logprob"] < self.logprob_threshold)
+
+    def _redecode(self, model: Any, chunk: np.ndarray, result: Dict[str, Any], language: Optional[str],
+                  fp16: bool) -> bool:
+        """Re-run a single chunk through `transcribe` to get temperature fallback; returns whether it worked."""
+        start_time = time.perf_counter()
+        try:
+            fallback = model.transcribe(chunk, language=language, fp16=fp16, condition_on_previous_text=False)
+            result["text"] = str(fallback.get("text", "")).strip()
+            result["segments"] = segments_from_whisper(fallback)
+            result["fallback"] = True
+        except Exception as e:
+            logger.warning(f"Fallback decode of chunk {result['chunk_id']} failed: {str(e)}")
+        result["decode_time"] = round(result["decode_time"] + time.perf_counter() - start_time, 4)
+        return bool(result.get("fallback"))
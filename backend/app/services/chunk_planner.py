@@ -0,0 +1,164 @@
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from app.config import (
+    VAD_MAX_CHUNK_SECONDS, VAD_MIN_SILENCE_SECONDS, VAD_SPEECH_PAD_SECONDS,
+    VAD_MIN_SPEECH_SECONDS, VAD_MAX_MERGE_GAP_SECONDS, VAD_THRESHOLD_DB,
+    WHISPER_CHUNK_OVERLAP_SECONDS
+)
+from app.services.audio_processor import AudioProcessor
+
+logger = logging.getLogger(__name__)
+
+# Whisper decodes at most 30 s per window
+WHISPER_WINDOW_SECONDS = 30.0
+
+class ChunkPlanner:
+    """
+    Plans Whisper chunks around speech instead of fixed offsets.
+
+    Voice activity from `AudioProcessor.detect_voice_activity` is turned into
+    voiced islands; short pauses are bridged, nearby islands are merged up to
+    the max chunk length, islands that are too long are split at their
+    quietest frame, and everything else (silence) is left out of the plan.
+    Pieces of a split island overlap slightly so words at the cut can be
+    deduplicated by the transcript stitcher.
+    """
+
+    def __init__(self, audio_processor: Optional[AudioProcessor] = None,
+                 max_chunk_seconds: float = VAD_MAX_CHUNK_SECONDS,
+                 min_silence_seconds: float = VAD_MIN_SILENCE_SECONDS,
+                 speech_pad_seconds: float = VAD_SPEECH_PAD_SECONDS,
+                 min_speech_seconds: float = VAD_MIN_SPEECH_SECONDS,
+                 max_merge_gap_seconds: float = VAD_MAX_MERGE_GAP_SECONDS,
+                 threshold_db: float = VAD_THRESHOLD_DB,
+                 overlap_seconds: float = WHISPER_CHUNK_OVERLAP_SECONDS,
+                 frame_length: int = 512, hop_length: int = 256):
+        self.audio_processor = audio_processor or AudioProcessor()
+        self.max_chunk_seconds = min(max_chunk_seconds, WHISPER_WINDOW_SECONDS)
+        self.min_silence_seconds = min_silence_seconds
+        self.speech_pad_seconds = speech_pad_seconds
+        self.min_speech_seconds = min_speech_seconds
+        self.max_merge_gap_seconds = max_merge_gap_seconds
+        self.threshold_db = threshold_db
+        self.overlap_seconds = overlap_seconds
+        self.frame_length = frame_length
+        self.hop_length = hop_length
+
+    def plan(self, audio: np.ndarray, sample_rate: int = 16000) -> Dict[str, Any]:
+        """
+        Return chunk boundaries (in samples and seconds) covering the speech in `audio`,
+        plus how many seconds of non-speech were left out.
+        """
+        total_samples = len(audio)
+        total_seconds = total_samples / sample_rate
+
+        vad = self.audio_processor.detect_voice_activity(
+            audio, sample_rate,
+            frame_length=self.frame_length,
+            hop_length=self.hop_length,
+            threshold_db=self.threshold_db
+        )
+        islands = self._voiced_islands(vad, total_samples, sample_rate)
+
+        energy = None
+        max_samples = int(self.max_chunk_seconds * sample_rate)
+        if any(end - start > max_samples for start, end in islands):
+            energy = self.audio_processor.frame_energy(audio, self.frame_length, self.hop_length)
+
+        bounds = self._pack(islands, max_samples, int(self.max_merge_gap_seconds * sample_rate),
+                            int(self.overlap_seconds * sample_rate), energy)
+
+        chunks = [
+            {
+                "chunk_id": i,
+                "start_sample": start,
+                "end_sample": end,
+                "start_time": start / sample_rate,
+                "end_time": end / sample_rate
+            }
+            for i, (start, end) in enumerate(bounds)
+        ]
+        # Count overlapping audio once
+        planned_samples = 0
+        covered_until = 0
+        for start, end in bounds:
+            planned_samples += max(0, end - max(start, covered_until))
+            covered_until = max(covered_until, end)
+        planned_seconds = planned_samples / sample_rate
+        skipped_seconds = max(0.0, total_seconds - planned_seconds)
+
+        logger.info(f"VAD plan: {len(chunks)} chunks, skipped {skipped_seconds:.1f}s "
+                    f"of {total_seconds:.1f}s as non-speech")
+
+        return {
+            "chunks": chunks,
+            "total_seconds": total_seconds,
+            "planned_seconds": planned_seconds,
+            "skipped_seconds": skipped_seconds
+        }
+
+    def _voiced_islands(self, vad: np.ndarray, total_samples: int, sample_rate: int) -> List[Tuple[int, int]]:
+        """Voiced runs as padded (start, end) sample ranges, with short pauses bridged."""
+        if len(vad) == 0 or not vad.any():
+            return []
+
+        # Run boundaries from the 0/1 transitions of the VAD mask
+        edges = np.diff(np.concatenate(([0], vad.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1) * self.hop_length
+        ends = np.flatnonzero(edges == -1) * self.hop_length + (self.frame_length - self.hop_length)
+
+        # Bridge pauses shorter than min_silence so words are not split across chunks
+        gaps = starts[1:] - ends[:-1]
+        keep = np.concatenate(([True], gaps >= int(self.min_silence_seconds * sample_rate)))
+        group = np.cumsum(keep) - 1
+        run_starts = starts[keep]
+        run_ends = np.zeros(len(run_starts), dtype=np.int64)
+        np.maximum.at(run_ends, group, ends)
+
+        # Drop blips that are too short to be speech
+        long_enough = (run_ends - run_starts) >= int(self.min_speech_seconds * sample_rate)
+        run_starts, run_ends = run_starts[long_enough], run_ends[long_enough]
+
+        pad = int(self.speech_pad_seconds * sample_rate)
+        run_starts = np.clip(run_starts - pad, 0, total_samples)
+        run_ends = np.clip(run_ends + pad, 0, total_samples)
+
+        islands: List[Tuple[int, int]] = []
+        for start, end in zip(run_starts.tolist(), run_ends.tolist()):
+            if islands and start <= islands[-1][1]:
+                islands[-1] = (islands[-1][0], max(islands[-1][1], end))
+            else:
+                islands.append((start, end))
+        return islands
+
+    def _pack(self, islands: List[Tuple[int, int]], max_samples: int, max_gap: int, overlap: int,
+              energy: Optional[np.ndarray]) -> List[Tuple[int, int]]:
+        """Merge neighbouring islands up to max_samples and split islands longer than that."""
+        bounds: List[Tuple[int, int]] = []
+        for start, end in islands:
+            for piece in self._split_long(start, end, max_samples, overlap, energy):
+                if bounds and piece[0] - bounds[-1][1] <= max_gap and piece[1] - bounds[-1][0] <= max_samples:
+                    bounds[-1] = (bounds[-1][0], piece[1])
+                else:
+                    bounds.append(piece)
+        return bounds
+
+    def _split_long(self, start: int, end: int, max_samples: int, overlap: int,
+                    energy: Optional[np.ndarray]) -> List[Tuple[int, int]]:
+        """Cut an over-long island at the quietest frame in the back half of each window."""
+        pieces = []
+        while end - start > max_samples:
+            search_from = (start + max_samples // 2) // self.hop_length
+            search_to = (start + max_samples - self.frame_length) // self.hop_length
+            cut = start + max_samples
+            if energy is not None and search_to > search_from:
+                window = energy[search_from:min(search_to, len(energy))]
+                if len(window):
+                    # Centre of the quietest frame
+                    cut = (search_from + int(np.argmin(window))) * self.hop_length + self.frame_length // 2
+            pieces.append((start, cut))
+            # The next piece re-reads `overlap` samples before the cut
+            start = max(start + 1, cut - overlap)
+        pieces.append((start, end))
+        return pieces
@@ -0,0 +1,129 @@
+import re
+import json
+import logging
+from typing import Any, Dict, List, Tuple
+from app.services.llm_client import llm_client
+
+logger = logging.getLogger(__name__)
+
+# An edit replaces words start..end (inclusive) with a replacement string
+Edit = Tuple[int, int, str]
+
+EDIT_INSTRUCTIONS = (
+    "The transcription below is given as numbered words (index:word). "
+    "Do NOT repeat the transcription. Reply with ONLY a JSON array of edits, "
+    "each either [index, \"replacement\"] for one word or [start, end, \"replacement\"] "
+    "for the words start..end inclusive. Use \"\" as the replacement to delete words. "
+    "Reply with [] when nothing needs to change."
+)
+
+class EditProtocolError(ValueError):
+    """Raised when a model reply is not a valid, applicable edit list."""
+
+def number_words(words: List[str]) -> str:
+    """Render words as "0:word 1:word ..." so edits can address them by index."""
+    return " ".join(f"{i}:{w}" for i, w in enumerate(words))
+
+def edit_messages(instruction: str, words: List[str]) -> List[Dict[str, str]]:
+    """Chat messages asking for `instruction` as a compact edit list over `words`."""
+    return [
+        {"role": "system", "content": f"{instruction}\n\n{EDIT_INSTRUCTIONS}"},
+        {"role": "user", "content": number_words(words)}
+    ]
+
+def parse_edits(content: str, word_count: int) -> List[Edit]:
+    """
+    Parse and validate a reply into sorted, non-overlapping edits.
+    Tolerates code fences and text around the array; anything else raises EditProtocolError.
+    """
+    content = (content or "").strip()
+    start, end = content.find("["), content.rfind("]")
+    if start == -1 or end < start:
+        raise EditProtocolError("reply contains no JSON array")
+    try:
+        raw = json.loads(content[start:end + 1])
+    except ValueError as e:
+        raise EditProtocolError(f"reply is not valid JSON: {str(e)}") from e
+    if not isinstance(raw, list):
+        raise EditProtocolError("reply is not a list of edits")
+    if raw and not isinstance(raw[0], list):
+        # A single edit without the outer array
+        raw = [raw]
+
+    edits: List[Edit] = []
+    for item in raw:
+        if not isinstance(item, list) or len(item) not in (2, 3) or not isinstance(item[-1], str):
+            raise EditProtocolError(f"malformed edit: {item!r}")
+        bounds = item[:-1]
+        if not all(isinstance(b, int) and not isinstance(b, bool) for b in bounds):
+            raise EditProtocolError(f"edit indices must be integers: {item!r}")
+        first, last = bounds[0], bounds[-1]
+        if not 0 <= first <= last < word_count:
+            raise EditProtocolError(f"edit span {first}..{last} is outside 0..{word_count - 1}")
+        replacement = " ".join(item[-1].split())
+        # A correction, not a rewrite: replacements stay close to the span they replace
+        if len(replacement.split()) > 3 * (last - first + 1) + 3:
+            raise EditProtocolError(f"replacement for {first}..{last} is a rewrite, not an edit")
+        edits.append((first, last, replacement))
+
+    edits.sort()
+    for (_, previous_end, _), (next_start, _, _) in zip(edits, edits[1:]):
+        if next_start <= previous_end:
+            raise EditProtocolError("edits overlap")
+    return edits
+
+def apply_edits(words: List[str], edits: List[Edit]) -> str:
+    """Apply validated edits to the word list and return the corrected text."""
+    output: List[str] = []
+    position = 0
+    for first, last, replacement in edits:
+        output.extend(words[position:first])
+        if replacement:
+            output.append(replacement)
+        position = last + 1
+    output.extend(words[position:])
+    return re.sub(r"\s+", " ", " ".join(output)).strip()
+
+class CorrectionMetrics:
+    """
+    Wall time per correction protocol, so edit-only and full-text corrections
+    can be compared. Token usage comes from the LLM client's per-call-site
+    counters for the call sites each protocol used. A failed edit attempt is
+    counted under "edits" (as a fallback) and its full-text retry under "full".
+    """
+
+    def __init__(self):
+        self._modes: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, mode: str, call_site: str, elapsed: float, fallback: bool = False, edits: int = 0):
+        stats = self._modes.setdefault(mode, {
+            "corrections": 0,
+            "wall_time": 0.0,
+            "fallbacks": 0,
+            "edits_applied": 0,
+            "call_sites": set()
+        })
+        stats["corrections"] += 1
+        stats["wall_time"] += elapsed
+        stats["fallbacks"] += int(fallback)
+        stats["edits_applied"] += edits
+        stats["call_sites"].add(call_site)
+
+    def stats(self) -> Dict[str, Any]:
+        call_sites = llm_client.stats()["call_sites"]
+        result = {}
+        for mode, stats in self._modes.items():
+            sites = [call_sites[site] for site in stats["call_sites"] if site in call_sites]
+            result[mode] = {
+                "corrections": stats["corrections"],
+                "wall_time": round(stats["wall_time"], 3),
+                "avg_wall_time": round(stats["wall_time"] / stats["corrections"], 3),
+                "fallbacks": stats["fallbacks"],
+                "edits_applied": stats["edits_applied"],
+                "prompt_tokens": sum(s["prompt_tokens"] for s in sites),
+                "completion_tokens": sum(s["completion_tokens"] for s in sites)
+            }
+        return result
+
+# Shared counters for the whole process
+correction_metrics = CorrectionMetrics()
@@ -0,0 +1,233 @@
+import re
+import logging
+from collections import Counter
+from typing import Any, Dict, List
+import numpy as np
+from scipy import sparse
+from app.services.text_chunker import split_sentences
+
+logger = logging.getLogger(__name__)
+
+# "Speaker 2:" or "Anna:" at the start of a transcript line
+_SPEAKER_LABEL = re.compile(r"^\s*(?:speaker\s*\d+|[A-Z][\w.'-]*(?:\s[A-Z][\w.'-]*)?)\s*:\s+", re.IGNORECASE)
+_WORD = re.compile(r"[a-z][a-z'-]*[a-z]|[a-z]")
+_STOPWORDS = frozenset("""
+    a about above after again against all also am an and any are aren't as at be because been before being
+    below between both but by can can't cannot could couldn't did didn't do does doesn't doing don't down during
+    each few for from further get gets getting got had hadn't has hasn't have haven't having he he'd he'll he's
+    her here here's hers herself him himself his how how's i i'd i'll i'm i've if in into is isn't it it's its
+    itself just let's like me more most much mustn't my myself no nor not now of off on once only or other ought
+    our ours ourselves out over own really right same shan't she she'd she'll she's should shouldn't so some
+    such than that that's the their theirs them themselves then there there's these they they'd they'll
+    they're they've this those through to too um uh under until up very was wasn't we we'd we'll we're we've
+    were weren't what what's when when's where where's which while who who's whom why why's will with won't
+    would wouldn't yeah yes okay ok you you'd you'll you're you've your yours yourself yourselves going know
+    think thing things want say said well gonna kind sort actually basically maybe lot need needs look looks
+    mean means go goes went come came make made good great sure fine one two get back still even next week
+    today tomorrow yesterday morning afternoon everyone thanks thank start
+""".split())
+
+# Commitments: someone will / needs to / should do something. The subject is a personal
+# pronoun or a capitalized name (case-sensitive, so "it will rain" or "that should be fine" don't count)
+_ACTION = re.compile(
+    r"\b(?:i|we|you|he|she|they|(?!(?:it|this|that|there|these|those|what|which|who|everything|"
+    r"nothing|something|anything|everyone|someone|anyone|nobody|here)\b)(?-i:[A-Z][a-z]+))\s+"
+    r"(?:will|'ll|need to|needs to|should|must|has to|have to|"
+    r"is going to|are going to|am going to|can take|to take)\b|"
+    r"\b(?:action item|follow[- ]up|follow up|to-?do|make sure|please|can you|could you|assign(?:ed)?)\b",
+    re.IGNORECASE
+)
+# Deadlines make a sentence much more likely to be an action item
+_DEADLINE = re.compile(
+    r"\b(?:by|before|until|due)\s+(?:the\s+)?(?:end of\s+)?(?:monday|tuesday|wednesday|thursday|friday|"
+    r"saturday|sunday|tomorrow|tonight|today|next week|this week|next month|eod|eow|\d)|\bdeadline\b",
+    re.IGNORECASE
+)
+_DECISION = re.compile(
+    r"\b(?:we (?:have )?(?:decided|agreed|chose|settled)|(?:it's|it is|that's) (?:decided|agreed|settled)|"
+    r"decision (?:is|was)|let's go with|we(?:'ll| will) go with|approved|sign(?:ed)? off|final answer|"
+    r"consensus)\b",
+    re.IGNORECASE
+)
+
+DAMPING = 0.85
+ITERATIONS = 50
+TOLERANCE = 1e-6
+
+def _tokens(sentence: str) -> List[str]:
+    return [w for w in _WORD.findall(sentence.lower()) if w not in _STOPWORDS and len(w) > 2]
+
+def tfidf_matrix(token_lists: List[List[str]]) -> sparse.csr_matrix:
+    """Sentence-by-term TF-IDF matrix (sublinear tf, smoothed idf) with L2-normalized rows."""
+    vocabulary: Dict[str, int] = {}
+    rows, cols, counts = [], [], []
+    for row, tokens in enumerate(token_lists):
+        for term, count in Counter(tokens).items():
+            rows.append(row)
+            cols.append(vocabulary.setdefault(term, len(vocabulary)))
+            counts.append(count)
+    n = len(token_lists)
+    matrix = sparse.csr_matrix(
+        (1.0 + np.log(np.asarray(counts, dtype=float)), (rows, cols)),
+        shape=(n, max(1, len(vocabulary)))
+    )
+    document_frequency = np.bincount(cols, minlength=matrix.shape[1]) if cols else np.zeros(1)
+    idf = np.log((1.0 + n) / (1.0 + document_frequency)) + 1.0
+    matrix = matrix @ sparse.diags(idf)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix)
+
+def textrank(matrix: sparse.csr_matrix) -> np.ndarray:
+    """
+    TextRank scores of the rows of a normalized TF-IDF matrix.
+
+    The sentence graph is the cosine similarity S = X X^T without self-loops.
+    It is never built: each power iteration computes S v as X (X^T v) - v, so
+    memory and time stay linear in the number of non-zero terms rather than
+    quadratic in the number of sentences.
+    """
+    n = matrix.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    transposed = matrix.T.tocsr()
+    self_similarity = np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()
+
+    def similarity_times(v: np.ndarray) -> np.ndarray:
+        return matrix @ (transposed @ v) - self_similarity * v
+
+    degree = similarity_times(np.ones(n))
+    connected = degree > 1e-12
+    inverse_degree = np.where(connected, 1.0 / np.where(connected, degree, 1.0), 0.0)
+    scores = np.full(n, 1.0 / n)
+    for _ in range(ITERATIONS):
+        # Rank held by sentences without neighbours is spread evenly
+        dangling = scores[~connected].sum()
+        updated = (1 - DAMPING) / n + DAMPING * (similarity_times(scores * inverse_degree) + dangling / n)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            scores = updated
+            break
+        scores = updated
+    return scores
+
+def _select(order: np.ndarray, matrix: sparse.csr_matrix, count: int, max_overlap: float = 0.5) -> List[int]:
+    """
+    Best-ranked rows, skipping any too similar to one already picked. Only the top
+    candidates are compared, with one small similarity matrix; if too few of them
+    are distinct enough the best remaining ones fill up the selection.
+    """
+    candidates = order[:max(50, count * 10)]
+    similarity = (matrix[candidates] @ matrix[candidates].T).toarray()
+    picked: List[int] = []
+    for position in range(len(candidates)):
+        if len(picked) >= count:
+            break
+        if picked and similarity[position, picked].max() > max_overlap:
+            continue
+        picked.append(position)
+    for position in range(len(candidates)):
+        if len(picked) >= count:
+            break
+        if position not in picked:
+            picked.append(position)
+    return [int(candidates[position]) for position in picked]
+
+def _key_phrases(sentences: List[str], scores: np.ndarray, count: int) -> List[str]:
+    """
+    One- to three-word phrases (runs of content words between stopwords), weighted by
+    how often they occur and by the rank of the sentences they occur in.
+    """
+    weights: Counter = Counter()
+    document_frequency: Counter = Counter()
+    for sentence, score in zip(sentences, scores):
+        run: List[str] = []
+        found = set()
+        for word in _WORD.findall(sentence.lower()) + [""]:
+            if word and word not in _STOPWORDS and len(word) > 2:
+                run.append(word)
+                continue
+            for size in range(1, min(3, len(run)) + 1):
+                for start in range(len(run) - size + 1):
+                    phrase = " ".join(run[start:start + size])
+                    weights[phrase] += score * size
+                    found.add(phrase)
+            run = []
+        document_frequency.update(found)
+    # Phrases said in nearly every sentence say little about the topics
+    n = len(sentences)
+    for phrase in weights:
+        weights[phrase] *= np.log((1.0 + n) / (1.0 + document_frequency[phrase])) + 0.1
+    phrases: List[str] = []
+    for phrase, weight in weights.most_common():
+        if len(phrases) >= count:
+            break
+        words = set(phrase.split())
+        # Skip phrases that repeat most of one already chosen
+        if weight <= 0 or any(phrase in p or p in phrase or len(words & set(p.split())) >= 2 for p in phrases):
+            continue
+        phrases.append(phrase)
+    return [p[0].upper() + p[1:] for p in phrases]
+
+def _clip(sentence: str, max_words: int = 30) -> str:
+    words = sentence.split()
+    return sentence if len(words) <= max_words else " ".join(words[:max_words]) + "..."
+
+def extractive_summary(text: str, summary_sentences: int = 5, key_points: int = 5,
+                       max_action_items: int = 8, max_chars: int = 0) -> Dict[str, Any]:
+    """
+    Summary fields of a transcript picked out of the transcript itself, without any
+    API call: the TextRank-best sentences (in transcript order) as the summary,
+    highly ranked phrases as key points, and rule-based action items and
+    decisions. `max_chars` caps the summary length (0 means no cap).
+    """
+    sentences = [s for line in text.splitlines() for s in split_sentences(_SPEAKER_LABEL.sub("", line))]
+    if not sentences:
+        return {"full_summary": "", "key_points": [], "action_items": [], "decisions": [], "conclusion": ""}
+
+    token_lists = [_tokens(s) for s in sentences]
+    matrix = tfidf_matrix(token_lists)
+    scores = textrank(matrix)
+    # Very short sentences ("Yes.", "Okay, thanks.") rarely carry content
+    lengths = np.fromiter((len(t) for t in token_lists), dtype=float, count=len(token_lists))
+    scores = scores * np.minimum(1.0, lengths / 4.0)
+    order = np.argsort(-scores, kind="stable")
+
+    summary_rows = sorted(_select(order, matrix, summary_sentences))
+    summary = ""
+    for row in summary_rows:
+        candidate = f"{summary} {sentences[row]}".strip()
+        if max_chars and len(candidate) > max_chars:
+            if not summary:
+                summary = sentences[row][:max(0, max_chars - 3)].rstrip() + "..."
+            break
+        summary = candidate
+
+    action_items, decisions = [], []
+    seen = set()
+    for row, sentence in enumerate(sentences):
+        if len(token_lists[row]) < 2 or sentence.lower() in seen:
+            continue
+        is_action = bool(_ACTION.search(sentence)) and (not sentence.endswith("?") or _DEADLINE.search(sentence))
+        if _DECISION.search(sentence):
+            decisions.append(_clip(sentence))
+            seen.add(sentence.lower())
+        elif is_action or _DEADLINE.search(sentence):
+            action_items.append((bool(_DEADLINE.search(sentence)) + float(scores[row]), row, _clip(sentence)))
+            seen.add(sentence.lower())
+    # Keep the most likely ones, in transcript order
+    action_items = [item for _, _, item in sorted(sorted(action_items, reverse=True)[:max_action_items], key=lambda a: a[1])]
+
+    if decisions:
+        conclusion = "Decisions: " + " ".join(decisions[:3])
+    else:
+        # The best-ranked sentence from the last fifth of the meeting
+        tail = int(len(sentences) * 0.8)
+        conclusion = sentences[tail + int(np.argmax(scores[tail:]))] if tail < len(sentences) else ""
+
+    return {
+        "full_summary": summary,
+        "key_points": _key_phrases(sentences, scores, key_points),
+        "action_items": action_items,
+        "decisions": decisions,
+        "conclusion": conclusion
+    }
@@ -0,0 +1,84 @@
+import asyncio
+import time
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+async def first_acceptable(launchers: List[Callable[[], Awaitable[Any]]],
+                           accept: Callable[[Any], bool],
+                           hedge_delay: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Run interchangeable calls and return as soon as one result is acceptable.
+
+    With no `hedge_delay` every launcher starts at once (race). Otherwise the
+    first starts alone and the next one is only started when the running calls
+    have taken `hedge_delay` seconds without an acceptable answer, or have all
+    failed (hedge). Calls still running when a winner arrives are cancelled.
+
+    Returns {"index", "result", "hedged", "attempts"}; index is None when no
+    call produced an acceptable result.
+    """
+    loop = asyncio.get_running_loop()
+    start_time = time.perf_counter()
+    tasks: Dict[asyncio.Task, int] = {}
+    attempts: List[Dict[str, Any]] = [{"index": i, "status": "not_started"} for i in range(len(launchers))]
+    next_index = 0
+
+    def launch():
+        nonlocal next_index
+        index = next_index
+        next_index += 1
+        attempts[index].update(status="running", started_at=round(time.perf_counter() - start_time, 4))
+        tasks[asyncio.ensure_future(launchers[index]())] = index
+
+    launch()
+    while hedge_delay is None and next_index < len(launchers):
+        launch()
+    next_hedge_at = loop.time() + hedge_delay if hedge_delay is not None else None
+
+    winner: Optional[int] = None
+    winning_result: Any = None
+    try:
+        while tasks or next_index < len(launchers):
+            if not tasks:
+                # Everything started so far failed; fall through to the next call now
+                launch()
+                next_hedge_at = loop.time() + hedge_delay if hedge_delay is not None else None
+                continue
+
+            timeout = None
+            if next_hedge_at is not None and next_index < len(launchers):
+                timeout = max(0.0, next_hedge_at - loop.time())
+            done, _ = await asyncio.wait(tasks.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                index = tasks.pop(task)
+                elapsed = round(time.perf_counter() - start_time, 4)
+                if task.exception() is not None:
+                    attempts[index].update(status="failed", finished_at=elapsed, error=str(task.exception()))
+                    continue
+                result = task.result()
+                if accept(result) and winner is None:
+                    attempts[index].update(status="won", finished_at=elapsed)
+                    winner, winning_result = index, result
+                else:
+                    attempts[index].update(status="rejected", finished_at=elapsed)
+            if winner is not None:
+                break
+
+            if not done and next_index < len(launchers):
+                logger.info(f"Hedging: call {next_index - 1} exceeded {hedge_delay:.2f}s, starting call {next_index}")
+                launch()
+                next_hedge_at = loop.time() + hedge_delay
+    finally:
+        for task, index in tasks.items():
+            task.cancel()
+            attempts[index]["status"] = "cancelled"
+
+    return {
+        "index": winner,
+        "result": winning_result,
+        "hedged": hedge_delay is not None and next_index > 1,
+        "attempts": attempts
+    }
@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import time
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+import psutil
+import torch
+from app.config import WHISPER_INFERENCE_WORKERS, WHISPER_TORCH_THREADS, WHISPER_JOB_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+class InferenceExecutor:
+    """
+    Dedicated thread pool for blocking Whisper inference.
+
+    Every Whisper call is submitted here and awaited, so decodes never run on
+    the event loop. Whisper installs kv-cache hooks on the model for each
+    decode, which makes concurrent decodes on the *same* model unsafe; jobs are
+    therefore serialized per model and rely on torch intra-op threads for
+    speed, while jobs on different models run side by side.
+    """
+
+    def __init__(self, max_workers: int = WHISPER_INFERENCE_WORKERS,
+                 torch_threads: int = WHISPER_TORCH_THREADS,
+                 job_timeout: Optional[float] = WHISPER_JOB_TIMEOUT):
+        self.max_workers = max(1, max_workers)
+        self.torch_threads = torch_threads or psutil.cpu_count(logical=False) or psutil.cpu_count() or 1
+        self.job_timeout = job_timeout if job_timeout and job_timeout > 0 else None
+        # Applied on the first job, so importing the module leaves torch's thread settings alone
+        self._threads_applied = False
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="whisper-inference"
+        )
+        self._model_locks: Dict[int, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._timed_out = 0
+        self._total_queue_wait = 0.0
+        self._total_run_time = 0.0
+        self._recent_jobs = deque(maxlen=100)
+
+    def _apply_torch_threads(self):
+        if self._threads_applied:
+            return
+        with self._locks_guard:
+            if self._threads_applied:
+                return
+            torch.set_num_threads(self.torch_threads)
+            self._threads_applied = True
+        logger.info(f"Inference executor: {self.max_workers} workers, {self.torch_threads} torch threads")
+
+    def _model_lock(self, model: Any) -> threading.Lock:
+        with self._locks_guard:
+            return self._model_locks.setdefault(id(model), threading.Lock())
+
+    def _run_job(self, fn: Callable, args: tuple, kwargs: dict, lock: Optional[threading.Lock],
+                 submitted_at: float, label: str) -> Tuple[Any, Dict[str, Any]]:
+        started_at = time.perf_counter()
+        if lock is not None:
+            lock.acquire()
+        try:
+            run_started = time.perf_counter()
+            result = fn(*args, **kwargs)
+            finished_at = time.perf_counter()
+        finally:
+            if lock is not None:
+                lock.release()
+
+        timing = {
+            "label": label,
+            "queue_wait": round(run_started - submitted_at, 4),
+            "run_time": round(finished_at - run_started, 4),
+            "lock_wait": round(run_started - started_at, 4),
+        }
+        return result, timing
+
+    async def run_timed(self, fn: Callable, *args, model: Any = None, label: str = "whisper",
+                        timeout: Optional[float] = None, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Run a blocking callable on the pool and return (result, timing).
+        When `model` is given the job holds that model's lock while it runs.
+        """
+        self._apply_torch_threads()
+        loop = asyncio.get_running_loop()
+        lock = self._model_lock(model) if model is not None else None
+        submitted_at = time.perf_counter()
+        timeout = timeout if timeout is not None else self.job_timeout
+
+        with self._stats_lock:
+            self._in_flight += 1
+        try:
+            future = loop.run_in_executor(
+                self._executor, self._run_job, fn, args, kwargs, lock, submitted_at, label
+            )
+            # The worker thread cannot be interrupted; on timeout the caller
+            # stops waiting and the job finishes in the background.
+            result, timing = await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            with self._stats_lock:
+                self._timed_out += 1
+            logger.warning(f"Inference job '{label}' timed out after {timeout}s")
+            raise
+        except Exception:
+            with self._stats_lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._stats_lock:
+                self._in_flight -= 1
+
+        with self._stats_lock:
+            self._completed += 1
+            self._total_queue_wait += timing["queue_wait"]
+            self._total_run_time += timing["run_time"]
+            self._recent_jobs.append(timing)
+        return result, timing
+
+    async def run(self, fn: Callable, *args, model: Any = None, label: str = "whisper",
+                  timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run a blocking callable on the pool and return its result."""
+        result, _ = await self.run_timed(fn, *args, model=model, label=label, timeout=timeout, **kwargs)
+        return result
+
+    async def transcribe(self, model: Any, audio: Any, **options) -> Dict[str, Any]:
+        """Run `model.transcribe` on the pool under the model's lock."""
+        return await self.run(model.transcribe, audio, model=model, label="transcribe", **options)
+
+    def stats(self) -> Dict[str, Any]:
+        """Aggregate and recent per-job timings."""
+        with self._stats_lock:
+            completed = self._completed
+            return {
+                "max_workers": self.max_workers,
+                "torch_threads": self.torch_threads,
+                "in_flight": self._in_flight,
+                "completed": completed,
+                "failed": self._failed,
+                "timed_out": self._timed_out,
+                "avg_queue_wait": round(self._total_queue_wait / completed, 4) if completed else 0.0,
+                "avg_run_time": round(self._total_run_time / completed, 4) if completed else 0.0,
+                "recent_jobs": list(self._recent_jobs)[-10:]
+            }
+
+    def shutdown(self, wait: bool = False):
+        """Stop accepting jobs; running decodes are left to finish."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+# Shared executor for the whole process
+inference_executor = InferenceExecutor()
@@ -0,0 +1,116 @@
+from typing import Any, Dict, List, Optional
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+class SummaryStreamParser:
+    """
+    Incremental parser for a streamed JSON summary object.
+
+    Feed it text deltas as they arrive; it returns events as soon as they can
+    be known, without waiting for the whole document:
+
+    - {"type": "field_delta", "field", "text"}: new characters of a top-level string
+      (e.g. full_summary) while it is still being written
+    - {"type": "field", "field", "value"}: a top-level string is complete
+    - {"type": "item", "field", "index", "text"}: one string of a top-level array
+      (key_points, action_items) is complete
+
+    Anything before the first "{" (such as a code fence) is skipped. Numbers,
+    booleans and nested objects are passed over.
+    """
+
+    def __init__(self):
+        # Open containers: "{" or "["
+        self._stack: List[str] = []
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._in_string = False
+        self._string_role: Optional[str] = None
+        self._chars: List[str] = []
+        self._emitted = 0
+        self._escape: Optional[str] = None
+        self._item_counts: Dict[str, int] = {}
+        self.done = False
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        events: List[Dict[str, Any]] = []
+        for char in text:
+            if self.done:
+                break
+            if self._in_string:
+                self._string_char(char, events)
+            elif char == '"' and self._stack:
+                self._start_string()
+            elif char in "{[":
+                self._stack.append(char)
+                self._expect_key = char == "{"
+            elif char in "}]" and self._stack:
+                self._stack.pop()
+                if not self._stack:
+                    self.done = True
+            elif char == "," and self._stack:
+                self._expect_key = self._stack[-1] == "{"
+            elif char == ":" and self._stack:
+                self._expect_key = False
+
+        # Partial top-level strings are reported once per feed, not per character
+        if self._in_string and self._string_role == "field" and len(self._chars) > self._emitted:
+            events.append({"type": "field_delta", "field": self._key, "text": "".join(self._chars[self._emitted:])})
+            self._emitted = len(self._chars)
+        return events
+
+    def _start_string(self):
+        self._in_string = True
+        self._chars = []
+        self._emitted = 0
+        self._escape = None
+        depth = len(self._stack)
+        if self._stack[-1] == "{" and self._expect_key:
+            self._string_role = "key" if depth == 1 else None
+        elif depth == 1:
+            self._string_role = "field"
+        elif depth == 2 and self._stack[-1] == "[":
+            self._string_role = "item"
+        else:
+            self._string_role = None
+
+    def _string_char(self, char: str, events: List[Dict[str, Any]]):
+        if self._escape is not None:
+            self._escape += char
+            decoded = self._decode_escape(self._escape)
+            if decoded is not None:
+                self._chars.append(decoded)
+                self._escape = None
+            return
+        if char == "\\":
+            self._escape = ""
+            return
+        if char != '"':
+            self._chars.append(char)
+            return
+
+        self._in_string = False
+        value = "".join(self._chars)
+        role = self._string_role
+        if role == "key":
+            self._key = value
+        elif role == "field":
+            if len(self._chars) > self._emitted:
+                events.append({"type": "field_delta", "field": self._key, "text": "".join(self._chars[self._emitted:])})
+            events.append({"type": "field", "field": self._key, "value": value})
+        elif role == "item":
+            index = self._item_counts.get(self._key, 0)
+            self._item_counts[self._key] = index + 1
+            events.append({"type": "item", "field": self._key, "index": index, "text": value})
+
+    @staticmethod
+    def _decode_escape(escape: str) -> Optional[str]:
+        """The character for a complete escape sequence (after the backslash), or None if incomplete."""
+        if escape[0] != "u":
+            return _ESCAPES.get(escape[0], escape[0])
+        if len(escape) < 5:
+            return None
+        try:
+            return chr(int(escape[1:5], 16))
+        except ValueError:
+            return ""
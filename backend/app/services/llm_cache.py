@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from app.config import (
+    LLM_CACHE, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_DB, LLM_CACHE_MAX_TEMPERATURE
+)
+
+logger = logging.getLogger(__name__)
+
+class LLMResponseCache:
+    """
+    Cache of chat-completion replies keyed by provider, model, messages and
+    sampling parameters.
+
+    Lookups go to an in-memory LRU first, then (when a database path is set)
+    to a SQLite table that survives restarts; disk hits are promoted back into
+    memory. Entries expire after the TTL in both tiers. Only requests at or
+    below the temperature cap are cached, since sampled replies are meant to
+    vary. Hits and misses are counted per call site.
+
+    `aget`/`aput` are for the event loop: the memory tier is checked inline
+    and SQLite is only touched from a worker thread. `get`/`put` do the same
+    work synchronously.
+    """
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES,
+                 ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+                 db_path: str = LLM_CACHE_DB,
+                 max_temperature: float = LLM_CACHE_MAX_TEMPERATURE,
+                 enabled: bool = LLM_CACHE):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.max_temperature = max_temperature
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # SQLite has its own lock so memory lookups never wait on disk I/O
+        self._db_lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_failed = False
+        self._call_sites: Dict[str, Dict[str, int]] = {}
+        self.disk_hits = 0
+        self.evictions = 0
+
+    def key(self, provider: str, model: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Optional[str]:
+        """Cache key of a request, or None when the request should not be cached."""
+        if not self.enabled:
+            return None
+        # Providers default to temperature 1 when none is sent
+        temperature = params.get("temperature")
+        if temperature is None or temperature > self.max_temperature:
+            return None
+        payload = json.dumps(
+            {"provider": provider, "model": model, "messages": messages, "params": params},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if not self.db_path or self._db_failed:
+            return None
+        if self._db is None:
+            try:
+                directory = os.path.dirname(self.db_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, content TEXT, created REAL)"
+                )
+                self._db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_seconds,))
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache database unavailable, using memory only: {str(e)}")
+                self._db_failed = True
+                self._db = None
+        return self._db
+
+    def _count(self, call_site: str, hit: bool):
+        counters = self._call_sites.setdefault(call_site, {"hits": 0, "misses": 0})
+        counters["hits" if hit else "misses"] += 1
+
+    def _memory_get(self, key: str, now: float) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[0] <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                return entry[1]
+            if entry is not None:
+                del self._memory[key]
+            return None
+
+    @property
+    def _persistent(self) -> bool:
+        return bool(self.db_path) and not self._db_failed
+
+    def _disk_get(self, key: str, now: float) -> Optional[str]:
+        """Blocking SQLite lookup; a hit is promoted into memory."""
+        with self._db_lock:
+            db = self._connection()
+            if db is None:
+                return None
+            try:
+                row = db.execute("SELECT content, created FROM responses WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache read failed: {str(e)}")
+                return None
+        if row is None or now - row[1] > self.ttl_seconds:
+            return None
+        with self._lock:
+            self._store_memory(key, row[1], row[0])
+            self.disk_hits += 1
+        return row[0]
+
+    def _disk_put(self, key: str, created: float, content: str):
+        with self._db_lock:
+            db = self._connection()
+            if db is None:
+                return
+            try:
+                db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (key, content, created))
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache write failed: {str(e)}")
+
+    def _record(self, call_site: str, content: Optional[str]) -> Optional[str]:
+        with self._lock:
+            self._count(call_site, content is not None)
+        return content
+
+    def get(self, key: str, call_site: str) -> Optional[str]:
+        """Cached reply for a key, or None (counted as a miss for the call site). Blocks on SQLite."""
+        now = time.time()
+        content = self._memory_get(key, now)
+        if content is None and self._persistent:
+            content = self._disk_get(key, now)
+        return self._record(call_site, content)
+
+    async def aget(self, key: str, call_site: str) -> Optional[str]:
+        """Like `get`, with the SQLite lookup run in a worker thread."""
+        now = time.time()
+        content = self._memory_get(key, now)
+        if content is None and self._persistent:
+            content = await asyncio.to_thread(self._disk_get, key, now)
+        return self._record(call_site, content)
+
+    def put(self, key: str, content: str):
+        """Store a non-empty reply in memory and, when configured, on disk. Blocks on SQLite."""
+        if not content:
+            return
+        created = time.time()
+        with self._lock:
+            self._store_memory(key, created, content)
+        if self._persistent:
+            self._disk_put(key, created, content)
+
+    async def aput(self, key: str, content: str):
+        """Like `put`, with the SQLite write run in a worker thread."""
+        if not content:
+            return
+        created = time.time()
+        with self._lock:
+            self._store_memory(key, created, content)
+        if self._persistent:
+            await asyncio.to_thread(self._disk_put, key, created, content)
+
+    def _store_memory(self, key: str, created: float, content: str):
+        self._memory[key] = (created, content)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = sum(c["hits"] for c in self._call_sites.values())
+            misses = sum(c["misses"] for c in self._call_sites.values())
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "persistent": self._db is not None,
+                "hits": hits,
+                "disk_hits": self.disk_hits,
+                "misses": misses,
+                "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                "evictions": self.evictions,
+                "call_sites": {
+                    site: {
+                        **counters,
+                        "hit_ratio": round(counters["hits"] / (counters["hits"] + counters["misses"]), 4)
+                    }
+                    for site, counters in self._call_sites.items()
+                }
+            }
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
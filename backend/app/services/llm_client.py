@@ -0,0 +1,397 @@
+import asyncio
+import json
+import time
+import logging
+from collections import deque
+from typing import Dict, Any, List, Optional, Callable, Tuple, AsyncIterator, Awaitable
+import aiohttp
+import numpy as np
+from app.services.llm_cache import LLMResponseCache
+from app.services.rate_limiter import ProviderRateLimiter, estimate_request_tokens
+from app.config import (
+    GROQ_API_KEY, OPENROUTER_API_KEY,
+    LLM_MAX_CONNECTIONS, LLM_MAX_CONNECTIONS_PER_HOST,
+    LLM_KEEPALIVE_TIMEOUT, LLM_REQUEST_TIMEOUT,
+    GROQ_REQUESTS_PER_MINUTE, GROQ_TOKENS_PER_MINUTE,
+    OPENROUTER_REQUESTS_PER_MINUTE, OPENROUTER_TOKENS_PER_MINUTE,
+    LLM_RATE_LIMIT_RETRIES, LLM_RATE_LIMIT_BACKOFF_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+# Both providers speak the OpenAI chat-completions protocol
+PROVIDERS = {
+    "groq": {
+        "base_url": "https://api.groq.com/openai/v1",
+        "api_key": GROQ_API_KEY,
+        "requests_per_minute": GROQ_REQUESTS_PER_MINUTE,
+        "tokens_per_minute": GROQ_TOKENS_PER_MINUTE
+    },
+    "openrouter": {
+        "base_url": "https://openrouter.ai/api/v1",
+        "api_key": OPENROUTER_API_KEY,
+        "requests_per_minute": OPENROUTER_REQUESTS_PER_MINUTE,
+        "tokens_per_minute": OPENROUTER_TOKENS_PER_MINUTE
+    }
+}
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (the HTTP-date form is ignored)."""
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+class LLMError(Exception):
+    """Raised when a provider returns an error or an unusable response."""
+
+    def __init__(self, message: str, provider: str = "", status: Optional[int] = None,
+                 retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.provider = provider
+        self.status = status
+        self.retry_after = retry_after
+
+def _log_close_error(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.debug(f"Closing a stale LLM session failed: {str(task.exception())}")
+
+class LLMClient:
+    """
+    Async chat-completion client shared by every service.
+
+    All providers go through a single aiohttp session whose connector keeps
+    connections alive and caps the pool size, so concurrent calls overlap on
+    the network instead of blocking the event loop one after another.
+    """
+
+    def __init__(self, max_connections: int = LLM_MAX_CONNECTIONS,
+                 max_connections_per_host: int = LLM_MAX_CONNECTIONS_PER_HOST,
+                 keepalive_timeout: float = LLM_KEEPALIVE_TIMEOUT,
+                 request_timeout: float = LLM_REQUEST_TIMEOUT,
+                 cache: Optional[LLMResponseCache] = None,
+                 rate_limit_retries: int = LLM_RATE_LIMIT_RETRIES,
+                 rate_limit_backoff: float = LLM_RATE_LIMIT_BACKOFF_SECONDS):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._call_stats: Dict[str, Dict[str, Any]] = {}
+        # Recent successful latencies per call site, for percentiles (hedging)
+        self._latencies: Dict[str, deque] = {}
+        self.cache = cache if cache is not None else LLMResponseCache()
+        self.rate_limit_retries = rate_limit_retries
+        self.rate_limit_backoff = rate_limit_backoff
+        self._limiters: Dict[str, ProviderRateLimiter] = {}
+        # Called as observer(provider, model, elapsed, error) after every provider request
+        self._observers: List[Callable[[str, str, float, Optional[Exception]], None]] = []
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Create the pooled session lazily, inside the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._discard_session()
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+            )
+            self._session_loop = loop
+        return self._session
+
+    def _discard_session(self):
+        """Close a session left over from another event loop before it is replaced."""
+        session, loop = self._session, self._session_loop
+        self._session, self._session_loop = None, None
+        if session is None or session.closed:
+            return
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+            return
+        # Its loop has stopped: close it from the current loop, which drops the
+        # pooled keep-alive sockets even though their transports can no longer
+        # be shut down gracefully
+        task = asyncio.get_running_loop().create_task(session.close())
+        task.add_done_callback(_log_close_error)
+
+    def _headers(self, provider: str) -> Dict[str, str]:
+        if provider not in PROVIDERS:
+            raise LLMError(f"Unknown LLM provider: {provider}", provider=provider)
+        return {
+            "Authorization": f"Bearer {PROVIDERS[provider]['api_key']}",
+            "Content-Type": "application/json"
+        }
+
+    def _limiter(self, provider: str) -> ProviderRateLimiter:
+        limiter = self._limiters.get(provider)
+        if limiter is None:
+            config = PROVIDERS.get(provider, {})
+            limiter = ProviderRateLimiter(
+                provider,
+                config.get("requests_per_minute", 0),
+                config.get("tokens_per_minute", 0)
+            )
+            self._limiters[provider] = limiter
+        return limiter
+
+    def add_observer(self, observer: Callable[[str, str, float, Optional[Exception]], None]):
+        """Register a callback for the outcome of every provider request (cache hits excluded)."""
+        self._observers.append(observer)
+
+    def _notify(self, provider: str, model: str, elapsed: float, error: Optional[Exception]):
+        for observer in self._observers:
+            try:
+                observer(provider, model, elapsed, error)
+            except Exception as e:
+                logger.warning(f"LLM observer failed: {str(e)}")
+
+    def _record(self, call_site: str, elapsed: float, usage: Optional[Dict[str, Any]], error: bool):
+        stats = self._call_stats.setdefault(call_site, {
+            "calls": 0,
+            "errors": 0,
+            "total_time": 0.0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0
+        })
+        stats["calls"] += 1
+        stats["total_time"] += elapsed
+        if error:
+            stats["errors"] += 1
+        else:
+            self._latencies.setdefault(call_site, deque(maxlen=200)).append(elapsed)
+        if usage:
+            stats["prompt_tokens"] += usage.get("prompt_tokens", 0) or 0
+            stats["completion_tokens"] += usage.get("completion_tokens", 0) or 0
+
+    async def chat(self, provider: str, model: str, messages: List[Dict[str, str]],
+                   call_site: Optional[str] = None, use_cache: bool = True, **params) -> str:
+        """
+        Send a chat completion and return the message content ("" when empty).
+        Extra keyword arguments (max_tokens, temperature, ...) are passed through.
+        Identical low-temperature requests are answered from the response cache
+        unless `use_cache` is False.
+        """
+        call_site = call_site or f"{provider}:{model}"
+        url = f"{PROVIDERS.get(provider, {}).get('base_url', '')}/chat/completions"
+        params = {k: v for k, v in params.items() if v is not None}
+        payload = {"model": model, "messages": messages, **params}
+
+        cache_key = self.cache.key(provider, model, messages, params) if use_cache else None
+        if cache_key is not None:
+            cached = await self.cache.aget(cache_key, call_site)
+            if cached is not None:
+                return cached
+
+        reserved = estimate_request_tokens(messages, params.get("max_tokens"))
+        content, usage = await self._rate_limited(
+            provider, call_site, reserved,
+            lambda: self._post_chat(provider, model, url, payload, call_site)
+        )
+        self._limiter(provider).settle(reserved, (usage or {}).get("total_tokens"))
+
+        if cache_key is not None:
+            await self.cache.aput(cache_key, content)
+        return content
+
+    async def chat_stream(self, provider: str, model: str, messages: List[Dict[str, str]],
+                          call_site: Optional[str] = None, use_cache: bool = True, **params) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding content deltas as the provider sends them.
+        Shares the cache, rate limits and statistics of `chat`; a cached reply is
+        yielded as a single delta.
+        """
+        call_site = call_site or f"{provider}:{model}"
+        url = f"{PROVIDERS.get(provider, {}).get('base_url', '')}/chat/completions"
+        params = {k: v for k, v in params.items() if v is not None}
+        payload = {"model": model, "messages": messages, **params, "stream": True}
+
+        cache_key = self.cache.key(provider, model, messages, params) if use_cache else None
+        if cache_key is not None:
+            cached = await self.cache.aget(cache_key, call_site)
+            if cached is not None:
+                yield cached
+                return
+
+        reserved = estimate_request_tokens(messages, params.get("max_tokens"))
+        response, start_time = await self._rate_limited(
+            provider, call_site, reserved,
+            lambda: self._open_stream(provider, model, url, payload, call_site)
+        )
+
+        parts: List[str] = []
+        usage = None
+        try:
+            # Server-sent events: one "data: {json}" line per chunk, ending with "data: [DONE]"
+            async for raw_line in response.content:
+                line = raw_line.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                # OpenAI-style usage on the last chunk; Groq reports it under x_groq
+                usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage") or usage
+                choices = chunk.get("choices") or []
+                delta = ((choices[0].get("delta") or {}).get("content") if choices else None) or ""
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            elapsed = time.perf_counter() - start_time
+            self._record(call_site, elapsed, None, True)
+            error = LLMError(f"{provider} stream failed: {str(e) or type(e).__name__}", provider=provider)
+            self._notify(provider, model, elapsed, error)
+            raise error from e
+        finally:
+            response.release()
+
+        elapsed = time.perf_counter() - start_time
+        self._record(call_site, elapsed, usage, False)
+        self._notify(provider, model, elapsed, None)
+        self._limiter(provider).settle(reserved, (usage or {}).get("total_tokens"))
+        if cache_key is not None:
+            await self.cache.aput(cache_key, "".join(parts))
+
+    async def _rate_limited(self, provider: str, call_site: str, reserved: int,
+                            send: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Wait our turn under the provider's request and token rate limits before `send`,
+        and on a 429 pause the provider and queue again instead of failing the call.
+        """
+        limiter = self._limiter(provider)
+        for attempt in range(self.rate_limit_retries + 1):
+            await limiter.acquire(reserved)
+            try:
+                return await send()
+            except LLMError as e:
+                if e.status != 429 or attempt == self.rate_limit_retries:
+                    raise
+                delay = e.retry_after if e.retry_after is not None else self.rate_limit_backoff * (2 ** attempt)
+                logger.warning(f"{provider} rate limited {call_site}, retrying in {delay:.1f}s")
+                limiter.pause(delay)
+
+    async def _post_chat(self, provider: str, model: str, url: str, payload: Dict[str, Any],
+                         call_site: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """One chat-completion request; returns (content, usage)."""
+        start_time = time.perf_counter()
+        usage = None
+        try:
+            session = self._get_session()
+            async with session.post(url, json=payload, headers=self._headers(provider)) as response:
+                if response.status != 200:
+                    raise await self._status_error(provider, response)
+                data = await response.json()
+
+            choices = data.get("choices") or []
+            if not choices:
+                raise LLMError(f"{provider} returned no choices", provider=provider)
+            usage = data.get("usage")
+            content = (choices[0].get("message") or {}).get("content") or ""
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            elapsed = time.perf_counter() - start_time
+            self._record(call_site, elapsed, None, True)
+            error = LLMError(f"{provider} request failed: {str(e) or type(e).__name__}", provider=provider)
+            self._notify(provider, model, elapsed, error)
+            raise error from e
+        except Exception as e:
+            elapsed = time.perf_counter() - start_time
+            self._record(call_site, elapsed, None, True)
+            self._notify(provider, model, elapsed, e)
+            raise
+
+        elapsed = time.perf_counter() - start_time
+        self._record(call_site, elapsed, usage, False)
+        self._notify(provider, model, elapsed, None)
+        return content, usage
+
+    async def _open_stream(self, provider: str, model: str, url: str, payload: Dict[str, Any],
+                           call_site: str) -> Tuple[aiohttp.ClientResponse, float]:
+        """Start a streamed request; returns the open response and its start time."""
+        start_time = time.perf_counter()
+        try:
+            session = self._get_session()
+            response = await session.post(url, json=payload, headers=self._headers(provider))
+            if response.status != 200:
+                try:
+                    raise await self._status_error(provider, response)
+                finally:
+                    response.release()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            elapsed = time.perf_counter() - start_time
+            self._record(call_site, elapsed, None, True)
+            error = LLMError(f"{provider} request failed: {str(e) or type(e).__name__}", provider=provider)
+            self._notify(provider, model, elapsed, error)
+            raise error from e
+        except Exception as e:
+            elapsed = time.perf_counter() - start_time
+            self._record(call_site, elapsed, None, True)
+            self._notify(provider, model, elapsed, e)
+            raise
+        return response, start_time
+
+    async def _status_error(self, provider: str, response: aiohttp.ClientResponse) -> LLMError:
+        detail = await response.text()
+        return LLMError(
+            f"{provider} returned HTTP {response.status}: {detail[:200]}",
+            provider=provider,
+            status=response.status,
+            retry_after=_parse_retry_after(response.headers.get("Retry-After"))
+        )
+
+    async def list_models(self, provider: str) -> List[str]:
+        """Return the model ids a provider currently serves."""
+        url = f"{PROVIDERS.get(provider, {}).get('base_url', '')}/models"
+        session = self._get_session()
+        async with session.get(url, headers=self._headers(provider)) as response:
+            if response.status != 200:
+                raise LLMError(f"{provider} returned HTTP {response.status}", provider=provider, status=response.status)
+            data = await response.json()
+        return [m.get("id", "") for m in data.get("data", [])]
+
+    def latency_percentile(self, call_site: str, percentile: float, min_samples: int = 10) -> Optional[float]:
+        """Recent latency percentile of a call site, or None until enough calls succeeded."""
+        latencies = self._latencies.get(call_site)
+        if not latencies or len(latencies) < min_samples:
+            return None
+        return float(np.percentile(np.fromiter(latencies, dtype=float), percentile))
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-call-site request counts, latency and token usage."""
+        return {
+            "pool": {
+                "max_connections": self.max_connections,
+                "max_connections_per_host": self.max_connections_per_host,
+                "keepalive_timeout": self.keepalive_timeout
+            },
+            "call_sites": {
+                site: {
+                    **stats,
+                    "total_time": round(stats["total_time"], 3),
+                    "avg_latency": round(stats["total_time"] / stats["calls"], 3) if stats["calls"] else 0.0,
+                    "p50_latency": round(self.latency_percentile(site, 50, min_samples=1) or 0.0, 3),
+                    "p95_latency": round(self.latency_percentile(site, 95, min_samples=1) or 0.0, 3)
+                }
+                for site, stats in self._call_stats.items()
+            },
+            "cache": self.cache.stats(),
+            "rate_limits": {provider: limiter.stats() for provider, limiter in self._limiters.items()}
+        }
+
+    async def close(self):
+        """Close the pooled session and its keep-alive connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+        self.cache.close()
+
+# Shared client for the whole process
+llm_client = LLMClient()
@@ -0,0 +1,252 @@
+import re
+import json
+import math
+import asyncio
+import hashlib
+import logging
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from app.config import SUMMARY_SECTION_TOKENS, SUMMARY_REDUCE_TOKENS, SUMMARY_CONCURRENCY
+from app.services.text_chunker import estimate_tokens, split_sentences, chunk_text, CHARS_PER_TOKEN
+from app.services.llm_client import llm_client
+
+logger = logging.getLogger(__name__)
+
+# A partial summary: {"summary": str, "key_points": [str], "action_items": [str]}
+Partial = Dict[str, Any]
+# summarize_section(section text) -> partial summary
+SectionSummarizer = Callable[[str], Awaitable[Partial]]
+# merge(partials) -> one partial summary covering all of them
+PartialMerger = Callable[[List[Partial]], Awaitable[Partial]]
+
+# Bump when the section or merge prompts change so stale partials are not reused
+PARTIAL_CACHE_VERSION = "1"
+
+# Sentences on each side of a gap compared for lexical cohesion
+_COHESION_WINDOW = 3
+# How far similarity must dip below the surrounding peaks to count as a topic shift
+_TOPIC_DEPTH = 0.2
+_WORD = re.compile(r"[a-z][a-z']{2,}")
+_STOPWORDS = frozenset("""
+    the and for are but not you all any can had her was one our out has him his how its may new now
+    see two who did get got let say she too use that with have this will your from they know want been
+    good much some time very when come here just like long make many more only over such take than them
+    then were what well also into about there their would could should which these those because really
+    think going yeah okay right just actually something thing things people
+""".split())
+
+def _content_words(text: str) -> Counter:
+    return Counter(w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS)
+
+def _cosine(a: Counter, b: Counter) -> float:
+    if not a or not b:
+        return 0.0
+    dot = sum(count * b[word] for word, count in a.items() if word in b)
+    return dot / (math.sqrt(sum(c * c for c in a.values())) * math.sqrt(sum(c * c for c in b.values())))
+
+def topic_boundaries(units: List[str]) -> List[bool]:
+    """
+    Flag the gaps before each unit where the topic likely changes (TextTiling-style):
+    the vocabulary of the units before and after the gap overlaps least. A gap is a
+    boundary when its window cosine similarity is a local minimum lying at least
+    _TOPIC_DEPTH below the nearest peaks on both sides. Only nearby units affect a
+    gap, so an edit moves boundaries close to it and nowhere else.
+    """
+    n = len(units)
+    boundaries = [False] * n
+    if n < 2 * _COHESION_WINDOW:
+        return boundaries
+    words = [_content_words(u) for u in units]
+    similarity = [1.0] * n
+    for gap in range(1, n):
+        left = sum(words[max(0, gap - _COHESION_WINDOW):gap], Counter())
+        right = sum(words[gap:gap + _COHESION_WINDOW], Counter())
+        similarity[gap] = _cosine(left, right)
+
+    for gap in range(1, n):
+        nearby = range(max(1, gap - _COHESION_WINDOW), min(n, gap + _COHESION_WINDOW + 1))
+        if similarity[gap] > min(similarity[i] for i in nearby):
+            continue
+        left_peak = max(similarity[i] for i in nearby if i <= gap)
+        right_peak = max(similarity[i] for i in nearby if i >= gap)
+        if left_peak - similarity[gap] >= _TOPIC_DEPTH and right_peak - similarity[gap] >= _TOPIC_DEPTH:
+            boundaries[gap] = True
+    return boundaries
+
+def split_sections(text: str, max_tokens: int = SUMMARY_SECTION_TOKENS) -> List[str]:
+    """
+    Split a transcript into sections of at most `max_tokens` (estimated) for summarizing.
+
+    Sections are built from whole sentences. Paragraph breaks and lexical topic
+    shifts end a section once it holds at least half the budget; otherwise it
+    is cut when the next sentence would overflow it. Cutting at topic shifts
+    keeps sections stable when the transcript changes elsewhere, so their
+    cached partial summaries stay valid.
+    """
+    units: List[str] = []
+    breaks: List[bool] = []
+    for paragraph in re.split(r"\n\s*\n", text.strip()):
+        first = True
+        for line in paragraph.splitlines():
+            for sentence in split_sentences(line):
+                for piece in (chunk_text(sentence, max_tokens) if estimate_tokens(sentence) > max_tokens else [sentence]):
+                    units.append(piece)
+                    breaks.append(first)
+                    first = False
+
+    shifts = topic_boundaries(units)
+    sections: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for index, unit in enumerate(units):
+        tokens = estimate_tokens(unit) + 1
+        boundary = breaks[index] or shifts[index]
+        if current and (current_tokens + tokens > max_tokens or (boundary and current_tokens >= max_tokens / 2)):
+            sections.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += tokens
+    if current:
+        sections.append(" ".join(current))
+    return sections
+
+def _partial_tokens(partial: Partial) -> int:
+    return estimate_tokens(json.dumps(partial, ensure_ascii=False))
+
+def _dedupe(items: List[str]) -> List[str]:
+    seen = set()
+    result = []
+    for item in items:
+        key = item.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            result.append(item.strip())
+    return result
+
+class MapReduceSummarizer:
+    """
+    Summarizes transcripts too long for one prompt.
+
+    The transcript is split into sections on topic and token boundaries, and
+    every section is summarized into a partial summary with at most
+    `concurrency` calls in flight. While the partials together are larger than
+    `reduce_tokens` they are merged in groups, level by level, so the final
+    reduce call always fits. Section partials are stored in the shared LLM
+    response cache keyed by their text, so summarizing an edited or extended
+    transcript only redoes the sections that changed. A section whose call
+    fails falls back to its opening sentences and is not cached.
+    """
+
+    def __init__(self, section_tokens: int = SUMMARY_SECTION_TOKENS,
+                 reduce_tokens: int = SUMMARY_REDUCE_TOKENS,
+                 concurrency: int = SUMMARY_CONCURRENCY,
+                 cache=None):
+        self.section_tokens = section_tokens
+        self.reduce_tokens = reduce_tokens
+        self.concurrency = concurrency
+        self.cache = cache if cache is not None else llm_client.cache
+
+    def _cache_key(self, kind: str, content: str) -> Optional[str]:
+        if not self.cache.enabled:
+            return None
+        digest = hashlib.sha256(f"{kind}:{PARTIAL_CACHE_VERSION}:{content}".encode("utf-8")).hexdigest()
+        return f"map_reduce:{digest}"
+
+    async def _cached(self, kind: str, content: str, produce: Callable[[], Awaitable[Partial]],
+                      stats: Dict[str, int]) -> Partial:
+        key = self._cache_key(kind, content)
+        if key is not None:
+            cached = await self.cache.aget(key, call_site=kind)
+            if cached is not None:
+                stats["cached"] += 1
+                return json.loads(cached)
+        partial = await produce()
+        if key is not None:
+            await self.cache.aput(key, json.dumps(partial, ensure_ascii=False))
+        return partial
+
+    @staticmethod
+    def _fallback_partial(text: str) -> Partial:
+        """The opening sentences of a section when its summary call failed."""
+        summary = ""
+        for sentence in split_sentences(text):
+            if summary and len(summary) + len(sentence) > 400:
+                break
+            summary = f"{summary} {sentence}".strip()
+        return {"summary": summary[:600], "key_points": [], "action_items": []}
+
+    @staticmethod
+    def _concatenate(partials: List[Partial], max_chars: int) -> Partial:
+        """Merge partials without an LLM when the merge call failed."""
+        summary = " ".join(p.get("summary", "") for p in partials).strip()
+        return {
+            "summary": summary[:max_chars],
+            "key_points": _dedupe([k for p in partials for k in p.get("key_points", [])]),
+            "action_items": _dedupe([a for p in partials for a in p.get("action_items", [])])
+        }
+
+    def _groups(self, partials: List[Partial]) -> List[List[Partial]]:
+        """Pack consecutive partials into groups within the reduce budget, at least two per group."""
+        groups: List[List[Partial]] = []
+        current: List[Partial] = []
+        size = 0
+        for partial in partials:
+            tokens = _partial_tokens(partial)
+            if len(current) >= 2 and size + tokens > self.reduce_tokens:
+                groups.append(current)
+                current, size = [], 0
+            current.append(partial)
+            size += tokens
+        if current:
+            if len(current) == 1 and groups:
+                groups[-1].append(current[0])
+            else:
+                groups.append(current)
+        return groups
+
+    async def collapse(self, text: str, summarize_section: SectionSummarizer,
+                       merge: PartialMerger) -> Dict[str, Any]:
+        """
+        Map the sections of `text` to partial summaries and merge them until they fit
+        one reduce call. Returns {"partials", "sections", "cached", "failed", "levels"}.
+        """
+        sections = split_sections(text, self.section_tokens)
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+        stats = {"cached": 0, "failed": 0}
+
+        async def map_one(index: int, section: str) -> Partial:
+            async with semaphore:
+                try:
+                    return await self._cached("summarize_section", section, lambda: summarize_section(section), stats)
+                except Exception as e:
+                    logger.warning(f"Summary of section {index} failed, using its opening sentences: {str(e)}")
+                    stats["failed"] += 1
+                    return self._fallback_partial(section)
+
+        partials = list(await asyncio.gather(*(map_one(i, s) for i, s in enumerate(sections))))
+
+        levels = 0
+        while len(partials) > 1 and sum(_partial_tokens(p) for p in partials) > self.reduce_tokens:
+            levels += 1
+
+            async def merge_one(group: List[Partial]) -> Partial:
+                async with semaphore:
+                    content = json.dumps(group, ensure_ascii=False, sort_keys=True)
+                    try:
+                        return await self._cached("merge_section_summaries", content, lambda: merge(group), stats)
+                    except Exception as e:
+                        logger.warning(f"Merging {len(group)} section summaries failed, concatenating: {str(e)}")
+                        stats["failed"] += 1
+                        return self._concatenate(group, self.reduce_tokens * CHARS_PER_TOKEN // 2)
+
+            partials = list(await asyncio.gather(*(merge_one(g) for g in self._groups(partials))))
+
+        logger.info(f"Map-reduce summary: {len(sections)} sections, {stats['cached']} cached, "
+                    f"{stats['failed']} failed, {levels} merge levels")
+        return {
+            "partials": partials,
+            "sections": len(sections),
+            "cached": stats["cached"],
+            "failed": stats["failed"],
+            "levels": levels
+        }
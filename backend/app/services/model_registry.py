@@ -0,0 +1,114 @@
+import threading
+import time
+import logging
+from typing import Dict, Any, Optional, Tuple
+import torch
+import whisper
+from app.config import WHISPER_MODEL, WHISPER_DEVICE, WHISPER_PRECISION
+
+logger = logging.getLogger(__name__)
+
+ModelKey = Tuple[str, str, str]
+
+class WhisperModelRegistry:
+    """
+    Process-wide registry of loaded Whisper models.
+
+    Models are keyed by (model name, device, precision), loaded lazily on
+    first acquire and shared by every service in the worker. Each entry is
+    reference-counted so a model can be dropped once nothing holds it.
+    """
+
+    def __init__(self):
+        self._models: Dict[ModelKey, Any] = {}
+        self._refcounts: Dict[ModelKey, int] = {}
+        self._load_times: Dict[ModelKey, float] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[ModelKey, threading.Lock] = {}
+
+    def resolve_key(self, name: Optional[str] = None, device: Optional[str] = None,
+                    precision: Optional[str] = None) -> ModelKey:
+        """Fill in configured defaults for a (name, device, precision) key."""
+        name = name or WHISPER_MODEL
+        device = device or WHISPER_DEVICE
+        if device == "auto":
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+        precision = precision or WHISPER_PRECISION
+        if precision == "auto":
+            precision = "fp16" if device.startswith("cuda") else "fp32"
+        # fp16 kernels are not available on CPU, Whisper silently falls back to fp32
+        if precision == "fp16" and not device.startswith("cuda"):
+            precision = "fp32"
+        return (name, device, precision)
+
+    def acquire(self, name: Optional[str] = None, device: Optional[str] = None,
+                precision: Optional[str] = None) -> Any:
+        """Return the shared model for a key, loading it on first use."""
+        key = self.resolve_key(name, device, precision)
+
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._refcounts[key] += 1
+                return model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so other keys are not blocked,
+        # but only once per key even when several callers race here.
+        with load_lock:
+            with self._lock:
+                model = self._models.get(key)
+                if model is not None:
+                    self._refcounts[key] += 1
+                    return model
+
+            start_time = time.time()
+            logger.info(f"Loading Whisper model {key[0]} on {key[1]} ({key[2]})")
+            model = whisper.load_model(key[0], device=key[1])
+            load_time = time.time() - start_time
+            logger.info(f"Whisper model {key[0]} loaded in {load_time:.2f}s")
+
+            with self._lock:
+                self._models[key] = model
+                self._refcounts[key] = 1
+                self._load_times[key] = load_time
+            return model
+
+    def release(self, name: Optional[str] = None, device: Optional[str] = None,
+                precision: Optional[str] = None, unload: bool = False) -> None:
+        """Drop one reference; unload the model when the count reaches zero and unload is set."""
+        key = self.resolve_key(name, device, precision)
+        with self._lock:
+            if key not in self._refcounts:
+                return
+            self._refcounts[key] = max(0, self._refcounts[key] - 1)
+            if unload and self._refcounts[key] == 0:
+                self._models.pop(key, None)
+                self._refcounts.pop(key, None)
+                self._load_times.pop(key, None)
+                logger.info(f"Unloaded Whisper model {key[0]} on {key[1]} ({key[2]})")
+                if key[1].startswith("cuda"):
+                    torch.cuda.empty_cache()
+
+    def is_fp16(self, key: ModelKey) -> bool:
+        """Whether transcribe calls for this key should run in half precision."""
+        return key[2] == "fp16"
+
+    def stats(self) -> Dict[str, Any]:
+        """Loaded models with their reference counts and load times."""
+        with self._lock:
+            return {
+                "loaded_models": [
+                    {
+                        "model": key[0],
+                        "device": key[1],
+                        "precision": key[2],
+                        "refcount": self._refcounts.get(key, 0),
+                        "load_time": round(self._load_times.get(key, 0.0), 3)
+                    }
+                    for key in self._models
+                ]
+            }
+
+# Shared registry for the whole process
+model_registry = WhisperModelRegistry()
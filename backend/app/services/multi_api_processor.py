@@ -1,89 +1,139 @@
 import asyncio
 import time
 import logging
-from typing import Dict, Any, List, Optional
-import aiohttp
-from groq import Groq
-import openai
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 import numpy as np
-import whisper
 from app.config import (
-    GROQ_API_KEY, OPENROUTER_API_KEY,
     GROQ_MODEL, OPENROUTER_MODEL,
     GROQ_MODEL_2, OPENROUTER_MODEL_2, OPENROUTER_MODEL_3
 )
-from app.config import TRANSCRIPTION_LANGUAGE
+from app.config import (
+    TRANSCRIPTION_LANGUAGE, WHISPER_PROCESS_MIN_SECONDS, VAD_CHUNKING, SPEECH_GATE,
+    WHISPER_CHUNK_SECONDS, WHISPER_CHUNK_OVERLAP_SECONDS,
+    IMPROVEMENT_MODE, IMPROVEMENT_HEDGE_PERCENTILE, IMPROVEMENT_HEDGE_DEFAULT_DELAY,
+    ENSEMBLE_MODELS, COMBINER, LLM_CORRECTION_CHUNK_TOKENS, LLM_CORRECTION_CONCURRENCY,
+    CORRECTION_PROTOCOL, SELECTIVE_CORRECTION
+)
 from app.services.audio_processor import AudioProcessor
+from app.services.model_registry import model_registry
+from app.services.inference_executor import inference_executor
+from app.services.llm_client import llm_client
+from app.services.provider_router import provider_router
+from app.services.batched_transcriber import BatchedTranscriber
+from app.services.process_transcriber import process_transcriber
+from app.services.chunk_planner import ChunkPlanner
+from app.services.transcript_stitcher import TranscriptStitcher, segments_from_whisper
+from app.services.streaming_transcriber import StreamingSession
+from app.services.realtime_scheduler import realtime_scheduler
+from app.services.speech_gate import SpeechGate
+from app.services.hedging import first_acceptable
+from app.services.rover_combiner import RoverCombiner
+from app.services.text_chunker import chunk_text, map_chunks, estimate_tokens, CHARS_PER_TOKEN
+from app.services.selective_correction import SelectiveCorrector
+from app.services.edit_protocol import (
+    EditProtocolError, edit_messages, parse_edits, apply_edits, correction_metrics
+)
 
 logger = logging.getLogger(__name__)
 
+# Ensemble members: key -> (provider, model, provider label, call site)
+ENSEMBLE_MEMBERS = {
+    "groq_llama33_70b": ("groq", GROQ_MODEL, "Groq", "_transcribe_with_groq_llama33"),
+    "groq_llama31_70b": ("groq", GROQ_MODEL_2, "Groq", "_transcribe_with_groq_llama31"),
+    "openrouter_gpt4o_mini": ("openrouter", OPENROUTER_MODEL, "OpenRouter", "_transcribe_with_openrouter_gpt4o"),
+    "openrouter_claude_haiku": ("openrouter", OPENROUTER_MODEL_2, "OpenRouter", "_transcribe_with_openrouter_claude"),
+    "openrouter_gemini_flash": ("openrouter", OPENROUTER_MODEL_3, "OpenRouter", "_transcribe_with_openrouter_gemini"),
+}
+
 class MultiAPIProcessor:
     def __init__(self):
-        # Initialize Groq clients with different models
-        self.groq_client = Groq(api_key=GROQ_API_KEY)
-        self.groq_client_2 = Groq(api_key=GROQ_API_KEY)  # Same key, different model
-
-        # Initialize OpenRouter clients with different models
-        self.openai_client = openai.OpenAI(
-            api_key=OPENROUTER_API_KEY,
-            base_url="https://openrouter.ai/api/v1"
-        )
-        self.openai_client_2 = openai.OpenAI(
-            api_key=OPENROUTER_API_KEY,
-            base_url="https://openrouter.ai/api/v1"
-        )
-        self.openai_client_3 = openai.OpenAI(
-            api_key=OPENROUTER_API_KEY,
-            base_url="https://openrouter.ai/api/v1"
-        )
+        # All LLM traffic goes through the shared pooled async client
+        self.llm = llm_client
+        # Task-level calls (correct, combine) go to the fastest healthy backend
+        self.router = provider_router
 
         self.audio_processor = AudioProcessor()
-        # Initialize Whisper model - using 'large-v3' for maximum accuracy
-        self.whisper_model = whisper.load_model("large-v3")
+        # Whisper comes from the process-wide registry so every service shares one copy;
+        # the model itself is only loaded on first use
+        self.whisper_key = model_registry.resolve_key()
+        # Precision belongs to the model key (WHISPER_PRECISION), so every call site decodes
+        # alike: fp16 on CUDA under "auto", where some used to pass fp16=False. CPU is always
+        # fp32. WHISPER_PRECISION=fp32 restores full precision everywhere.
+        self.whisper_fp16 = model_registry.is_fp16(self.whisper_key)
+        self._whisper_model = None
+        # Executor threads may race on the first access; only one may take the reference
+        self._whisper_lock = threading.Lock()
+        self.batched_transcriber = BatchedTranscriber()
+        self.chunk_planner = ChunkPlanner(self.audio_processor)
+        self.stitcher = TranscriptStitcher()
+        self.combiner = RoverCombiner()
+        self.selective_corrector = SelectiveCorrector()
         self.min_audio_length = 0.5  # Minimum 0.5 seconds of audio before processing
-        self.audio_buffer = []  # Buffer for accumulating audio chunks
+        # Fallback no-speech gate for callers without their own session (HTTP chunks)
+        self.speech_gate = SpeechGate()
+
+    @property
+    def whisper_model(self):
+        """Shared Whisper model, acquired from the registry on first access."""
+        if self._whisper_model is None:
+            with self._whisper_lock:
+                if self._whisper_model is None:
+                    self._whisper_model = model_registry.acquire(*self.whisper_key)
+        return self._whisper_model
+
+    async def _get_whisper_model(self):
+        """Shared Whisper model; the first load runs on the executor, not the event loop."""
+        if self._whisper_model is not None:
+            return self._whisper_model
+        return await inference_executor.run(lambda: self.whisper_model, label="whisper_load")
+
+    async def _whisper_transcribe(self, audio: np.ndarray, **options) -> Dict[str, Any]:
+        """Run Whisper on the inference executor so the event loop stays free."""
+        model = await self._get_whisper_model()
+        options.setdefault("fp16", self.whisper_fp16)
+        return await inference_executor.transcribe(model, audio, **options)
+
+    async def _whisper_transcribe_batch(self, chunks: List[np.ndarray], language: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Decode many short chunks with batched Whisper passes on the inference executor."""
+        model = await self._get_whisper_model()
+        return await inference_executor.run(
+            self.batched_transcriber.transcribe_chunks,
+            model, chunks, language, self.whisper_fp16,
+            model=model,
+            label="transcribe_batch"
+        )
+
+    def release_models(self, unload: bool = False):
+        """Return the Whisper model reference held by this processor; with unload, free it once unused."""
+        with self._whisper_lock:
+            if self._whisper_model is None:
+                return
+            self._whisper_model = None
+        model_registry.release(*self.whisper_key, unload=unload)
 
     async def check_apis(self) -> Dict[str, bool]:
         """Check if all APIs and models are accessible."""
-        results = {}
+        models_by_key = {key: (provider, model) for key, (provider, model, _, _) in ENSEMBLE_MEMBERS.items()}
 
-        # Check Groq models
-        try:
-            self.groq_client.models.list()
-            results["groq_llama33_70b"] = True
-        except Exception as e:
-            logger.error(f"Groq API check failed: {str(e)}")
-            results["groq_llama33_70b"] = False
-
-        try:
-            self.groq_client_2.models.list()
-            results["groq_llama31_70b"] = True
-        except Exception as e:
-            logger.error(f"Groq API 2 check failed: {str(e)}")
-            results["groq_llama31_70b"] = False
-
-        # Check OpenRouter models
-        try:
-            self.openai_client.models.list()
-            results["openrouter_gpt4o_mini"] = True
-        except Exception as e:
-            logger.error(f"OpenRouter API check failed: {str(e)}")
-            results["openrouter_gpt4o_mini"] = False
-
-        try:
-            self.openai_client_2.models.list()
-            results["openrouter_claude_haiku"] = True
-        except Exception as e:
-            logger.error(f"OpenRouter API 2 check failed: {str(e)}")
-            results["openrouter_claude_haiku"] = False
-
-        try:
-            self.openai_client_3.models.list()
-            results["openrouter_gemini_flash"] = True
-        except Exception as e:
-            logger.error(f"OpenRouter API 3 check failed: {str(e)}")
-            results["openrouter_gemini_flash"] = False
+        # One model listing per provider, fetched concurrently
+        providers = sorted({provider for provider, _ in models_by_key.values()})
+        listings = await asyncio.gather(
+            *[self.llm.list_models(provider) for provider in providers],
+            return_exceptions=True
+        )
+        available = {}
+        for provider, listing in zip(providers, listings):
+            if isinstance(listing, Exception):
+                logger.error(f"{provider} API check failed: {str(listing)}")
+                available[provider] = None
+            else:
+                available[provider] = set(listing)
 
+        results = {}
+        for key, (provider, model) in models_by_key.items():
+            models = available.get(provider)
+            results[key] = models is not None and model in models
         return results
 
     async def process_transcription_2_model(self, audio_data: np.ndarray) -> Dict[str, Any]:
@@ -95,37 +145,55 @@ class MultiAPIProcessor:
 
         # Step 1: Get Whisper transcription first (fast baseline)
         logger.info("🎯 Step 1: Fast Whisper transcription")
-        whisper_result = self.whisper_model.transcribe(audio_data, fp16=True, language="en")
+        whisper_result = await self._whisper_transcribe(audio_data, language="en")
         whisper_text = str(whisper_result.get("text", "")).strip()
         logger.info(f"📝 Whisper transcription: {len(whisper_text)} characters")
 
-        # Step 2: Run 2 LLM improvements in parallel on the Whisper text
-        logger.info("🚀 Step 2: Parallel 2-model LLM improvements")
-
-        improvement_tasks = [
-            self._improve_with_groq_llama33(whisper_text),
-            self._improve_with_openrouter_gpt4o(whisper_text),
+        # Step 2: LLM improvement of the Whisper text
+        improvers = [
+            ("_improve_with_groq_llama33", self._improve_with_groq_llama33),
+            ("_improve_with_openrouter_gpt4o", self._improve_with_openrouter_gpt4o),
         ]
-
-        improvement_results = await asyncio.gather(*improvement_tasks, return_exceptions=True)
-
-        # Extract successful results
-        successful_results = []
-        for i, result in enumerate(improvement_results):
-            if isinstance(result, dict) and result.get("text"):
-                successful_results.append(result)
-                logger.info(f"✅ Model {i+1} successful: {len(result['text'])} chars")
-            else:
-                logger.warning(f"❌ Model {i+1} failed: {str(result) if not isinstance(result, Exception) else str(result)}")
-
-        # Step 3: Combine results
+        improvement_details: Dict[str, Any] = {"improvement_mode": IMPROVEMENT_MODE}
+
+        if IMPROVEMENT_MODE in ("race", "hedge"):
+            # First acceptable improvement wins; the slower call is cancelled
+            hedge_delay = None
+            if IMPROVEMENT_MODE == "hedge":
+                primary_site = f"{improvers[0][0]}:edits" if CORRECTION_PROTOCOL == "edits" else improvers[0][0]
+                hedge_delay = self.llm.latency_percentile(primary_site, IMPROVEMENT_HEDGE_PERCENTILE) \
+                    or IMPROVEMENT_HEDGE_DEFAULT_DELAY
+            logger.info(f"🚀 Step 2: {IMPROVEMENT_MODE} between 2 LLM improvements")
+            race = await first_acceptable(
+                [lambda improve=improve: improve(whisper_text) for _, improve in improvers],
+                accept=self._is_acceptable_improvement,
+                hedge_delay=hedge_delay
+            )
+            successful_results = [race["result"]] if race["index"] is not None else []
+            improvement_details.update({
+                "improvement_winner": improvers[race["index"]][0] if race["index"] is not None else None,
+                "hedged": race["hedged"],
+                "hedge_delay": round(hedge_delay, 3) if hedge_delay is not None else None,
+                "improvement_attempts": [
+                    {**attempt, "call_site": improvers[attempt["index"]][0]} for attempt in race["attempts"]
+                ]
+            })
+        else:
+            logger.info("🚀 Step 2: Parallel 2-model LLM improvements")
+            improvement_results = await asyncio.gather(
+                *(improve(whisper_text) for _, improve in improvers), return_exceptions=True
+            )
+            successful_results = []
+            for i, result in enumerate(improvement_results):
+                if self._is_acceptable_improvement(result):
+                    successful_results.append(result)
+                    logger.info(f"✅ Model {i+1} successful: {len(result['text'])} chars")
+                else:
+                    logger.warning(f"❌ Model {i+1} failed: {str(result)}")
+
+        # Step 3: Use the first successful result
         if successful_results:
-            if len(successful_results) == 1:
-                # Only one successful result
-                final_transcription = successful_results[0]["text"]
-            else:
-                # Combine multiple results using simple selection (fastest approach)
-                final_transcription = successful_results[0]["text"]  # Use first successful result
+            final_transcription = successful_results[0]["text"]
         else:
             # Fallback to Whisper only
             logger.warning("⚠️ All LLM improvements failed, using Whisper only")
@@ -140,6 +208,7 @@ class MultiAPIProcessor:
             "method": "2_model_parallel",
             "whisper_text_length": len(whisper_text),
             "llm_improvements_successful": len(successful_results),
+            **improvement_details,
             "transcription_length": len(final_transcription)
         }
 
@@ -150,37 +219,85 @@ class MultiAPIProcessor:
         """
         start_time = time.time()
 
-        # Step 1: Chunk audio into 20-second segments for better parallel processing
+        # Step 1: Plan chunks around speech (or fixed overlapping windows) for parallel processing
         logger.info("🎯 Step 1: Audio chunking for parallel processing")
-        audio_chunks = self._chunk_audio_data(audio_data, chunk_duration=20.0)  # 20-second chunks
-        logger.info(f"📦 Split audio into {len(audio_chunks)} chunks")
-
-        # Step 2: Process all audio chunks in parallel with Whisper
-        logger.info("🚀 Step 2: Parallel Whisper transcription")
-        whisper_tasks = [
-            self._transcribe_audio_chunk(chunk) for chunk in audio_chunks
-        ]
-        whisper_results = await asyncio.gather(*whisper_tasks, return_exceptions=True)
+        skipped_seconds = 0.0
+        if VAD_CHUNKING:
+            chunk_plan = self.chunk_planner.plan(audio_data, 16000)
+            chunk_bounds = [(c["start_sample"], c["end_sample"]) for c in chunk_plan["chunks"]]
+            skipped_seconds = chunk_plan["skipped_seconds"]
+        else:
+            chunk_bounds = self._chunk_audio_bounds(
+                len(audio_data),
+                chunk_duration=WHISPER_CHUNK_SECONDS,
+                overlap=WHISPER_CHUNK_OVERLAP_SECONDS
+            )
+        audio_chunks = [audio_data[start:end] for start, end in chunk_bounds]
+        logger.info(f"📦 Split audio into {len(audio_chunks)} chunks ({skipped_seconds:.1f}s of silence skipped)")
+
+        # Step 2: Transcribe all audio chunks with Whisper
+        audio_duration = len(audio_data) / 16000
+        if process_transcriber.enabled and audio_duration >= WHISPER_PROCESS_MIN_SECONDS:
+            # Long uploads: worker processes decode slices of one shared-memory buffer
+            logger.info(f"🚀 Step 2: Multi-process Whisper transcription ({process_transcriber.workers} workers)")
+            whisper_results = await process_transcriber.transcribe(audio_data, chunk_bounds, self.whisper_key)
+        elif self.batched_transcriber.batch_size > 1:
+            # Padded chunks share batched encoder/decoder passes
+            logger.info(f"🚀 Step 2: Batched Whisper transcription (batch size {self.batched_transcriber.batch_size})")
+            whisper_results = await self._whisper_transcribe_batch(audio_chunks)
+        else:
+            logger.info("🚀 Step 2: Parallel Whisper transcription")
+            whisper_tasks = [
+                self._transcribe_audio_chunk(chunk) for chunk in audio_chunks
+            ]
+            whisper_results = await asyncio.gather(*whisper_tasks, return_exceptions=True)
 
-        # Extract successful transcriptions
+        # Extract successful transcriptions, moving segment times onto the full recording
         chunk_transcriptions = []
+        chunk_timings = []
         for i, result in enumerate(whisper_results):
-            if isinstance(result, dict) and result.get("text"):
+            if not isinstance(result, dict):
+                continue
+            chunk_timings.append({
+                "chunk_id": i,
+                **{k: result[k] for k in ("decode_time", "batch_index", "worker_pid") if k in result}
+            })
+            if result.get("text"):
+                offset = chunk_bounds[i][0] / 16000
                 chunk_transcriptions.append({
                     "text": result["text"],
                     "chunk_id": i,
-                    "start_time": i * 10.0
+                    "start_time": offset,
+                    "end_time": chunk_bounds[i][1] / 16000,
+                    "segments": [
+                        {**segment, "start": segment["start"] + offset, "end": segment["end"] + offset}
+                        for segment in result.get("segments", [])
+                    ]
                 })
 
         logger.info(f"📝 Got {len(chunk_transcriptions)} successful chunk transcriptions")
 
-        # Step 3: Combine all chunk transcriptions
-        full_transcription = self._combine_chunk_transcriptions(chunk_transcriptions)
+        # Step 3: Stitch chunk transcriptions, removing words duplicated in overlaps
+        stitched = self._stitch_chunk_transcriptions(chunk_transcriptions)
+        full_transcription = stitched["text"]
         logger.info(f"� Combined transcription length: {len(full_transcription)} characters")
 
-        # Step 4: Single ultra-fast LLM improvement (instead of chunked)
-        logger.info("⚡ Step 4: Single LLM improvement for speed")
-        improved_transcription = await self._ultra_fast_improve_transcription(full_transcription)
+        # Step 4: LLM improvement; with segment metrics only the low-confidence parts are sent
+        segments = stitched["segments"]
+        selective_stats = chunked_stats = None
+        if SELECTIVE_CORRECTION and segments:
+            logger.info("⚡ Step 4: LLM improvement of low-confidence segments")
+            selective = await self.selective_corrector.correct(segments, self._correct_span)
+            improved_transcription = selective["text"]
+            segments = selective["segments"]
+            selective_stats = {k: selective[k] for k in ("spans", "failed", "skipped_fraction")}
+            logger.info(f"⚡ Corrected {selective['spans']} spans, skipped "
+                        f"{selective['skipped_fraction']:.0%} of the text")
+        else:
+            logger.info("⚡ Step 4: Chunked LLM improvement")
+            corrected = await self._ultra_fast_improve_transcription(full_transcription)
+            improved_transcription = corrected["text"]
+            chunked_stats = {k: corrected[k] for k in ("chunks", "failed")}
 
         processing_time = time.time() - start_time
         logger.info(".2f")
@@ -191,6 +308,13 @@ class MultiAPIProcessor:
             "method": "ultra_fast_chunked",
             "audio_chunks": len(audio_chunks),
             "whisper_chunks_successful": len(chunk_transcriptions),
+            "skipped_audio_seconds": round(skipped_seconds, 2),
+            "whisper_batch_size": self.batched_transcriber.batch_size,
+            "chunk_timings": chunk_timings,
+            "segments": segments,
+            "selective_correction": selective_stats,
+            "chunked_correction": chunked_stats,
+            "overlap_duplicates_removed": stitched["duplicates_removed"],
             "transcription_length": len(improved_transcription)
         }
 
@@ -205,7 +329,7 @@ class MultiAPIProcessor:
         logger.info("🎯 Step 1: Single fast Whisper transcription (optimized)")
         audio_duration = len(audio_data) / 16000  # Assuming 16kHz sample rate
         logger.info(f"🎵 Audio duration: {audio_duration:.1f} seconds")
-        whisper_result = self.whisper_model.transcribe(audio_data, fp16=True, language="en", beam_size=1)
+        whisper_result = await self._whisper_transcribe(audio_data, language="en", beam_size=1)
         full_transcription = str(whisper_result.get("text", "")).strip()
         logger.info(f"📝 Whisper transcription length: {len(full_transcription)} characters")
 
@@ -219,24 +343,76 @@ class MultiAPIProcessor:
             "transcription": full_transcription,
             "processing_time": processing_time,
             "method": "ultra_fast_v3",
-            "whisper_model": "large-v3",
+            "whisper_model": self.whisper_key[0],
             "improvements_applied": 0,
             "transcription_length": len(full_transcription)
         }
 
+    async def process_transcription_ensemble(self, audio_data: np.ndarray,
+                                             members: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        N-model ensemble: decode once with Whisper, send the text to every member
+        concurrently, then merge the improvements and score their agreement.
+        Unknown member keys are skipped with a warning; raises ValueError when none is left.
+        """
+        start_time = time.time()
+        requested = members or ENSEMBLE_MODELS
+        members = [m for m in requested if m in ENSEMBLE_MEMBERS]
+        unknown = [m for m in requested if m not in ENSEMBLE_MEMBERS]
+        if unknown:
+            logger.warning(f"⚠️ Unknown ensemble members ignored: {', '.join(unknown)} "
+                           f"(known: {', '.join(ENSEMBLE_MEMBERS)})")
+        if not members:
+            raise ValueError(f"No known ensemble members in {requested}; "
+                             f"check ENSEMBLE_MODELS (known: {', '.join(ENSEMBLE_MEMBERS)})")
+
+        # Step 1: One Whisper decode shared by all members
+        logger.info("🎯 Step 1: Single Whisper transcription for the ensemble")
+        whisper_start = time.time()
+        whisper_result = await self._whisper_transcribe(audio_data, language=TRANSCRIPTION_LANGUAGE)
+        whisper_text = str(whisper_result.get("text", "")).strip()
+        whisper_time = time.time() - whisper_start
+
+        # Step 2: Fan the text out to every member at once
+        logger.info(f"🚀 Step 2: {len(members)}-model ensemble improvements")
+        member_results = await asyncio.gather(
+            *(self._improve_for_ensemble(member, whisper_text) for member in members)
+        )
+        successful_results = [r for r in member_results if r.get("text") and "error" not in r]
+        provider_latency = {r["model"]: r.get("latency") for r in member_results}
+
+        # Step 3: Merge and score agreement
+        if successful_results:
+            combined = await self._combine_multiple_transcriptions(successful_results)
+            final_transcription, confidence = combined["text"], combined["confidence"]
+        else:
+            logger.warning("⚠️ All ensemble members failed, using Whisper only")
+            final_transcription = whisper_text
+            confidence = 0.0
+
+        processing_time = time.time() - start_time
+        return {
+            "transcription": final_transcription,
+            "processing_time": processing_time,
+            "method": f"ensemble_{len(members)}_model",
+            "whisper_time": round(whisper_time, 3),
+            "whisper_text_length": len(whisper_text),
+            "ensemble_models": members,
+            "models_successful": [r["model"] for r in successful_results],
+            "provider_latency": provider_latency,
+            "confidence": confidence,
+            "transcription_length": len(final_transcription)
+        }
+
     async def _improve_text_quality(self, text: str) -> str:
         """Fast quality improvement."""
         try:
-            response = self.groq_client.chat.completions.create(
-                model=GROQ_MODEL,
-                messages=[
-                    {"role": "system", "content": "Improve this transcription for clarity and accuracy. Keep it natural."},
-                    {"role": "user", "content": text}
-                ],
-                max_tokens=400,
-                temperature=0.2
+            correction = await self._correct_text(
+                "groq", GROQ_MODEL, "_improve_text_quality",
+                "Improve this transcription for clarity and accuracy. Keep it natural.",
+                text, max_tokens=400, temperature=0.2
             )
-            return (response.choices[0].message.content or text).strip()
+            return (correction["text"] or text).strip()
         except Exception as e:
             logger.warning(f"Quality improvement failed: {str(e)}")
             return text
@@ -244,38 +420,37 @@ class MultiAPIProcessor:
     async def _improve_text_grammar(self, text: str) -> str:
         """Fast grammar improvement."""
         try:
-            response = self.openai_client.chat.completions.create(
-                model=OPENROUTER_MODEL,
-                messages=[
-                    {"role": "system", "content": "Fix grammar and punctuation in this transcription. Keep it natural."},
-                    {"role": "user", "content": text}
-                ],
-                max_tokens=400,
-                temperature=0.2
+            correction = await self._correct_text(
+                "openrouter", OPENROUTER_MODEL, "_improve_text_grammar",
+                "Fix grammar and punctuation in this transcription. Keep it natural.",
+                text, max_tokens=400, temperature=0.2
             )
-            return (response.choices[0].message.content or text).strip()
+            return (correction["text"] or text).strip()
         except Exception as e:
             logger.warning(f"Grammar improvement failed: {str(e)}")
             return text
 
+    def _is_acceptable_improvement(self, result: Any) -> bool:
+        """An improvement counts when its call succeeded and returned text."""
+        return isinstance(result, dict) and bool(result.get("text")) and "error" not in result
+
     async def _improve_with_groq_llama33(self, text: str) -> Dict[str, Any]:
         """Improve transcription using Groq Llama 3.3 70B."""
         try:
-            response = self.groq_client.chat.completions.create(
-                model=GROQ_MODEL,
-                messages=[
-                    {"role": "system", "content": "Improve this transcription for clarity and accuracy. Fix any errors and make it more natural."},
-                    {"role": "user", "content": text}
-                ],
+            correction = await self._correct_text(
+                "groq", GROQ_MODEL, "_improve_with_groq_llama33",
+                "Improve this transcription for clarity and accuracy. Fix any errors and make it more natural.",
+                text,
                 max_tokens=600,  # Reduced for speed
                 temperature=0.1  # Lower temperature for speed
             )
 
-            improved_text = response.choices[0].message.content or text
+            improved_text = correction["text"] or text
             return {
                 "text": improved_text.strip(),
                 "model": "groq_llama33_70b",
                 "provider": "Groq",
+                "protocol": correction["protocol"],
                 "original_length": len(text),
                 "improved_length": len(improved_text.strip())
             }
@@ -286,21 +461,18 @@ class MultiAPIProcessor:
     async def _improve_with_openrouter_gpt4o(self, text: str) -> Dict[str, Any]:
         """Improve transcription using OpenRouter GPT-4o Mini."""
         try:
-            response = self.openai_client.chat.completions.create(
-                model=OPENROUTER_MODEL,
-                messages=[
-                    {"role": "system", "content": "Improve this transcription for clarity and accuracy. Fix any errors and make it more natural."},
-                    {"role": "user", "content": text}
-                ],
-                max_tokens=1000,
-                temperature=0.3
+            correction = await self._correct_text(
+                "openrouter", OPENROUTER_MODEL, "_improve_with_openrouter_gpt4o",
+                "Improve this transcription for clarity and accuracy. Fix any errors and make it more natural.",
+                text, max_tokens=1000, temperature=0.3
             )
 
-            improved_text = response.choices[0].message.content or text
+            improved_text = correction["text"] or text
             return {
                 "text": improved_text.strip(),
                 "model": "openrouter_gpt4o_mini",
                 "provider": "OpenRouter",
+                "protocol": correction["protocol"],
                 "original_length": len(text),
                 "improved_length": len(improved_text.strip())
             }
@@ -308,30 +480,54 @@ class MultiAPIProcessor:
             logger.error(f"OpenRouter GPT-4o improvement failed: {str(e)}")
             return {"text": text, "error": str(e), "model": "openrouter_gpt4o_mini"}
 
-    def _chunk_audio_data(self, audio_data: np.ndarray, chunk_duration: float = 10.0, sample_rate: int = 16000) -> List[np.ndarray]:
-        """Split audio data into chunks of specified duration."""
+    def _chunk_audio_bounds(self, total_samples: int, chunk_duration: float = 10.0, sample_rate: int = 16000,
+                            overlap: float = 0.0) -> List[Tuple[int, int]]:
+        """(start, end) sample offsets of fixed-duration chunks, consecutive chunks sharing `overlap` seconds."""
         chunk_samples = int(chunk_duration * sample_rate)
-        chunks = []
+        step = max(sample_rate, chunk_samples - int(overlap * sample_rate))
+        bounds = []
+
+        for i in range(0, total_samples, step):
+            end = min(i + chunk_samples, total_samples)
+            if end - i >= sample_rate:  # At least 1 second
+                bounds.append((i, end))
+            if end == total_samples:
+                break
 
-        for i in range(0, len(audio_data), chunk_samples):
-            chunk = audio_data[i:i + chunk_samples]
-            if len(chunk) >= sample_rate:  # At least 1 second
-                chunks.append(chunk)
+        return bounds
 
-        return chunks
+    def _chunk_audio_data(self, audio_data: np.ndarray, chunk_duration: float = 10.0, sample_rate: int = 16000) -> List[np.ndarray]:
+        """Split audio data into chunks of specified duration."""
+        return [
+            audio_data[start:end]
+            for start, end in self._chunk_audio_bounds(len(audio_data), chunk_duration, sample_rate)
+        ]
 
     async def _transcribe_audio_chunk(self, audio_chunk: np.ndarray) -> Dict[str, Any]:
         """Transcribe a single audio chunk with Whisper."""
         try:
-            result = self.whisper_model.transcribe(audio_chunk, fp16=False)
+            start_time = time.perf_counter()
+            result = await self._whisper_transcribe(audio_chunk)
             return {
                 "text": str(result.get("text", "")).strip(),
-                "success": True
+                "segments": segments_from_whisper(result),
+                "success": True,
+                "decode_time": round(time.perf_counter() - start_time, 4)
             }
         except Exception as e:
             logger.warning(f"Chunk transcription failed: {str(e)}")
             return {"text": "", "success": False, "error": str(e)}
 
+    def _stitch_chunk_transcriptions(self, chunk_transcriptions: List[Dict]) -> Dict[str, Any]:
+        """Combine chunk transcriptions, deduplicating overlaps when segment timestamps are available."""
+        if chunk_transcriptions and all(chunk.get("segments") for chunk in chunk_transcriptions):
+            return self.stitcher.stitch(chunk_transcriptions)
+        return {
+            "text": self._combine_chunk_transcriptions(chunk_transcriptions),
+            "segments": [],
+            "duplicates_removed": 0
+        }
+
     def _combine_chunk_transcriptions(self, chunk_transcriptions: List[Dict]) -> str:
         """Combine multiple chunk transcriptions into coherent text."""
         if not chunk_transcriptions:
@@ -349,59 +545,120 @@ class MultiAPIProcessor:
 
         return combined
 
-    async def _ultra_fast_improve_transcription(self, transcription: str) -> str:
-        """Ultra-fast single LLM improvement for the entire transcription."""
+    async def _ultra_fast_improve_transcription(self, transcription: str) -> Dict[str, Any]:
+        """
+        Grammar/punctuation pass over the whole transcription. Long text is split into
+        sentence-aligned, token-budgeted chunks that are corrected concurrently and
+        reassembled in order, so no part of a long meeting is truncated.
+        Returns the text with how many chunks were sent and how many kept their original.
+        """
         if len(transcription.strip()) < 10:
-            return transcription
-
-        try:
-            # Use the fastest available model (Groq Llama 3.3)
-            # IMPORTANT: Only fix grammar/punctuation, don't rewrite content!
-            response = self.groq_client.chat.completions.create(
-                model=GROQ_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a transcription corrector. Fix ONLY grammar, punctuation, and obvious typos. Do NOT rewrite, summarize, or change the meaning. Return ONLY the corrected transcription with no extra commentary."},
-                    {"role": "user", "content": f"Fix grammar and punctuation only:\n\n{transcription}"}
-                ],
-                max_tokens=2000,  # Increased to handle longer transcripts
-                temperature=0.1  # Lower temperature for consistency and speed
+            return {"text": transcription, "chunks": 0, "failed": 0}
+
+        chunks = chunk_text(transcription, LLM_CORRECTION_CHUNK_TOKENS)
+        start_time = time.perf_counter()
+        result = await map_chunks(chunks, self._correct_chunk, LLM_CORRECTION_CONCURRENCY)
+        logger.info(f"⚡ Corrected {result['chunks']} chunks in {time.perf_counter() - start_time:.2f}s "
+                    f"({result['failed']} kept original)")
+        return {"text": result["text"], "chunks": result["chunks"], "failed": result["failed"]}
+
+    async def _correct_chunk(self, chunk: str) -> Optional[str]:
+        """Fix grammar and punctuation of one chunk; None keeps the original text."""
+        # IMPORTANT: Only fix grammar/punctuation, don't rewrite content!
+        correction = await self.router.run("correct", lambda provider, model: self._correct_text(
+            provider, model, "_ultra_fast_improve_transcription",
+            "You are a transcription corrector. Fix ONLY grammar, punctuation, and obvious typos. Do NOT rewrite, summarize, or change the meaning.",
+            chunk,
+            # Room for the whole chunk plus some slack, so the output is never cut off
+            max_tokens=estimate_tokens(chunk) * 2 + 64,
+            temperature=0.1  # Lower temperature for consistency and speed
+        ))
+        content = correction["text"]
+
+        # If Groq added commentary instead of correcting, keep the original chunk
+        if correction["protocol"] == "full" and content and content.strip().startswith("Here"):
+            logger.warning("LLM added commentary instead of correcting, keeping original chunk")
+            return None
+        return content
+
+    async def _correct_span(self, passage: str, before: str, after: str) -> Optional[str]:
+        """Correct one low-confidence passage, with neighbouring text as read-only context."""
+        instruction = (
+            "You are a transcription corrector. Fix ONLY grammar, punctuation, obvious typos and "
+            "misheard words in the passage. Do NOT rewrite, summarize, or change the meaning."
+        )
+        if before or after:
+            instruction += (
+                f"\nFor reference only (do not correct or repeat): the passage comes after "
+                f"\"{before}\" and before \"{after}\"."
             )
-
-            improved = response.choices[0].message.content
-            
-            # If Groq added commentary, try to extract just the transcription
-            if improved and not improved.startswith("Here"):
-                return improved.strip()
+        correction = await self.router.run("correct", lambda provider, model: self._correct_text(
+            provider, model, "_correct_span", instruction, passage,
+            max_tokens=estimate_tokens(passage) * 2 + 64,
+            temperature=0.1
+        ))
+        content = correction["text"]
+        if correction["protocol"] == "full" and content and content.strip().startswith("Here"):
+            logger.warning("LLM added commentary instead of correcting, keeping original passage")
+            return None
+        return content
+
+    async def _correct_text(self, provider: str, model: str, call_site: str, instruction: str,
+                            text: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        """
+        Correct `text` following `instruction`. With CORRECTION_PROTOCOL=edits the model
+        only returns a list of word edits, which are validated and applied here; a reply
+        that is not a valid edit list falls back to asking for the full corrected text.
+        Returns {"text", "protocol", "edits"}.
+        """
+        words = text.split()
+        if CORRECTION_PROTOCOL == "edits" and words:
+            edit_site = f"{call_site}:edits"
+            start_time = time.perf_counter()
+            content = await self.llm.chat(
+                provider,
+                call_site=edit_site,
+                model=model,
+                messages=edit_messages(instruction, words),
+                # An edit list longer than the text itself would be slower than the full reply
+                max_tokens=estimate_tokens(text) + 64,
+                temperature=temperature
+            )
+            try:
+                edits = parse_edits(content, len(words))
+            except EditProtocolError as e:
+                correction_metrics.record("edits", edit_site, time.perf_counter() - start_time, fallback=True)
+                logger.warning(f"{call_site}: unusable edit list ({str(e)}), asking for full text")
             else:
-                # Groq added commentary, return original
-                logger.warning("Groq added commentary instead of correcting, returning original")
-                return transcription
-
-        except Exception as e:
-            logger.warning(f"Ultra-fast improvement failed: {str(e)}")
-            return transcription
+                correction_metrics.record("edits", edit_site, time.perf_counter() - start_time, edits=len(edits))
+                return {"text": apply_edits(words, edits), "protocol": "edits", "edits": len(edits)}
+
+        start_time = time.perf_counter()
+        content = await self.llm.chat(
+            provider,
+            call_site=call_site,
+            model=model,
+            messages=[
+                {"role": "system", "content": f"{instruction} Return ONLY the corrected transcription with no extra commentary."},
+                {"role": "user", "content": text}
+            ],
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+        correction_metrics.record("full", call_site, time.perf_counter() - start_time)
+        return {"text": content, "protocol": "full", "edits": None}
 
     def _chunk_transcription_text(self, text: str, chunk_size: int = 500) -> List[str]:
-        """Split transcription text into manageable chunks."""
-        words = text.split()
-        chunks = []
-        current_chunk = []
-
-        for word in words:
-            current_chunk.append(word)
-            if len(' '.join(current_chunk)) >= chunk_size:
-                chunks.append(' '.join(current_chunk))
-                current_chunk = []
-
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
-
+        """Split transcription text into sentence-aligned chunks of about `chunk_size` characters."""
+        chunks = chunk_text(text, max(1, chunk_size // CHARS_PER_TOKEN))
         return chunks if chunks else [text]
 
     async def _improve_chunk_with_groq_llama33(self, chunk: str) -> Dict[str, Any]:
         """Quick improvement using Groq Llama 3.3."""
         try:
-            response = self.groq_client.chat.completions.create(
+            content = await self.llm.chat(
+                "groq",
+                call_site="_improve_chunk_with_groq_llama33",
                 model=GROQ_MODEL,
                 messages=[
                     {"role": "system", "content": "Quickly improve this text for clarity and grammar. Keep it concise."},
@@ -411,7 +668,7 @@ class MultiAPIProcessor:
                 temperature=0.3  # Lower temperature for consistency
             )
             return {
-                "text": (response.choices[0].message.content or chunk).strip(),
+                "text": (content or chunk).strip(),
                 "model": "groq_llama33_70b",
                 "chunk": chunk[:50] + "..." if len(chunk) > 50 else chunk
             }
@@ -422,7 +679,9 @@ class MultiAPIProcessor:
     async def _improve_chunk_with_openrouter_gpt4o(self, chunk: str) -> Dict[str, Any]:
         """Quick improvement using OpenRouter GPT-4o Mini."""
         try:
-            response = self.openai_client.chat.completions.create(
+            content = await self.llm.chat(
+                "openrouter",
+                call_site="_improve_chunk_with_openrouter_gpt4o",
                 model=OPENROUTER_MODEL,
                 messages=[
                     {"role": "system", "content": "Quickly improve this text for clarity and grammar. Keep it concise."},
@@ -432,7 +691,7 @@ class MultiAPIProcessor:
                 temperature=0.3
             )
             return {
-                "text": (response.choices[0].message.content or chunk).strip(),
+                "text": (content or chunk).strip(),
                 "model": "openrouter_gpt4o_mini",
                 "chunk": chunk[:50] + "..." if len(chunk) > 50 else chunk
             }
@@ -443,7 +702,9 @@ class MultiAPIProcessor:
     async def _improve_chunk_with_openrouter_claude(self, chunk: str) -> Dict[str, Any]:
         """Quick improvement using OpenRouter Claude Haiku."""
         try:
-            response = self.openai_client_2.chat.completions.create(
+            content = await self.llm.chat(
+                "openrouter",
+                call_site="_improve_chunk_with_openrouter_claude",
                 model=OPENROUTER_MODEL_2,
                 messages=[
                     {"role": "system", "content": "Quickly improve this text for clarity and grammar. Keep it concise."},
@@ -453,7 +714,7 @@ class MultiAPIProcessor:
                 temperature=0.3
             )
             return {
-                "text": (response.choices[0].message.content or chunk).strip(),
+                "text": (content or chunk).strip(),
                 "model": "openrouter_claude_haiku",
                 "chunk": chunk[:50] + "..." if len(chunk) > 50 else chunk
             }
@@ -471,14 +732,15 @@ class MultiAPIProcessor:
         best_improvement = max(improvements, key=lambda x: len(x.get("text", "")))
         return best_improvement.get("text", fallback_text)
 
-    async def _transcribe_with_groq_llama33(self, audio_data: np.ndarray) -> Dict[str, Any]:
-        """Transcribe using Whisper + Groq Llama 3.3 70B."""
+    async def _improve_for_ensemble(self, member: str, whisper_text: str) -> Dict[str, Any]:
+        """Have one ensemble member improve an already decoded transcription."""
+        provider, model, provider_label, call_site = ENSEMBLE_MEMBERS[member]
+        start_time = time.perf_counter()
         try:
-            result = self.whisper_model.transcribe(audio_data, fp16=False)
-            whisper_text = result["text"]
-
-            response = self.groq_client.chat.completions.create(
-                model=GROQ_MODEL,
+            content = await self.llm.chat(
+                provider,
+                call_site=call_site,
+                model=model,
                 messages=[
                     {"role": "system", "content": "Improve this transcription for clarity and accuracy. Fix any errors."},
                     {"role": "user", "content": f"Original transcription: {whisper_text}"}
@@ -487,184 +749,119 @@ class MultiAPIProcessor:
             )
 
             return {
-                "text": response.choices[0].message.content or whisper_text,
-                "model": "groq_llama33_70b",
-                "provider": "Groq",
-                "original_whisper": whisper_text
+                "text": content or whisper_text,
+                "model": member,
+                "provider": provider_label,
+                "original_whisper": whisper_text,
+                "latency": round(time.perf_counter() - start_time, 3)
             }
         except Exception as e:
-            logger.error(f"Groq Llama33 transcription failed: {str(e)}")
-            return {"text": "", "error": str(e), "model": "groq_llama33_70b"}
+            logger.error(f"{member} transcription failed: {str(e)}")
+            return {"text": "", "error": str(e), "model": member,
+                    "latency": round(time.perf_counter() - start_time, 3)}
 
-    async def _transcribe_with_groq_llama31(self, audio_data: np.ndarray) -> Dict[str, Any]:
-        """Transcribe using Whisper + Groq Llama 3.1 70B."""
+    async def _transcribe_with_member(self, member: str, audio_data: np.ndarray) -> Dict[str, Any]:
         try:
-            result = self.whisper_model.transcribe(audio_data, fp16=False)
-            whisper_text = result["text"]
+            result = await self._whisper_transcribe(audio_data)
+        except Exception as e:
+            logger.error(f"{member} transcription failed: {str(e)}")
+            return {"text": "", "error": str(e), "model": member}
+        return await self._improve_for_ensemble(member, result["text"])
 
-            response = self.groq_client_2.chat.completions.create(
-                model=GROQ_MODEL_2,
-                messages=[
-                    {"role": "system", "content": "Improve this transcription for clarity and accuracy. Fix any errors."},
-                    {"role": "user", "content": f"Original transcription: {whisper_text}"}
-                ],
-                max_tokens=1000
-            )
+    async def _transcribe_with_groq_llama33(self, audio_data: np.ndarray) -> Dict[str, Any]:
+        """Transcribe using Whisper + Groq Llama 3.3 70B."""
+        return await self._transcribe_with_member("groq_llama33_70b", audio_data)
 
-            return {
-                "text": response.choices[0].message.content or whisper_text,
-                "model": "groq_llama31_70b",
-                "provider": "Groq",
-                "original_whisper": whisper_text
-            }
-        except Exception as e:
-            logger.error(f"Groq Llama31 transcription failed: {str(e)}")
-            return {"text": "", "error": str(e), "model": "groq_llama31_70b"}
+    async def _transcribe_with_groq_llama31(self, audio_data: np.ndarray) -> Dict[str, Any]:
+        """Transcribe using Whisper + Groq Llama 3.1 70B."""
+        return await self._transcribe_with_member("groq_llama31_70b", audio_data)
 
     async def _transcribe_with_openrouter_gpt4o(self, audio_data: np.ndarray) -> Dict[str, Any]:
         """Transcribe using Whisper + OpenRouter GPT-4o Mini."""
-        try:
-            result = self.whisper_model.transcribe(audio_data, fp16=False)
-            whisper_text = result["text"]
-
-            response = self.openai_client.chat.completions.create(
-                model=OPENROUTER_MODEL,
-                messages=[
-                    {"role": "system", "content": "Improve this transcription for clarity and accuracy. Fix any errors."},
-                    {"role": "user", "content": f"Original transcription: {whisper_text}"}
-                ],
-                max_tokens=1000
-            )
-
-            return {
-                "text": response.choices[0].message.content or whisper_text,
-                "model": "openrouter_gpt4o_mini",
-                "provider": "OpenRouter",
-                "original_whisper": whisper_text
-            }
-        except Exception as e:
-            logger.error(f"OpenRouter GPT-4o transcription failed: {str(e)}")
-            return {"text": "", "error": str(e), "model": "openrouter_gpt4o_mini"}
+        return await self._transcribe_with_member("openrouter_gpt4o_mini", audio_data)
 
     async def _transcribe_with_openrouter_claude(self, audio_data: np.ndarray) -> Dict[str, Any]:
         """Transcribe using Whisper + OpenRouter Claude Haiku."""
-        try:
-            result = self.whisper_model.transcribe(audio_data, fp16=False)
-            whisper_text = result["text"]
-
-            response = self.openai_client_2.chat.completions.create(
-                model=OPENROUTER_MODEL_2,
-                messages=[
-                    {"role": "system", "content": "Improve this transcription for clarity and accuracy. Fix any errors."},
-                    {"role": "user", "content": f"Original transcription: {whisper_text}"}
-                ],
-                max_tokens=1000
-            )
-
-            return {
-                "text": response.choices[0].message.content or whisper_text,
-                "model": "openrouter_claude_haiku",
-                "provider": "OpenRouter",
-                "original_whisper": whisper_text
-            }
-        except Exception as e:
-            logger.error(f"OpenRouter Claude transcription failed: {str(e)}")
-            return {"text": "", "error": str(e), "model": "openrouter_claude_haiku"}
+        return await self._transcribe_with_member("openrouter_claude_haiku", audio_data)
 
     async def _transcribe_with_openrouter_gemini(self, audio_data: np.ndarray) -> Dict[str, Any]:
         """Transcribe using Whisper + OpenRouter Gemini Flash."""
-        try:
-            result = self.whisper_model.transcribe(audio_data, fp16=False)
-            whisper_text = result["text"]
-
-            response = self.openai_client_3.chat.completions.create(
-                model=OPENROUTER_MODEL_3,
-                messages=[
-                    {"role": "system", "content": "Improve this transcription for clarity and accuracy. Fix any errors."},
-                    {"role": "user", "content": f"Original transcription: {whisper_text}"}
-                ],
-                max_tokens=1000
-            )
-
-            return {
-                "text": response.choices[0].message.content or whisper_text,
-                "model": "openrouter_gemini_flash",
-                "provider": "OpenRouter",
-                "original_whisper": whisper_text
-            }
-        except Exception as e:
-            logger.error(f"OpenRouter Gemini transcription failed: {str(e)}")
-            return {"text": "", "error": str(e), "model": "openrouter_gemini_flash"}
+        return await self._transcribe_with_member("openrouter_gemini_flash", audio_data)
 
-    async def _combine_transcriptions(self, groq_result: Dict[str, Any], openrouter_result: Dict[str, Any]) -> str:
-        """Combine transcriptions from both APIs using AI for improvement."""
-        groq_text = groq_result.get("text", "")
-        openrouter_text = openrouter_result.get("text", "")
+    async def _combine_transcriptions(self, groq_result: Dict[str, Any], openrouter_result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Combine transcriptions from both APIs; locally by word alignment (Groq wins ties) unless COMBINER=llm.
+        Returns the text and the word-level agreement between both as its confidence.
+        """
+        groq_text = groq_result.get("text", "").strip()
+        openrouter_text = openrouter_result.get("text", "").strip()
 
         if not groq_text and not openrouter_text:
-            return "Transcription failed for both APIs"
+            return {"text": "Transcription failed for both APIs", "confidence": 0.0}
 
         if groq_text and not openrouter_text:
-            return groq_text
+            return {"text": groq_text, "confidence": 0.0}
         if openrouter_text and not groq_text:
-            return openrouter_text
+            return {"text": openrouter_text, "confidence": 0.0}
+
+        # One alignment gives both the local combination and the agreement score
+        aligned = self.combiner.combine([groq_text, openrouter_text])
+        if COMBINER != "llm":
+            return {"text": aligned["text"] or groq_text, "confidence": aligned["confidence"]}
 
-        # Use Groq to combine and improve
+        # Use the fastest healthy LLM to combine and improve
         try:
-            response = self.groq_client.chat.completions.create(
-                model=GROQ_MODEL,
+            content = await self.router.chat(
+                "combine",
+                call_site="_combine_transcriptions",
                 messages=[
                     {"role": "system", "content": "Combine these two transcriptions into the most accurate version. Resolve conflicts and improve clarity."},
                     {"role": "user", "content": f"Transcription 1: {groq_text}\nTranscription 2: {openrouter_text}"}
                 ],
                 max_tokens=1500
             )
-            return response.choices[0].message.content or "Combination failed"
+            return {"text": content or "Combination failed", "confidence": aligned["confidence"]}
         except Exception as e:
             logger.error(f"Combination failed: {str(e)}")
             # Fallback: return longer transcription
-            return groq_text if len(groq_text) > len(openrouter_text) else openrouter_text
-
-    def _calculate_confidence(self, result1: Dict[str, Any], result2: Dict[str, Any]) -> float:
-        """Calculate confidence score based on agreement between APIs."""
-        text1 = result1.get("text", "").strip()
-        text2 = result2.get("text", "").strip()
-
-        if not text1 or not text2:
-            return 0.0
+            longer = groq_text if len(groq_text) > len(openrouter_text) else openrouter_text
+            return {"text": longer, "confidence": aligned["confidence"]}
 
-        # Simple similarity score
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
-
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-
-        if not union:
-            return 0.0
-
-        return len(intersection) / len(union)
-
-    async def _combine_multiple_transcriptions(self, results: List[Dict[str, Any]]) -> str:
-        """Combine transcriptions from multiple models using AI for intelligent merging."""
+    async def _combine_multiple_transcriptions(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Combine transcriptions from multiple models by word alignment and per-word voting.
+        Returns the text and, as its confidence, the share of models agreeing with each combined word.
+        """
         if not results:
-            return "No transcriptions available"
-
-        if len(results) == 1:
-            return results[0].get("text", "")
+            return {"text": "No transcriptions available", "confidence": 0.0}
 
         # Extract all texts
-        texts = [result.get("text", "") for result in results if result.get("text")]
+        texts = [result.get("text", "").strip() for result in results if result.get("text")]
 
         if not texts:
-            return "All transcriptions failed"
+            return {"text": "All transcriptions failed", "confidence": 0.0}
+
+        if len(texts) == 1:
+            return {"text": texts[0], "confidence": 0.5}  # Default confidence for single result
+
+        # One alignment gives both the local combination and the agreement score
+        start_time = time.perf_counter()
+        combined = self.combiner.combine(texts)
+        logger.info(f"🧩 Aligned {len(texts)} transcriptions locally in "
+                    f"{(time.perf_counter() - start_time) * 1000:.1f} ms (agreement {combined['confidence']:.2f})")
 
-        # Use the most capable model (Groq Llama 3.3) to combine all results
+        if COMBINER == "llm":
+            return {"text": await self._llm_combine(texts), "confidence": combined["confidence"]}
+        return {"text": combined["text"] or max(texts, key=len), "confidence": combined["confidence"]}
+
+    async def _llm_combine(self, texts: List[str]) -> str:
+        """Merge candidate transcriptions with an extra LLM call (COMBINER=llm)."""
         try:
             combined_input = "\n\n".join([f"Transcription {i+1}: {text}" for i, text in enumerate(texts)])
 
-            response = self.groq_client.chat.completions.create(
-                model=GROQ_MODEL,
+            content = await self.router.chat(
+                "combine",
+                call_site="_combine_multiple_transcriptions",
                 messages=[
                     {"role": "system", "content": """You are an expert transcription editor. Combine these multiple transcriptions into the most accurate, clear, and complete version. 
 
@@ -680,7 +877,7 @@ Rules:
                 max_tokens=2000
             )
 
-            combined_text = response.choices[0].message.content
+            combined_text = content
             return combined_text if combined_text else texts[0]
 
         except Exception as e:
@@ -688,68 +885,64 @@ Rules:
             # Fallback: return the longest transcription
             return max(texts, key=len)
 
-    def _calculate_multi_confidence(self, results: List[Dict[str, Any]]) -> float:
-        """Calculate confidence score based on agreement between multiple models."""
-        if len(results) < 2:
-            return 0.5  # Default confidence for single result
-
-        texts = [result.get("text", "").strip() for result in results if result.get("text")]
-
-        if len(texts) < 2:
-            return 0.5
-
-        # Calculate pairwise similarities
-        similarities = []
-        for i in range(len(texts)):
-            for j in range(i+1, len(texts)):
-                text1, text2 = texts[i], texts[j]
-
-                words1 = set(text1.lower().split())
-                words2 = set(text2.lower().split())
-
-                if not words1 or not words2:
-                    continue
-
-                intersection = words1.intersection(words2)
-                union = words1.union(words2)
-
-                if union:
-                    similarity = len(intersection) / len(union)
-                    similarities.append(similarity)
-
-        if not similarities:
-            return 0.0
-
-        # Average similarity as confidence score
-        avg_similarity = sum(similarities) / len(similarities)
-
-        # Boost confidence based on number of agreeing models
-        agreement_bonus = min(len(results) / 5.0, 1.0)  # Max bonus at 5 models
+    def create_streaming_session(self, language: Optional[str] = None) -> StreamingSession:
+        """Start a rolling-buffer streaming transcription for one live connection."""
+        return StreamingSession(self._streaming_transcribe, language=language or TRANSCRIPTION_LANGUAGE)
+
+    async def _streaming_transcribe(self, audio: np.ndarray, prompt: Optional[str], language: Optional[str]) -> Dict[str, Any]:
+        """Decode a streaming buffer; committed text is passed as the prompt for continuity."""
+        return await self._whisper_transcribe(
+            audio,
+            language=language,
+            initial_prompt=prompt,
+            beam_size=1,
+            best_of=1,
+            temperature=0.0,
+            condition_on_previous_text=False,
+            word_timestamps=False,
+            compression_ratio_threshold=2.4
+        )
 
-        return min(avg_similarity * (0.8 + 0.2 * agreement_bonus), 1.0)
+    def create_speech_gate(self) -> SpeechGate:
+        """No-speech gate with its own noise floor, for one live connection."""
+        return SpeechGate()
 
-    async def process_realtime_chunk(self, audio_data: bytes, sample_rate: int = 16000, language: Optional[str] = None) -> Dict[str, Any]:
+    async def process_realtime_chunk(self, audio_data: bytes, sample_rate: int = 16000, language: Optional[str] = None,
+                                     speech_gate: Optional[SpeechGate] = None) -> Dict[str, Any]:
         """Process real-time audio chunk with optimized multi-API approach."""
         # Convert bytes to numpy
         audio_array = self.audio_processor.process_audio_chunk(audio_data, sample_rate)
 
+        # Skip the decode entirely for chunks without speech (muted or idle stretches)
+        if SPEECH_GATE and not (speech_gate or self.speech_gate).has_speech(audio_array):
+            return {
+                "transcription": "",
+                "confidence": 0.0,
+                "speaker_id": None
+            }
+
         # For real-time, use Whisper directly for speed with aggressive filtering
         try:
             # Use optimized Whisper settings for real-time processing
             # Use provided language if set, otherwise fall back to configured default
             _language = language or TRANSCRIPTION_LANGUAGE
-            result = self.whisper_model.transcribe(
-                audio_array,
-                fp16=False,
-                language=_language,
-                no_speech_threshold=0.6,  # Higher threshold to avoid false positives
-                beam_size=1,  # Fastest beam search
-                best_of=1,    # Don't try multiple candidates
-                temperature=0.0,  # Most deterministic output
-                condition_on_previous_text=False,  # Don't use context from previous transcriptions
-                word_timestamps=False,  # Skip word-level timestamps for speed
-                compression_ratio_threshold=2.4  # Avoid repetitive text
-            )
+            if realtime_scheduler.enabled:
+                # Batched with chunks from other live sessions; same greedy decode and
+                # no-speech/compression thresholds as the options below
+                model = await self._get_whisper_model()
+                result = await realtime_scheduler.submit(model, audio_array, _language, fp16=self.whisper_fp16)
+            else:
+                result = await self._whisper_transcribe(
+                    audio_array,
+                    language=_language,
+                    no_speech_threshold=0.6,  # Higher threshold to avoid false positives
+                    beam_size=1,  # Fastest beam search
+                    best_of=1,    # Don't try multiple candidates
+                    temperature=0.0,  # Most deterministic output
+                    condition_on_previous_text=False,  # Don't use context from previous transcriptions
+                    word_timestamps=False,  # Skip word-level timestamps for speed
+                    compression_ratio_threshold=2.4  # Avoid repetitive text
+                )
             
             transcription = str(result.get("text", "")).strip()
             
@@ -0,0 +1,138 @@
+import asyncio
+import os
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+import psutil
+from app.config import WHISPER_PROCESS_WORKERS, WHISPER_PROCESS_THREADS
+from app.services.transcript_stitcher import segments_from_whisper
+
+logger = logging.getLogger(__name__)
+
+# Per-worker state, populated by _init_worker in each child process
+_worker_model = None
+_worker_fp16 = False
+
+def _init_worker(model_key: Tuple[str, str, str], torch_threads: int):
+    """Load a resident Whisper model in the worker and pin its torch thread count."""
+    global _worker_model, _worker_fp16
+    import torch
+    from app.services.model_registry import model_registry
+
+    torch.set_num_threads(torch_threads)
+    torch.set_num_interop_threads(1)
+    _worker_model = model_registry.acquire(*model_key)
+    _worker_fp16 = model_registry.is_fp16(model_key)
+
+def _transcribe_slice(shm_name: str, total_samples: int, chunk_id: int, start: int, end: int,
+                      language: Optional[str]) -> Dict[str, Any]:
+    """Decode audio[start:end] straight out of the shared buffer."""
+    start_time = time.perf_counter()
+    # Workers share the parent's resource tracker, so attaching does not
+    # take ownership of the segment; the parent unlinks it when done.
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        audio = np.ndarray((total_samples,), dtype=np.float32, buffer=shm.buf)
+        chunk = audio[start:end]
+        result = _worker_model.transcribe(chunk, fp16=_worker_fp16, language=language)
+        # Views must be gone before the mapping can be closed
+        del chunk, audio
+    finally:
+        shm.close()
+
+    return {
+        "text": str(result.get("text", "")).strip(),
+        "chunk_id": chunk_id,
+        "segments": segments_from_whisper(result),
+        "decode_time": round(time.perf_counter() - start_time, 4),
+        "worker_pid": os.getpid(),
+        "success": True
+    }
+
+class ProcessPoolTranscriber:
+    """
+    Multi-process chunk transcription for long uploads.
+
+    The decoded float32 audio is copied into shared memory once; each worker
+    process keeps its own resident Whisper model and decodes slices of that
+    buffer, so only slice offsets cross the process boundary.
+    """
+
+    def __init__(self, workers: int = WHISPER_PROCESS_WORKERS,
+                 threads_per_worker: int = WHISPER_PROCESS_THREADS):
+        self.workers = max(0, workers)
+        cores = psutil.cpu_count(logical=False) or psutil.cpu_count() or 1
+        self.threads_per_worker = threads_per_worker or max(1, cores // max(1, self.workers))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._model_key: Optional[Tuple[str, str, str]] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _get_pool(self, model_key: Tuple[str, str, str]) -> ProcessPoolExecutor:
+        if self._pool is not None and self._model_key != model_key:
+            self.shutdown()
+        if self._pool is None:
+            logger.info(f"Starting {self.workers} transcription workers "
+                        f"({self.threads_per_worker} torch threads each)")
+            # spawn keeps CUDA/torch state out of forked children
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(model_key, self.threads_per_worker)
+            )
+            self._model_key = model_key
+        return self._pool
+
+    async def transcribe(self, audio: np.ndarray, chunk_bounds: List[Tuple[int, int]],
+                         model_key: Tuple[str, str, str], language: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Transcribe audio[start:end] for every (start, end) in chunk_bounds.
+        Results come back in chunk order; failed chunks have empty text.
+        """
+        if not chunk_bounds:
+            return []
+
+        pool = self._get_pool(model_key)
+        loop = asyncio.get_running_loop()
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+
+        shm = shared_memory.SharedMemory(create=True, size=max(1, audio.nbytes))
+        try:
+            shared = np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)
+            shared[:] = audio
+            del shared
+
+            futures = [
+                loop.run_in_executor(pool, _transcribe_slice, shm.name, len(audio), i, start, end, language)
+                for i, (start, end) in enumerate(chunk_bounds)
+            ]
+            results = await asyncio.gather(*futures, return_exceptions=True)
+        finally:
+            shm.close()
+            shm.unlink()
+
+        ordered = []
+        for i, result in enumerate(results):
+            if isinstance(result, dict):
+                ordered.append(result)
+            else:
+                logger.warning(f"Worker transcription of chunk {i} failed: {str(result)}")
+                ordered.append({"text": "", "chunk_id": i, "success": False, "error": str(result)})
+        return ordered
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self._model_key = None
+
+# Shared engine for the whole process; started lazily on first long upload
+process_transcriber = ProcessPoolTranscriber()
@@ -0,0 +1,223 @@
+import time
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.config import (
+    GROQ_MODEL, GROQ_MODEL_2, OPENROUTER_MODEL, OPENROUTER_MODEL_2,
+    ROUTER_EWMA_ALPHA, ROUTER_FAILURE_THRESHOLD, ROUTER_COOLDOWN_SECONDS,
+    ROUTER_CORRECT_BACKENDS, ROUTER_SUMMARIZE_BACKENDS, ROUTER_COMBINE_BACKENDS
+)
+from app.services.llm_client import llm_client, LLMError
+
+logger = logging.getLogger(__name__)
+
+Backend = Tuple[str, str]
+
+def parse_backends(spec: str) -> List[Backend]:
+    """Parse "provider:model,provider:model" (the model may itself contain colons)."""
+    backends = []
+    for item in spec.split(","):
+        provider, _, model = item.strip().partition(":")
+        if provider and model:
+            backends.append((provider, model))
+    return backends
+
+# Candidate backends per logical task, in preference order for backends without history
+DEFAULT_TASK_BACKENDS = {
+    "correct": [("groq", GROQ_MODEL), ("openrouter", OPENROUTER_MODEL), ("groq", GROQ_MODEL_2)],
+    "summarize": [("groq", GROQ_MODEL), ("openrouter", OPENROUTER_MODEL), ("openrouter", OPENROUTER_MODEL_2)],
+    "combine": [("groq", GROQ_MODEL), ("openrouter", OPENROUTER_MODEL)],
+}
+
+class BackendHealth:
+    """Latency EWMA, error-rate EWMA and circuit-breaker state of one provider/model."""
+
+    def __init__(self):
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.last_error: Optional[str] = None
+
+    def state(self, now: float) -> str:
+        if self.open_until == 0.0:
+            return "closed"
+        return "open" if now < self.open_until else "half_open"
+
+class ProviderRouter:
+    """
+    Sends each logical LLM task to the currently best healthy backend.
+
+    Every chat completion made through the shared LLM client is observed, so
+    the router learns from all traffic, not only the calls it routes. Per
+    provider/model it keeps an EWMA of latency and of the error rate. After
+    `failure_threshold` consecutive failures (or any 429) the backend's
+    circuit opens and it is skipped for `cooldown_seconds`; after that one
+    call is let through (half-open) and a success closes the circuit again.
+    Candidates are ranked by latency inflated by their error rate; backends
+    never tried rank first so they get measured.
+    """
+
+    def __init__(self, task_backends: Optional[Dict[str, List[Backend]]] = None,
+                 ewma_alpha: float = ROUTER_EWMA_ALPHA,
+                 failure_threshold: int = ROUTER_FAILURE_THRESHOLD,
+                 cooldown_seconds: float = ROUTER_COOLDOWN_SECONDS,
+                 llm=None):
+        self.task_backends = task_backends or {
+            "correct": parse_backends(ROUTER_CORRECT_BACKENDS) or DEFAULT_TASK_BACKENDS["correct"],
+            "summarize": parse_backends(ROUTER_SUMMARIZE_BACKENDS) or DEFAULT_TASK_BACKENDS["summarize"],
+            "combine": parse_backends(ROUTER_COMBINE_BACKENDS) or DEFAULT_TASK_BACKENDS["combine"],
+        }
+        self.ewma_alpha = ewma_alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.llm = llm or llm_client
+        self._health: Dict[Backend, BackendHealth] = {}
+        self._routed: Dict[str, Dict[str, int]] = {}
+        self.llm.add_observer(self.observe)
+
+    def _backend(self, provider: str, model: str) -> BackendHealth:
+        return self._health.setdefault((provider, model), BackendHealth())
+
+    def observe(self, provider: str, model: str, elapsed: float, error: Optional[Exception]):
+        """Record the outcome of one provider call."""
+        health = self._backend(provider, model)
+        health.calls += 1
+        alpha = self.ewma_alpha
+        health.error_rate = (1 - alpha) * health.error_rate + alpha * (1.0 if error else 0.0)
+        if error is None:
+            health.latency = elapsed if health.latency is None else (1 - alpha) * health.latency + alpha * elapsed
+            health.consecutive_failures = 0
+            health.open_until = 0.0
+            return
+
+        health.errors += 1
+        health.consecutive_failures += 1
+        health.last_error = str(error)[:200]
+        rate_limited = getattr(error, "status", None) == 429
+        if rate_limited or health.consecutive_failures >= self.failure_threshold or health.open_until:
+            # A failed half-open probe re-opens the circuit for another cooldown
+            health.open_until = time.monotonic() + self.cooldown_seconds
+            logger.warning(f"Circuit open for {provider}:{model} for {self.cooldown_seconds:.0f}s "
+                           f"({'rate limited' if rate_limited else f'{health.consecutive_failures} failures'})")
+
+    def _score(self, backend: Backend) -> float:
+        health = self._health.get(backend)
+        if health is None or health.latency is None:
+            return 0.0
+        return health.latency / max(0.05, 1.0 - health.error_rate)
+
+    def candidates(self, task: str) -> List[Backend]:
+        """Backends for a task, best first; open circuits are left out unless every circuit is open."""
+        backends = self.task_backends.get(task)
+        if not backends:
+            raise ValueError(f"Unknown routing task: {task}")
+        now = time.monotonic()
+        available = [b for b in backends if self._backend(*b).state(now) != "open"]
+        if not available:
+            # Everything is cooling down: try the one that reopens first rather than failing outright
+            available = [min(backends, key=lambda b: self._health[b].open_until)]
+        order = {b: i for i, b in enumerate(backends)}
+        return sorted(available, key=lambda b: (self._score(b), order[b]))
+
+    def _count_route(self, task: str, provider: str, model: str) -> bool:
+        """Count a routed call; returns whether it is the half-open probe of its backend."""
+        counters = self._routed.setdefault(task, {})
+        key = f"{provider}:{model}"
+        counters[key] = counters.get(key, 0) + 1
+        health = self._backend(provider, model)
+        if health.state(time.monotonic()) == "half_open":
+            # Only this probe goes through; everyone else keeps skipping the backend
+            health.open_until = time.monotonic() + self.cooldown_seconds
+            return True
+        return False
+
+    def _probe_succeeded(self, provider: str, model: str):
+        """
+        Close the circuit after a half-open probe completed. `observe` already does this
+        for real provider calls; this covers probes answered from the LLM cache.
+        """
+        health = self._backend(provider, model)
+        health.consecutive_failures = 0
+        health.open_until = 0.0
+
+    async def run(self, task: str, call: Callable[[str, str], Awaitable[Any]]) -> Any:
+        """
+        Run `call(provider, model)` on the best backend for `task`, failing over to the
+        next candidate when a provider call raises LLMError.
+        """
+        last_error: Optional[Exception] = None
+        for provider, model in self.candidates(task):
+            probe = self._count_route(task, provider, model)
+            try:
+                result = await call(provider, model)
+            except LLMError as e:
+                last_error = e
+                logger.warning(f"Routed {task} call to {provider}:{model} failed, trying next backend: {str(e)}")
+                continue
+            if probe:
+                self._probe_succeeded(provider, model)
+            return result
+        raise last_error or LLMError(f"No backend available for {task}")
+
+    async def chat(self, task: str, messages: List[Dict[str, str]], call_site: Optional[str] = None, **params) -> str:
+        """Chat completion on the best backend for `task`."""
+        return await self.run(task, lambda provider, model: self.llm.chat(
+            provider, model=model, messages=messages, call_site=call_site, **params
+        ))
+
+    async def stream(self, task: str, messages: List[Dict[str, str]], call_site: Optional[str] = None,
+                     **params) -> AsyncIterator[str]:
+        """
+        Streamed chat completion on the best backend for `task`. Fails over to the
+        next candidate only while nothing has been yielded yet.
+        """
+        last_error: Optional[Exception] = None
+        for provider, model in self.candidates(task):
+            probe = self._count_route(task, provider, model)
+            started = False
+            try:
+                async for delta in self.llm.chat_stream(
+                    provider, model=model, messages=messages, call_site=call_site, **params
+                ):
+                    started = True
+                    yield delta
+                if probe:
+                    self._probe_succeeded(provider, model)
+                return
+            except LLMError as e:
+                if started:
+                    raise
+                last_error = e
+                logger.warning(f"Routed {task} stream to {provider}:{model} failed, trying next backend: {str(e)}")
+        raise last_error or LLMError(f"No backend available for {task}")
+
+    def status(self) -> Dict[str, Any]:
+        """Health of every known backend and the current ranking per task."""
+        now = time.monotonic()
+        return {
+            "backends": {
+                f"{provider}:{model}": {
+                    "state": health.state(now),
+                    "latency_ewma": round(health.latency, 3) if health.latency is not None else None,
+                    "error_rate": round(health.error_rate, 3),
+                    "calls": health.calls,
+                    "errors": health.errors,
+                    "consecutive_failures": health.consecutive_failures,
+                    "reopens_in": round(max(0.0, health.open_until - now), 1) if health.open_until else None,
+                    "last_error": health.last_error
+                }
+                for (provider, model), health in self._health.items()
+            },
+            "tasks": {
+                task: {
+                    "ranking": [f"{p}:{m}" for p, m in self.candidates(task)],
+                    "routed": self._routed.get(task, {})
+                }
+                for task in self.task_backends
+            }
+        }
+
+# Shared router for the whole process
+provider_router = ProviderRouter()
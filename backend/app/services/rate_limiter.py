@@ -0,0 +1,140 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Dict, List, Optional
+import numpy as np
+from app.services.text_chunker import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+def estimate_request_tokens(messages: List[Dict[str, str]], max_tokens: Optional[int]) -> int:
+    """Tokens a request may use: the estimated prompt plus the completion budget."""
+    prompt = sum(estimate_tokens(str(m.get("content", ""))) + 4 for m in messages)
+    return prompt + (max_tokens or 0)
+
+class TokenBucket:
+    """Refills continuously at `per_minute`/60 per second up to one minute's worth; 0 means unlimited."""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.per_minute <= 0
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.per_minute / 60.0)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` (capped at the capacity) is available."""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing * 60.0 / self.per_minute)
+
+    def take(self, amount: float, now: float):
+        if not self.unlimited:
+            self._refill(now)
+            self.level -= min(amount, self.capacity)
+
+    def give_back(self, amount: float):
+        if not self.unlimited:
+            self.level = min(self.capacity, self.level + amount)
+
+class ProviderRateLimiter:
+    """
+    Client-side requests/minute and tokens/minute limits for one provider.
+
+    Callers queue on a FIFO lock, so they are served in arrival order and a
+    large request is not starved by a stream of small ones. The caller at the
+    head waits until both buckets hold enough, takes its share and lets the
+    next one in. Token costs are reserved up front (prompt estimate plus the
+    completion budget); the unused part is returned once the provider reports
+    actual usage. A 429 pauses the provider for its Retry-After period.
+    """
+
+    def __init__(self, provider: str, requests_per_minute: float, tokens_per_minute: float):
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._paused_until = 0.0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.acquired = 0
+        self.delayed = 0
+        self.rate_limited = 0
+        self.total_wait = 0.0
+        self._waits: deque = deque(maxlen=200)
+
+    def _queue(self) -> asyncio.Lock:
+        """The FIFO lock of the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def acquire(self, tokens: int) -> float:
+        """Wait for capacity for one request of `tokens`; returns the seconds spent waiting."""
+        start = time.monotonic()
+        queue = self._queue()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            async with queue:
+                while True:
+                    now = time.monotonic()
+                    delay = max(
+                        self._paused_until - now,
+                        self.requests.wait_time(1, now),
+                        self.tokens.wait_time(tokens, now)
+                    )
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+                now = time.monotonic()
+                self.requests.take(1, now)
+                self.tokens.take(tokens, now)
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - start
+        self.acquired += 1
+        self.total_wait += waited
+        self._waits.append(waited)
+        if waited > 0.01:
+            self.delayed += 1
+            logger.info(f"{self.provider} rate limiter held a request for {waited:.2f}s")
+        return waited
+
+    def settle(self, reserved: int, used: Optional[int]):
+        """Return reserved tokens the request did not use."""
+        if used is not None and used < reserved:
+            self.tokens.give_back(reserved - used)
+
+    def pause(self, seconds: float):
+        """Hold every queued request for `seconds` after the provider answered 429."""
+        self.rate_limited += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = np.fromiter(self._waits, dtype=float) if self._waits else None
+        return {
+            "requests_per_minute": self.requests.per_minute,
+            "tokens_per_minute": self.tokens.per_minute,
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_waiting,
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "rate_limited": self.rate_limited,
+            "avg_wait": round(self.total_wait / self.acquired, 3) if self.acquired else 0.0,
+            "p95_wait": round(float(np.percentile(waits, 95)), 3) if waits is not None else 0.0
+        }
@@ -0,0 +1,151 @@
+import asyncio
+import time
+import logging
+from collections import Counter, deque
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from app.config import REALTIME_BATCH_MAX_SIZE, REALTIME_BATCH_MAX_WAIT_MS
+from app.services.inference_executor import inference_executor
+from app.services.batched_transcriber import BatchedTranscriber
+
+logger = logging.getLogger(__name__)
+
+class _PendingChunk:
+    __slots__ = ("audio", "future", "submitted_at")
+
+    def __init__(self, audio: np.ndarray, future: asyncio.Future):
+        self.audio = audio
+        self.future = future
+        self.submitted_at = time.perf_counter()
+
+class RealtimeBatchScheduler:
+    """
+    Micro-batching of real-time chunks across all live sessions.
+
+    Chunks submitted from any connection are held for at most `max_wait_ms`
+    (or until `max_batch_size` are waiting) and then decoded together with one
+    batched Whisper pass on the inference executor. Chunks are grouped by
+    model, precision and language, since those are fixed per batched decode.
+    Each caller awaits only its own result.
+    """
+
+    def __init__(self, max_batch_size: int = REALTIME_BATCH_MAX_SIZE,
+                 max_wait_ms: float = REALTIME_BATCH_MAX_WAIT_MS,
+                 transcriber: Optional[BatchedTranscriber] = None):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.transcriber = transcriber or BatchedTranscriber(batch_size=self.max_batch_size)
+
+        self._pending: Dict[Tuple[int, bool, Optional[str]], List[_PendingChunk]] = {}
+        self._models: Dict[Tuple[int, bool, Optional[str]], Any] = {}
+        self._timers: Dict[Tuple[int, bool, Optional[str]], asyncio.TimerHandle] = {}
+        self._running: set = set()
+
+        self._batches = 0
+        self._chunks = 0
+        self._failed = 0
+        self._total_queue_wait = 0.0
+        self._max_queue_wait = 0.0
+        self._batch_sizes: Counter = Counter()
+        self._recent_batches = deque(maxlen=100)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_batch_size > 1
+
+    async def submit(self, model: Any, audio: np.ndarray, language: Optional[str] = None,
+                     fp16: bool = False) -> Dict[str, Any]:
+        """Queue one chunk for the next batched decode and wait for its result."""
+        loop = asyncio.get_running_loop()
+        key = (id(model), fp16, language)
+        item = _PendingChunk(audio, loop.create_future())
+
+        pending = self._pending.setdefault(key, [])
+        self._models[key] = model
+        pending.append(item)
+        if len(pending) >= self.max_batch_size:
+            self._flush(key)
+        elif len(pending) == 1:
+            self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+
+        return await item.future
+
+    def _flush(self, key: Tuple[int, bool, Optional[str]]):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        items = self._pending.pop(key, [])
+        if not items:
+            return
+        model = self._models.pop(key)
+        task = asyncio.get_running_loop().create_task(self._run_batch(model, key, items))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, model: Any, key: Tuple[int, bool, Optional[str]], items: List[_PendingChunk]):
+        _, fp16, language = key
+        flushed_at = time.perf_counter()
+        try:
+            results, timing = await inference_executor.run_timed(
+                self.transcriber.transcribe_chunks,
+                model, [item.audio for item in items], language, fp16,
+                model=model,
+                label="realtime_batch"
+            )
+        except Exception as e:
+            self._failed += len(items)
+            logger.error(f"Real-time batch of {len(items)} chunks failed: {str(e)}")
+            for item in items:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+
+        waits = [flushed_at - item.submitted_at + timing["queue_wait"] for item in items]
+        self._batches += 1
+        self._chunks += len(items)
+        self._batch_sizes[len(items)] += 1
+        self._total_queue_wait += sum(waits)
+        self._max_queue_wait = max(self._max_queue_wait, max(waits))
+        self._recent_batches.append({
+            "size": len(items),
+            "max_queue_wait": round(max(waits), 4),
+            "run_time": timing["run_time"]
+        })
+
+        for item, result, wait in zip(items, results, waits):
+            if not item.future.done():
+                result["batch_size"] = len(items)
+                result["queue_wait"] = round(wait, 4)
+                item.future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch-size distribution and queue-wait metrics."""
+        return {
+            "enabled": self.enabled,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait * 1000.0, 1),
+            "pending": sum(len(items) for items in self._pending.values()),
+            "batches": self._batches,
+            "chunks": self._chunks,
+            "failed": self._failed,
+            "avg_batch_size": round(self._chunks / self._batches, 2) if self._batches else 0.0,
+            "batch_sizes": dict(sorted(self._batch_sizes.items())),
+            "avg_queue_wait": round(self._total_queue_wait / self._chunks, 4) if self._chunks else 0.0,
+            "max_queue_wait": round(self._max_queue_wait, 4),
+            "recent_batches": list(self._recent_batches)[-10:]
+        }
+
+    def shutdown(self):
+        """Fail chunks that are still waiting for a batch."""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for items in self._pending.values():
+            for item in items:
+                if not item.future.done():
+                    item.future.cancel()
+        self._pending.clear()
+        self._models.clear()
+
+# Shared scheduler so chunks from every connection land in the same batches
+realtime_scheduler = RealtimeBatchScheduler()
@@ -0,0 +1,155 @@
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.config import (
+    ROLLING_SUMMARY_INTERVAL_SECONDS, ROLLING_SUMMARY_MIN_TOKENS, ROLLING_SUMMARY_MAX_TOKENS
+)
+from app.services.text_chunker import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# fold(state, new_text) -> new state; the state is {"summary", "key_points", "action_items"}
+SummaryFolder = Callable[[Dict[str, Any], str], Awaitable[Dict[str, Any]]]
+
+class RollingSummary:
+    """
+    Running summary of one live session.
+
+    Committed transcript text is collected as it arrives. Once at least
+    `min_tokens` are pending and either `interval_seconds` have passed since
+    the last update or `max_tokens` are pending, the pending text is folded
+    into the running state with one LLM call. Each call sees only the state
+    and the new text, so its cost stays flat however long the meeting runs,
+    instead of growing with the whole transcript. Only one fold runs at a
+    time; text arriving meanwhile waits for the next one. A fold takes at
+    most `max_tokens` of the oldest pending text, so prompts stay bounded even
+    when text piles up during a provider outage; the rest waits for the next
+    trigger. A failed fold keeps its text pending and it is retried then.
+    """
+
+    def __init__(self, interval_seconds: float = ROLLING_SUMMARY_INTERVAL_SECONDS,
+                 min_tokens: int = ROLLING_SUMMARY_MIN_TOKENS,
+                 max_tokens: int = ROLLING_SUMMARY_MAX_TOKENS):
+        self.interval_seconds = interval_seconds
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+        self.state: Dict[str, Any] = {"summary": "", "key_points": [], "action_items": []}
+        self.transcript: List[str] = []
+        self._pending: List[str] = []
+        self._pending_tokens = 0
+        self._last_update = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self.version = 0
+        self.folds = 0
+        self.failed_folds = 0
+        self.folded_tokens = 0
+
+    def add(self, text: str):
+        """Record newly committed transcript text."""
+        text = text.strip()
+        if text:
+            self.transcript.append(text)
+            self._pending.append(text)
+            self._pending_tokens += estimate_tokens(text)
+
+    @property
+    def pending_tokens(self) -> int:
+        return self._pending_tokens
+
+    def due(self, now: Optional[float] = None) -> bool:
+        """Whether enough new text is pending for another update."""
+        if self._task is not None and not self._task.done():
+            return False
+        if self._pending_tokens < max(1, self.min_tokens):
+            return False
+        now = time.monotonic() if now is None else now
+        return self._pending_tokens >= self.max_tokens or now - self._last_update >= self.interval_seconds
+
+    def _take_pending(self) -> Tuple[List[str], int]:
+        """Remove and return the oldest pending pieces up to max_tokens (always at least one)."""
+        count, tokens = 0, 0
+        for text in self._pending:
+            size = estimate_tokens(text)
+            if count and tokens + size > self.max_tokens:
+                break
+            count += 1
+            tokens += size
+        pending = self._pending[:count]
+        self._pending = self._pending[count:]
+        self._pending_tokens -= tokens
+        return pending, tokens
+
+    async def fold(self, folder: SummaryFolder) -> bool:
+        """Fold up to max_tokens of pending text into the state; returns whether the state changed."""
+        if not self._pending:
+            return False
+        pending, tokens = self._take_pending()
+        self._last_update = time.monotonic()
+        try:
+            self.state = await folder(self.state, " ".join(pending))
+        except Exception as e:
+            logger.warning(f"Rolling summary update failed, keeping {tokens} tokens for the next one: {str(e)}")
+            self._pending = pending + self._pending
+            self._pending_tokens += tokens
+            self.failed_folds += 1
+            return False
+        self.version += 1
+        self.folds += 1
+        self.folded_tokens += tokens
+        return True
+
+    def schedule(self, folder: SummaryFolder, on_update: Callable[[Dict[str, Any]], Awaitable[None]]):
+        """Start a fold in the background when one is due; `on_update` gets the new state."""
+        if not self.due():
+            return
+
+        async def run():
+            if await self.fold(folder):
+                try:
+                    await on_update(self.update_message())
+                except Exception as e:
+                    logger.warning(f"Could not deliver rolling summary update: {str(e)}")
+
+        self._task = asyncio.create_task(run())
+
+    async def finish(self, folder: SummaryFolder) -> bool:
+        """Wait for a running fold, then fold whatever text is still pending, max_tokens at a time."""
+        if self._task is not None:
+            try:
+                await self._task
+            except Exception as e:
+                logger.warning(f"Rolling summary update failed: {str(e)}")
+            self._task = None
+        changed = False
+        while self._pending:
+            if not await self.fold(folder):
+                break
+            changed = True
+        return changed
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.transcript)
+
+    def update_message(self) -> Dict[str, Any]:
+        return {
+            "type": "summary_update",
+            "version": self.version,
+            "summary": self.state.get("summary", ""),
+            "key_points": self.state.get("key_points", []),
+            "action_items": self.state.get("action_items", [])
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "folds": self.folds,
+            "failed_folds": self.failed_folds,
+            "folded_tokens": self.folded_tokens,
+            "pending_tokens": self._pending_tokens
+        }
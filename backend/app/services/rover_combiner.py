@@ -0,0 +1,247 @@
+import bisect
+import logging
+from difflib import SequenceMatcher
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from app.services.transcript_stitcher import normalize_word
+
+logger = logging.getLogger(__name__)
+
+Alignment = List[Tuple[Optional[int], Optional[int]]]
+
+def edit_alignment(a: np.ndarray, b: np.ndarray) -> Alignment:
+    """
+    Minimum edit-distance alignment of two token-id sequences.
+    Each DP row is computed with array ops; the in-row insertion recurrence
+    D[j] = min(D[j], D[j-1] + 1) is a running minimum of D[j] - j.
+    Returns (i, j) pairs with None marking an insertion or deletion.
+    """
+    n, m = len(a), len(b)
+    if n == 0 or m == 0:
+        return [(i, None) for i in range(n)] + [(None, j) for j in range(m)]
+    if n == m and n == 1:
+        return [(0, 0)]
+
+    if n * m <= 256:
+        # Array ops cost more than they save on the typical one- or two-word gap
+        a, b = a.tolist(), b.tolist()
+        dist = [list(range(m + 1))]
+        for i in range(1, n + 1):
+            previous = dist[-1]
+            row = [i]
+            for j in range(1, m + 1):
+                row.append(min(previous[j - 1] + (a[i - 1] != b[j - 1]), previous[j] + 1, row[j - 1] + 1))
+            dist.append(row)
+    else:
+        cols = np.arange(m + 1, dtype=np.int32)
+        matrix = np.empty((n + 1, m + 1), dtype=np.int32)
+        matrix[0] = cols
+        for i in range(1, n + 1):
+            previous = matrix[i - 1]
+            row = matrix[i]
+            row[0] = i
+            np.minimum(previous[:-1] + (b != a[i - 1]), previous[1:] + 1, out=row[1:])
+            row[:] = np.minimum.accumulate(row - cols) + cols
+        dist = matrix.tolist()
+        a, b = a.tolist(), b.tolist()
+
+    pairs: Alignment = []
+    i, j = n, m
+    while i > 0 or j > 0:
+        if i > 0 and j > 0 and dist[i][j] == dist[i - 1][j - 1] + (a[i - 1] != b[j - 1]):
+            pairs.append((i - 1, j - 1))
+            i, j = i - 1, j - 1
+        elif i > 0 and dist[i][j] == dist[i - 1][j] + 1:
+            pairs.append((i - 1, None))
+            i -= 1
+        else:
+            pairs.append((None, j - 1))
+            j -= 1
+    pairs.reverse()
+    return pairs
+
+class RoverCombiner:
+    """
+    ROVER-style combination of several transcriptions of the same audio.
+
+    Candidates are aligned word by word against a backbone candidate. To stay
+    fast on hour-long transcripts, alignment first pins trigrams that occur
+    exactly once in both texts (kept in order via a longest increasing
+    subsequence) and only runs edit-distance DP on the short gaps between
+    them. Every backbone position, plus every insertion between positions,
+    is a slot; candidates vote per slot (an omitted word votes for nothing)
+    and the majority wins, ties going to the earlier candidate. The share of
+    candidates agreeing with each slot's outcome gives a word-level confidence.
+    """
+
+    ngram = 3
+    # Gaps whose DP matrix would exceed this many cells fall back to difflib
+    max_dp_cells = 4_000_000
+
+    def combine(self, texts: List[str]) -> Dict[str, Any]:
+        """Return {"text", "confidence", "slots", "candidates"} for the candidate texts."""
+        candidates = [t.split() for t in texts if t and t.strip()]
+        if not candidates:
+            return {"text": "", "confidence": 0.0, "slots": 0, "candidates": 0}
+        if len(candidates) == 1:
+            return {"text": " ".join(candidates[0]), "confidence": 0.5, "slots": len(candidates[0]), "candidates": 1}
+
+        # Token ids of normalized words; each distinct surface form is normalized once
+        vocab: Dict[str, int] = {}
+        surface_ids: Dict[str, int] = {}
+        for words in candidates:
+            for w in words:
+                if w not in surface_ids:
+                    surface_ids[w] = vocab.setdefault(normalize_word(w) or w, len(vocab))
+        ids = [np.array([surface_ids[w] for w in words], dtype=np.int64) for words in candidates]
+
+        # Backbone: the candidate whose length is closest to the median
+        lengths = np.array([len(words) for words in candidates])
+        backbone = int(np.argmin(np.abs(lengths - np.median(lengths))))
+        order = [backbone] + [c for c in range(len(candidates)) if c != backbone]
+
+        n_voters = len(order)
+        length = len(candidates[backbone])
+        # votes[v, p]: token id that voter v puts in backbone slot p (-1 = no word)
+        votes = np.full((n_voters, length), -1, dtype=np.int64)
+        surfaces = np.empty((n_voters, length), dtype=object)
+        votes[0] = ids[backbone]
+        surfaces[0] = candidates[backbone]
+        # Insertions before backbone position p: {(p, k): [(voter, id, word)]}
+        insertions: Dict[Tuple[int, int], List[Tuple[int, int, str]]] = {}
+
+        for voter, c in enumerate(order[1:], start=1):
+            pairs = self.align(ids[backbone], ids[c])
+            matched = np.array([(p, q) for p, q in pairs if p is not None and q is not None], dtype=np.int64).reshape(-1, 2)
+            votes[voter, matched[:, 0]] = ids[c][matched[:, 1]]
+            surfaces[voter, matched[:, 0]] = np.array(candidates[c], dtype=object)[matched[:, 1]]
+
+            candidate_ids = ids[c].tolist()
+            inserted_before = 0
+            last_p = -1
+            for p, q in pairs:
+                if p is not None:
+                    last_p, inserted_before = p, 0
+                else:
+                    slot = (last_p + 1, inserted_before)
+                    insertions.setdefault(slot, []).append((voter, candidate_ids[q], candidates[c][q]))
+                    inserted_before += 1
+
+        # Per-slot majority over voters; argmax keeps the earliest voter on ties
+        agree = (votes[:, None, :] == votes[None, :, :]).sum(axis=1)
+        winner = agree.argmax(axis=0)
+        columns = np.arange(length)
+        winning_ids = votes[winner, columns]
+        slot_agreement = agree[winner, columns] / n_voters
+
+        words: List[str] = []
+        agreements: List[float] = slot_agreement.tolist()
+        for p in range(length + 1):
+            k = 0
+            while (p, k) in insertions:
+                voters = insertions[(p, k)]
+                counts: Dict[int, int] = {}
+                for _, token, _ in voters:
+                    counts[token] = counts.get(token, 0) + 1
+                token, count = max(counts.items(), key=lambda item: item[1])
+                # Inserted words need a strict majority over the voters that omitted them
+                if count * 2 > n_voters:
+                    words.append(next(w for _, t, w in voters if t == token))
+                    agreements.append(count / n_voters)
+                else:
+                    agreements.append(1.0 - len(voters) / n_voters)
+                k += 1
+            if p < length and winning_ids[p] != -1:
+                words.append(surfaces[winner[p], p])
+
+        return {
+            "text": " ".join(words),
+            "confidence": round(float(np.mean(agreements)), 4) if agreements else 0.0,
+            "slots": len(agreements),
+            "candidates": n_voters
+        }
+
+    def align(self, a: np.ndarray, b: np.ndarray) -> Alignment:
+        """Anchor on shared unique trigrams, then edit-distance align the gaps between anchors."""
+        pairs: Alignment = []
+        i = j = 0
+        for anchor_a, anchor_b in self._anchors(a, b):
+            if anchor_a < i or anchor_b < j:
+                continue
+            pairs.extend(self._align_gap(a, b, i, anchor_a, j, anchor_b))
+            # Extend the anchor over the whole run of agreeing words
+            span = min(len(a) - anchor_a, len(b) - anchor_b)
+            differs = a[anchor_a:anchor_a + span] != b[anchor_b:anchor_b + span]
+            run = int(np.argmax(differs)) if differs.any() else span
+            pairs.extend(zip(range(anchor_a, anchor_a + run), range(anchor_b, anchor_b + run)))
+            i, j = anchor_a + run, anchor_b + run
+        pairs.extend(self._align_gap(a, b, i, len(a), j, len(b)))
+        return pairs
+
+    def _anchors(self, a: np.ndarray, b: np.ndarray) -> List[Tuple[int, int]]:
+        n = self.ngram
+        if len(a) < n or len(b) < n:
+            return []
+        base = int(max(a.max(), b.max())) + 1
+
+        def unique_grams(seq: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            count = len(seq) - n + 1
+            grams = np.zeros(count, dtype=np.int64)
+            for k in range(n):
+                grams = grams * base + seq[k:k + count]
+            values, first, counts = np.unique(grams, return_index=True, return_counts=True)
+            once = counts == 1
+            return values[once], first[once]
+
+        values_a, pos_a = unique_grams(a)
+        values_b, pos_b = unique_grams(b)
+        _, in_a, in_b = np.intersect1d(values_a, values_b, assume_unique=True, return_indices=True)
+        if len(in_a) == 0:
+            return []
+        order = np.argsort(pos_a[in_a])
+        matched_a = pos_a[in_a][order].tolist()
+        matched_b = pos_b[in_b][order].tolist()
+
+        # Longest increasing run of b positions keeps the anchors in order in both texts
+        tails: List[int] = []
+        tail_index: List[int] = []
+        parent = [-1] * len(matched_b)
+        for k, value in enumerate(matched_b):
+            slot = bisect.bisect_left(tails, value)
+            if slot == len(tails):
+                tails.append(value)
+                tail_index.append(k)
+            else:
+                tails[slot] = value
+                tail_index[slot] = k
+            parent[k] = tail_index[slot - 1] if slot > 0 else -1
+        chain = []
+        k = tail_index[-1] if tail_index else -1
+        while k != -1:
+            chain.append((matched_a[k], matched_b[k]))
+            k = parent[k]
+        chain.reverse()
+        return chain
+
+    def _align_gap(self, a: np.ndarray, b: np.ndarray, a_start: int, a_end: int,
+                   b_start: int, b_end: int) -> Alignment:
+        gap_a, gap_b = a[a_start:a_end], b[b_start:b_end]
+        if len(gap_a) * len(gap_b) <= self.max_dp_cells:
+            local = edit_alignment(gap_a, gap_b)
+        else:
+            local = self._difflib_alignment(gap_a, gap_b)
+        return [
+            (None if i is None else a_start + i, None if j is None else b_start + j)
+            for i, j in local
+        ]
+
+    def _difflib_alignment(self, a: np.ndarray, b: np.ndarray) -> Alignment:
+        pairs: Alignment = []
+        matcher = SequenceMatcher(None, a.tolist(), b.tolist(), autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            span = max(i2 - i1, j2 - j1)
+            for k in range(span):
+                i = i1 + k if i1 + k < i2 else None
+                j = j1 + k if j1 + k < j2 else None
+                pairs.append((i, j))
+        return pairs
@@ -0,0 +1,133 @@
+import re
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.config import (
+    SELECTIVE_LOGPROB_THRESHOLD, SELECTIVE_NO_SPEECH_THRESHOLD,
+    SELECTIVE_COMPRESSION_THRESHOLD, SELECTIVE_CONTEXT_SEGMENTS,
+    LLM_CORRECTION_CHUNK_TOKENS, LLM_CORRECTION_CONCURRENCY
+)
+from app.services.text_chunker import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# correct(passage, context_before, context_after) -> corrected passage (None keeps the original)
+SpanCorrector = Callable[[str, str, str], Awaitable[Optional[str]]]
+
+class SelectiveCorrector:
+    """
+    Sends only the doubtful parts of a transcript to the LLM.
+
+    Whisper reports per segment the average token log-probability, the
+    probability that the segment is not speech and the text's compression
+    ratio (high for repetition loops). Segments that cross any threshold, or
+    that have no metrics, are grouped with adjacent flagged segments into
+    spans up to the token budget; each span is corrected with a little
+    surrounding text as read-only context. Confident segments pass through
+    untouched, and a span whose correction fails keeps its original text.
+    """
+
+    def __init__(self, logprob_threshold: float = SELECTIVE_LOGPROB_THRESHOLD,
+                 no_speech_threshold: float = SELECTIVE_NO_SPEECH_THRESHOLD,
+                 compression_threshold: float = SELECTIVE_COMPRESSION_THRESHOLD,
+                 context_segments: int = SELECTIVE_CONTEXT_SEGMENTS,
+                 max_tokens: int = LLM_CORRECTION_CHUNK_TOKENS,
+                 concurrency: int = LLM_CORRECTION_CONCURRENCY):
+        self.logprob_threshold = logprob_threshold
+        self.no_speech_threshold = no_speech_threshold
+        self.compression_threshold = compression_threshold
+        self.context_segments = context_segments
+        self.max_tokens = max_tokens
+        self.concurrency = concurrency
+
+    def needs_correction(self, segment: Dict[str, Any]) -> bool:
+        """True when Whisper was unsure about a segment (or reported nothing about it)."""
+        avg_logprob = segment.get("avg_logprob")
+        no_speech_prob = segment.get("no_speech_prob")
+        compression_ratio = segment.get("compression_ratio")
+        if avg_logprob is None or no_speech_prob is None or compression_ratio is None:
+            return True
+        return (
+            avg_logprob < self.logprob_threshold
+            or no_speech_prob > self.no_speech_threshold
+            or compression_ratio > self.compression_threshold
+        )
+
+    def plan_spans(self, segments: List[Dict[str, Any]]) -> List[Tuple[int, int]]:
+        """[start, end) segment ranges to correct: runs of flagged segments within the token budget."""
+        spans: List[Tuple[int, int]] = []
+        start = None
+        tokens = 0
+        for i, segment in enumerate(segments):
+            if not segment.get("text") or not self.needs_correction(segment):
+                if start is not None:
+                    spans.append((start, i))
+                    start = None
+                continue
+            segment_tokens = estimate_tokens(segment["text"])
+            if start is not None and tokens + segment_tokens > self.max_tokens:
+                spans.append((start, i))
+                start = None
+            if start is None:
+                start, tokens = i, 0
+            tokens += segment_tokens
+        if start is not None:
+            spans.append((start, len(segments)))
+        return spans
+
+    async def correct(self, segments: List[Dict[str, Any]], correct: SpanCorrector) -> Dict[str, Any]:
+        """
+        Correct the flagged spans of `segments` concurrently.
+        Returns {"text", "segments", "spans", "failed", "skipped_fraction"}; segments
+        in corrected spans get the corrected words (spread by their original word counts).
+        """
+        spans = self.plan_spans(segments)
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+
+        def context(start: int, end: int) -> str:
+            return " ".join(s.get("text", "") for s in segments[max(0, start):max(0, end)]).strip()
+
+        async def run(start: int, end: int) -> Optional[str]:
+            passage = context(start, end)
+            async with semaphore:
+                try:
+                    corrected = await correct(
+                        passage,
+                        context(start - self.context_segments, start),
+                        context(end, end + self.context_segments)
+                    )
+                except Exception as e:
+                    logger.warning(f"Correction of segments {start}-{end - 1} failed, keeping original: {str(e)}")
+                    return None
+            return corrected.strip() if corrected and corrected.strip() else None
+
+        results = await asyncio.gather(*(run(start, end) for start, end in spans))
+
+        output = [dict(segment) for segment in segments]
+        corrected_chars = 0
+        for (start, end), corrected in zip(spans, results):
+            corrected_chars += len(context(start, end))
+            if corrected is None:
+                continue
+            words = corrected.split()
+            counts = [len(str(s.get("text", "")).split()) for s in segments[start:end]]
+            total = sum(counts) or 1
+            # Spread the corrected words over the span's segments in proportion to their original length
+            position = 0
+            consumed = 0
+            for offset, count in enumerate(counts):
+                consumed += count
+                cut = len(words) if start + offset == end - 1 else round(len(words) * consumed / total)
+                output[start + offset]["text"] = " ".join(words[position:cut])
+                output[start + offset]["corrected"] = True
+                position = cut
+
+        total_chars = sum(len(str(s.get("text", ""))) for s in segments)
+        text = re.sub(r"\s+", " ", " ".join(str(s.get("text", "")) for s in output)).strip()
+        return {
+            "text": text,
+            "segments": output,
+            "spans": len(spans),
+            "failed": sum(1 for r in results if r is None),
+            "skipped_fraction": round(1.0 - corrected_chars / total_chars, 4) if total_chars else 1.0
+        }
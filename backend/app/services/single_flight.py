@@ -0,0 +1,46 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one run.
+
+    The first caller for a key starts the job as its own task; callers that
+    arrive while it is in flight await that task instead of starting another
+    one. Every caller gets the same result (or exception). The job is shielded,
+    so one caller disconnecting does not cancel the work for the others.
+    """
+
+    def __init__(self, name: str = "jobs"):
+        self.name = name
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, job: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Run `job` once per key at a time; returns (result, joined an existing run)."""
+        task = self._in_flight.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced += 1
+            logger.info(f"Coalesced request onto in-flight {self.name} job {key[:12]}")
+        else:
+            self.started += 1
+            task = asyncio.ensure_future(job())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._in_flight),
+            "started": self.started,
+            "coalesced": self.coalesced
+        }
@@ -0,0 +1,111 @@
+import threading
+import logging
+from typing import Dict, Any, Optional
+import numpy as np
+from app.config import (
+    SPEECH_GATE, SPEECH_GATE_THRESHOLD_DB, SPEECH_GATE_MIN_SPEECH_SECONDS, SPEECH_GATE_ABSOLUTE_FLOOR_DB
+)
+
+logger = logging.getLogger(__name__)
+
+class SpeechGateMetrics:
+    """Process-wide counters shared by every gate, for the CPU saved on silent chunks."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.chunks_checked = 0
+        self.decodes_avoided = 0
+        self.seconds_checked = 0.0
+        self.seconds_skipped = 0.0
+
+    def record(self, seconds: float, has_speech: bool):
+        with self._lock:
+            self.chunks_checked += 1
+            self.seconds_checked += seconds
+            if not has_speech:
+                self.decodes_avoided += 1
+                self.seconds_skipped += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": SPEECH_GATE,
+                "chunks_checked": self.chunks_checked,
+                "decodes_avoided": self.decodes_avoided,
+                "avoided_ratio": round(self.decodes_avoided / self.chunks_checked, 4) if self.chunks_checked else 0.0,
+                "seconds_checked": round(self.seconds_checked, 2),
+                "seconds_skipped": round(self.seconds_skipped, 2)
+            }
+
+speech_gate_metrics = SpeechGateMetrics()
+
+class SpeechGate:
+    """
+    Cheap no-speech check run before a real-time Whisper decode.
+
+    Each chunk is framed (25 ms frames, 10 ms hop) and two vectorized
+    features are computed per frame: power in dB and the share of spectral
+    energy in the voice band (80-4000 Hz). A frame counts as speech when it
+    is louder than the session's noise floor by `threshold_db` and most of its
+    energy sits in the voice band (broadband noise spreads up to 8 kHz); the
+    chunk passes when enough speech frames are found. The noise floor is tracked per session from the quiet frames
+    of each chunk, so it follows fans, room tone and mic gain over a call.
+    """
+
+    frame_seconds = 0.025
+    hop_seconds = 0.010
+    speech_band = (80.0, 4000.0)
+    min_band_ratio = 0.6
+    # How fast the floor follows quieter / louder surroundings
+    floor_attack = 0.5
+    floor_release = 0.05
+
+    def __init__(self, sample_rate: int = 16000,
+                 threshold_db: float = SPEECH_GATE_THRESHOLD_DB,
+                 min_speech_seconds: float = SPEECH_GATE_MIN_SPEECH_SECONDS,
+                 absolute_floor_db: float = SPEECH_GATE_ABSOLUTE_FLOOR_DB):
+        self.sample_rate = sample_rate
+        self.threshold_db = threshold_db
+        self.absolute_floor_db = absolute_floor_db
+        self.frame_length = int(self.frame_seconds * sample_rate)
+        self.hop_length = int(self.hop_seconds * sample_rate)
+        self.min_speech_frames = max(1, int(min_speech_seconds / self.hop_seconds))
+        self.noise_floor_db: Optional[float] = None
+
+        freqs = np.fft.rfftfreq(self.frame_length, 1.0 / sample_rate)
+        self._band = (freqs >= self.speech_band[0]) & (freqs <= self.speech_band[1])
+        self._window = np.hanning(self.frame_length).astype(np.float32)
+
+    def has_speech(self, audio: np.ndarray) -> bool:
+        """True when the chunk is worth decoding; also updates the noise floor and metrics."""
+        seconds = len(audio) / self.sample_rate
+        if len(audio) < self.frame_length:
+            speech = False
+        else:
+            speech = self._check(audio.astype(np.float32, copy=False))
+        speech_gate_metrics.record(seconds, speech)
+        return speech
+
+    def _check(self, audio: np.ndarray) -> bool:
+        frames = np.lib.stride_tricks.sliding_window_view(audio, self.frame_length)[::self.hop_length]
+        power_db = 10.0 * np.log10(np.einsum("ij,ij->i", frames, frames) / self.frame_length + 1e-10)
+
+        chunk_floor = float(np.percentile(power_db, 10))
+        if self.noise_floor_db is None:
+            self.noise_floor_db = chunk_floor
+        floor = max(self.noise_floor_db, self.absolute_floor_db)
+
+        loud = power_db > floor + self.threshold_db
+        speech_frames = 0
+        if np.count_nonzero(loud) >= self.min_speech_frames:
+            # Spectral check only on the frames that passed the energy test
+            spectrum = np.abs(np.fft.rfft(frames[loud] * self._window, axis=1)) ** 2
+            band_ratio = spectrum[:, self._band].sum(axis=1) / (spectrum.sum(axis=1) + 1e-10)
+            speech_frames = int(np.count_nonzero(band_ratio > self.min_band_ratio))
+
+        # Follow a falling floor quickly and a rising one slowly, so speech
+        # cannot drag the floor up to its own level
+        rate = self.floor_attack if chunk_floor < self.noise_floor_db else self.floor_release
+        self.noise_floor_db += rate * (chunk_floor - self.noise_floor_db)
+
+        return speech_frames >= self.min_speech_frames
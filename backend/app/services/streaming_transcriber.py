@@ -0,0 +1,176 @@
+import logging
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+import numpy as np
+from app.config import (
+    STREAMING_MIN_DECODE_SECONDS, STREAMING_MAX_BUFFER_SECONDS, STREAMING_PROMPT_CHARS
+)
+from app.services.transcript_stitcher import normalize_word
+
+logger = logging.getLogger(__name__)
+
+# (audio, prompt, language) -> Whisper transcribe-style result with segments
+TranscribeFn = Callable[[np.ndarray, Optional[str], Optional[str]], Awaitable[Dict[str, Any]]]
+
+class StreamingSession:
+    """
+    Per-connection streaming transcription with a rolling audio window.
+
+    Incoming audio is appended to a buffer holding only the not-yet-committed
+    tail of the stream. Each decode covers that tail, and words are committed
+    once two consecutive hypotheses agree on them (local agreement). Committed
+    audio is trimmed at segment boundaries, so the same audio is not decoded
+    over and over, and committed text is fed back as the decoding prompt.
+    """
+
+    # Whisper's no-speech rule for dropping hallucinated segments
+    no_speech_threshold = 0.6
+    logprob_threshold = -1.0
+
+    def __init__(self, transcribe: TranscribeFn, language: Optional[str] = None,
+                 sample_rate: int = 16000,
+                 min_decode_seconds: float = STREAMING_MIN_DECODE_SECONDS,
+                 max_buffer_seconds: float = STREAMING_MAX_BUFFER_SECONDS,
+                 prompt_chars: int = STREAMING_PROMPT_CHARS):
+        self.transcribe = transcribe
+        self.language = language
+        self.sample_rate = sample_rate
+        self.min_decode_samples = int(min_decode_seconds * sample_rate)
+        self.max_buffer_samples = int(min(max_buffer_seconds, 28.0) * sample_rate)
+        self.prompt_chars = prompt_chars
+
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_offset = 0.0  # stream time of buffer[0], in seconds
+        self.samples_since_decode = 0
+        self.committed: List[Dict[str, Any]] = []
+        self.hypothesis: List[Dict[str, Any]] = []
+        self.decodes = 0
+        self.decoded_seconds = 0.0
+
+    @property
+    def committed_text(self) -> str:
+        return " ".join(w["word"] for w in self.committed)
+
+    async def add_audio(self, audio: np.ndarray) -> Dict[str, Any]:
+        """
+        Append audio and decode the uncommitted tail when enough new audio arrived.
+        Returns {"final": newly committed text, "partial": current unconfirmed text, ...}.
+        """
+        self.buffer = np.concatenate([self.buffer, audio.astype(np.float32, copy=False)])
+        self.samples_since_decode += len(audio)
+        if self.samples_since_decode < self.min_decode_samples:
+            return self._update([], decoded=False)
+
+        words, segment_ends = await self._decode()
+        new_words = self._drop_already_committed(words)
+
+        # Local agreement: commit the common prefix of this and the previous hypothesis
+        agreed = 0
+        for previous, current in zip(self.hypothesis, new_words):
+            if previous["norm"] != current["norm"]:
+                break
+            agreed += 1
+        newly_committed = new_words[:agreed]
+        self.hypothesis = new_words[agreed:]
+        self.committed.extend(newly_committed)
+
+        self._trim(segment_ends)
+        return self._update(newly_committed, decoded=True)
+
+    async def finish(self) -> Dict[str, Any]:
+        """Decode whatever is left and commit it all (end of stream)."""
+        newly_committed: List[Dict[str, Any]] = []
+        if len(self.buffer) >= self.sample_rate // 4:
+            words, _ = await self._decode()
+            newly_committed = self._drop_already_committed(words)
+        elif self.hypothesis:
+            newly_committed = self.hypothesis
+        self.committed.extend(newly_committed)
+        self.hypothesis = []
+        self.buffer = np.zeros(0, dtype=np.float32)
+        return self._update(newly_committed, decoded=bool(newly_committed))
+
+    async def _decode(self):
+        """Transcribe the buffer; returns hypothesis words and segment end times (stream time)."""
+        prompt = self.committed_text[-self.prompt_chars:] or None
+        result = await self.transcribe(self.buffer, prompt, self.language)
+        self.samples_since_decode = 0
+        self.decodes += 1
+        self.decoded_seconds += len(self.buffer) / self.sample_rate
+
+        words: List[Dict[str, Any]] = []
+        segment_ends: List[float] = []
+        for segment in result.get("segments", []):
+            if ((segment.get("no_speech_prob") or 0.0) > self.no_speech_threshold
+                    and (segment.get("avg_logprob") or 0.0) < self.logprob_threshold):
+                continue
+            tokens = str(segment.get("text", "")).split()
+            if not tokens:
+                continue
+            start = self.buffer_offset + float(segment["start"])
+            end = self.buffer_offset + float(segment["end"])
+            total_chars = sum(len(t) for t in tokens) or 1
+            consumed = 0
+            for token in tokens:
+                word_start = start + (end - start) * consumed / total_chars
+                consumed += len(token)
+                words.append({
+                    "word": token,
+                    "norm": normalize_word(token),
+                    "start": word_start,
+                    "end": start + (end - start) * consumed / total_chars,
+                    "segment_end": end
+                })
+            segment_ends.append(end)
+        return words, segment_ends
+
+    def _drop_already_committed(self, words: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Remove words at the head of a hypothesis that repeat the committed tail."""
+        if not self.committed:
+            return words
+        last_end = self.committed[-1]["end"]
+        words = [w for w in words if w["end"] > last_end - 0.1]
+        committed_tail = [w["norm"] for w in self.committed[-5:]]
+        for n in range(min(5, len(committed_tail), len(words)), 0, -1):
+            if committed_tail[-n:] == [w["norm"] for w in words[:n]]:
+                return words[n:]
+        return words
+
+    def _trim(self, segment_ends: List[float]):
+        """Drop committed audio from the buffer at the last fully committed segment end."""
+        if not self.committed:
+            cut_time = None
+        else:
+            committed_until = self.committed[-1]["end"]
+            pending_ends = {w["segment_end"] for w in self.hypothesis}
+            candidates = [end for end in segment_ends if end <= committed_until + 0.05 and end not in pending_ends]
+            cut_time = max(candidates) if candidates else None
+
+        if cut_time is None and len(self.buffer) > self.max_buffer_samples:
+            # Nothing agreed for too long; commit the hypothesis rather than grow past Whisper's window
+            logger.debug("Streaming buffer full, force-committing hypothesis")
+            self.committed.extend(self.hypothesis)
+            cut_time = self.hypothesis[-1]["end"] if self.hypothesis else self.buffer_offset + len(self.buffer) / self.sample_rate
+            self.hypothesis = []
+
+        if cut_time is not None and cut_time > self.buffer_offset:
+            cut = min(len(self.buffer), int(round((cut_time - self.buffer_offset) * self.sample_rate)))
+            self.buffer = self.buffer[cut:]
+            self.buffer_offset += cut / self.sample_rate
+
+    def _update(self, newly_committed: List[Dict[str, Any]], decoded: bool) -> Dict[str, Any]:
+        return {
+            "final": " ".join(w["word"] for w in newly_committed),
+            "final_start": newly_committed[0]["start"] if newly_committed else None,
+            "final_end": newly_committed[-1]["end"] if newly_committed else None,
+            "partial": " ".join(w["word"] for w in self.hypothesis),
+            "decoded": decoded,
+            "buffer_seconds": round(len(self.buffer) / self.sample_rate, 2)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "decodes": self.decodes,
+            "decoded_seconds": round(self.decoded_seconds, 2),
+            "stream_seconds": round(self.buffer_offset + len(self.buffer) / self.sample_rate, 2),
+            "committed_words": len(self.committed)
+        }
@@ -1,16 +1,26 @@
 
+import asyncio
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
 import json
 import re
-from groq import Groq
-from app.config import GROQ_API_KEY, GROQ_MODEL
+from app.services.llm_client import llm_client
+from app.services.provider_router import provider_router
+from app.services.json_stream import SummaryStreamParser
+from app.services.map_reduce_summary import MapReduceSummarizer
+from app.services.text_chunker import estimate_tokens
+from app.services.extractive_summary import extractive_summary
+from app.config import SUMMARY_MAP_REDUCE_TOKENS, SUMMARY_MODE
 
 logger = logging.getLogger(__name__)
 
 class Summarizer:
     def __init__(self):
-        self.client = Groq(api_key=GROQ_API_KEY)
+        self.llm = llm_client
+        # Each summary goes to the fastest healthy backend, failing over on provider errors
+        self.router = provider_router
+        # Transcripts too long for one prompt are summarized section by section
+        self.map_reduce = MapReduceSummarizer()
 
     async def generate_summary(self, text: str, max_length: int = 300) -> Optional[str]:
         """
@@ -29,8 +39,9 @@ class Summarizer:
             {text}
             """
 
-            response = self.client.chat.completions.create(
-                model=GROQ_MODEL,
+            content = await self.router.chat(
+                "summarize",
+                call_site="generate_summary",
                 messages=[
                     {"role": "system", "content": "You are an expert meeting summarizer. Create clear, actionable summaries."},
                     {"role": "user", "content": prompt}
@@ -39,7 +50,7 @@ class Summarizer:
                 temperature=0.3
             )
 
-            summary = response.choices[0].message.content.strip() if response.choices[0].message.content else "Summary generation failed"
+            summary = content.strip() if content else "Summary generation failed"
             return summary
 
         except Exception as e:
@@ -55,14 +66,9 @@ class Summarizer:
             return "Text too short for summarization"
 
         try:
-            # Extract first few sentences as quick summary
-            sentences = text.split('.')
-            quick_summary = '.'.join(sentences[:3]).strip() + '.'
-
-            if len(quick_summary) > max_length:
-                quick_summary = quick_summary[:max_length-3] + "..."
-
-            return quick_summary
+            # Best-ranked sentences picked locally, no API call
+            quick_summary = extractive_summary(text, max_chars=max_length)["full_summary"]
+            return quick_summary or text[:max_length]
 
         except Exception as e:
             logger.error(f"Ultra-fast summarization failed: {str(e)}")
@@ -81,8 +87,9 @@ class Summarizer:
             Transcription 2 (OpenRouter): {openrouter_text}
             """
 
-            response = self.client.chat.completions.create(
-                model=GROQ_MODEL,
+            content = await self.router.chat(
+                "summarize",
+                call_site="generate_multi_api_summary",
                 messages=[
                     {"role": "system", "content": "You are an expert at reconciling multiple transcriptions into accurate summaries."},
                     {"role": "user", "content": combined_prompt}
@@ -91,7 +98,7 @@ class Summarizer:
                 temperature=0.2
             )
 
-            return response.choices[0].message.content.strip() if response.choices[0].message.content else "Multi-API summary failed"
+            return content.strip() if content else "Multi-API summary failed"
 
         except Exception as e:
             logger.error(f"Multi-API summarization failed: {str(e)}")
@@ -134,8 +141,9 @@ class Summarizer:
             {combined_transcriptions}
             """
 
-            response = self.client.chat.completions.create(
-                model=GROQ_MODEL,
+            content = await self.router.chat(
+                "summarize",
+                call_site="generate_multi_model_summary",
                 messages=[
                     {"role": "system", "content": "You are an expert at analyzing multiple transcriptions and creating accurate, actionable meeting summaries."},
                     {"role": "user", "content": prompt}
@@ -144,7 +152,7 @@ class Summarizer:
                 temperature=0.2
             )
 
-            summary = response.choices[0].message.content.strip() if response.choices[0].message.content else None
+            summary = content.strip() if content else None
 
             if summary:
                 return summary
@@ -165,6 +173,8 @@ class Summarizer:
         - Key points
         - Action items
         - Conclusion
+        Transcripts above SUMMARY_MAP_REDUCE_TOKENS are summarized map-reduce.
+        With SUMMARY_MODE=extractive no LLM is called at all.
         """
         if not text or len(text.strip()) < 10:
             return {
@@ -174,8 +184,246 @@ class Summarizer:
                 "conclusion": "Insufficient content for analysis"
             }
 
+        if SUMMARY_MODE == "extractive":
+            return await self.generate_extractive_summary(text)
+
+        if estimate_tokens(text) > SUMMARY_MAP_REDUCE_TOKENS:
+            return await self._map_reduce_comprehensive_summary(text)
+
         try:
-            prompt = f"""
+            content = await self.router.chat(
+                "summarize",
+                call_site="generate_comprehensive_summary",
+                messages=self._comprehensive_messages(text),
+                max_tokens=1500,
+                temperature=0.3
+            )
+            return self._parse_comprehensive_response(content, text)
+
+        except Exception as e:
+            logger.error(f"Comprehensive summarization failed: {str(e)}")
+            return self._fallback_comprehensive_summary(text)
+
+    async def stream_comprehensive_summary(self, text: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streamed variant of generate_comprehensive_summary. Yields parser events
+        (summary text deltas, then each key point and action item as soon as it is
+        complete) and finally {"type": "done", "summary": ...} with the same
+        result generate_comprehensive_summary would return. An extractive
+        {"type": "draft", "summary": ...} comes first so clients can show
+        something at once.
+        """
+        if not text or len(text.strip()) < 10 or SUMMARY_MODE == "extractive":
+            yield {"type": "done", "summary": await self.generate_comprehensive_summary(text)}
+            return
+
+        yield {"type": "draft", "summary": await self.generate_extractive_summary(text)}
+
+        # Long transcripts: summarize the sections first, then stream the reduce call
+        collapsed = None
+        call_site = "generate_comprehensive_summary"
+        messages = self._comprehensive_messages(text)
+        if estimate_tokens(text) > SUMMARY_MAP_REDUCE_TOKENS:
+            collapsed = await self.map_reduce.collapse(text, self._summarize_section, self._merge_partials)
+            call_site = "reduce_summary"
+            messages = self._reduce_messages(collapsed["partials"])
+
+        parser = SummaryStreamParser()
+        parts: List[str] = []
+        try:
+            async for delta in self.router.stream(
+                "summarize",
+                call_site=call_site,
+                messages=messages,
+                max_tokens=1500,
+                temperature=0.3
+            ):
+                parts.append(delta)
+                for event in parser.feed(delta):
+                    yield event
+            summary = self._parse_comprehensive_response("".join(parts), text)
+        except Exception as e:
+            logger.error(f"Streamed comprehensive summarization failed: {str(e)}")
+            summary = self._fallback_comprehensive_summary(text) if collapsed is None else self._partials_summary(collapsed["partials"])
+        if collapsed is not None:
+            self._add_map_reduce_stats(summary, collapsed)
+        yield {"type": "done", "summary": summary}
+
+    async def _map_reduce_comprehensive_summary(self, text: str) -> Dict[str, Any]:
+        """Comprehensive summary of a long transcript from summaries of its sections."""
+        collapsed = await self.map_reduce.collapse(text, self._summarize_section, self._merge_partials)
+        try:
+            content = await self.router.chat(
+                "summarize",
+                call_site="reduce_summary",
+                messages=self._reduce_messages(collapsed["partials"]),
+                max_tokens=1500,
+                temperature=0.3
+            )
+            summary = self._parse_comprehensive_response(content, text)
+        except Exception as e:
+            logger.error(f"Reducing section summaries failed: {str(e)}")
+            summary = self._partials_summary(collapsed["partials"])
+        return self._add_map_reduce_stats(summary, collapsed)
+
+    def _add_map_reduce_stats(self, summary: Dict[str, Any], collapsed: Dict[str, Any]) -> Dict[str, Any]:
+        """Attach the collapse stats; failed sections or merges make the summary a fallback."""
+        summary["map_reduce"] = {k: v for k, v in collapsed.items() if k != "partials"}
+        if collapsed["failed"]:
+            # Those sections only contributed their opening sentences, so the result must not be cached
+            summary["fallback"] = True
+        return summary
+
+    async def _summarize_section(self, section: str) -> Dict[str, Any]:
+        # Partials are cached by the map-reduce summarizer regardless of the backend that wrote them
+        content = await self.router.chat(
+            "summarize",
+            call_site="summarize_section",
+            messages=[
+                {"role": "system", "content": "You are an expert meeting analyst. Summarize one section of a longer meeting in valid JSON format."},
+                {"role": "user", "content": f"""
+            Summarize this section of a meeting transcription and return a JSON object with exactly these fields:
+
+            summary: What was discussed and decided in this section (60-120 words)
+            key_points: Array of the main topics of this section
+            action_items: Array of specific action items mentioned in this section (empty if none)
+
+            Return ONLY valid JSON.
+
+            SECTION:
+            {section}
+            """}
+            ],
+            max_tokens=400,
+            temperature=0.2,
+            use_cache=False
+        )
+        return self._parse_partial(content)
+
+    async def _merge_partials(self, partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+        content = await self.router.chat(
+            "summarize",
+            call_site="merge_section_summaries",
+            messages=[
+                {"role": "system", "content": "You are an expert meeting analyst. Combine summaries of consecutive meeting sections in valid JSON format."},
+                {"role": "user", "content": f"""
+            These are summaries of consecutive sections of one meeting, in order.
+            Combine them into one JSON object with exactly these fields:
+
+            summary: What was discussed and decided across these sections (100-200 words)
+            key_points: Array of the main topics, merging duplicates
+            action_items: Array of all action items, merging duplicates
+
+            Return ONLY valid JSON.
+
+            SECTION SUMMARIES:
+            {json.dumps(partials, ensure_ascii=False, indent=1)}
+            """}
+            ],
+            max_tokens=600,
+            temperature=0.2,
+            use_cache=False
+        )
+        return self._parse_partial(content)
+
+    async def fold_rolling_summary(self, state: Dict[str, Any], new_text: str) -> Dict[str, Any]:
+        """
+        Update the running summary of a live session with newly transcribed text.
+        Only the current state and the new text are sent, never the whole transcript.
+        """
+        content = await self.router.chat(
+            "summarize",
+            call_site="fold_rolling_summary",
+            messages=[
+                {"role": "system", "content": "You are an expert meeting analyst. Keep a running summary of a live meeting in valid JSON format."},
+                {"role": "user", "content": f"""
+            This is the running summary of a meeting so far, followed by what was said since.
+            Update it and return a JSON object with exactly these fields:
+
+            summary: What has been discussed and decided so far (at most 250 words; condense older parts)
+            key_points: Array of the main topics so far (at most 8, merging duplicates)
+            action_items: Array of all action items so far, merging duplicates
+
+            Return ONLY valid JSON.
+
+            RUNNING SUMMARY:
+            {json.dumps(state, ensure_ascii=False, indent=1)}
+
+            NEW TRANSCRIPTION:
+            {new_text}
+            """}
+            ],
+            max_tokens=700,
+            temperature=0.2
+        )
+        return self._parse_partial(content)
+
+    async def finalize_rolling_summary(self, state: Dict[str, Any], text: str) -> Dict[str, Any]:
+        """Comprehensive summary of a live session from its rolling summary state."""
+        if not state.get("summary"):
+            return await self.generate_comprehensive_summary(text)
+        try:
+            content = await self.router.chat(
+                "summarize",
+                call_site="finalize_rolling_summary",
+                messages=self._reduce_messages([state]),
+                max_tokens=1500,
+                temperature=0.3
+            )
+            return self._parse_comprehensive_response(content, text)
+        except Exception as e:
+            logger.error(f"Final rolling summary failed: {str(e)}")
+            return self._partials_summary([state])
+
+    def _reduce_messages(self, partials: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        prompt = f"""
+            These are summaries of consecutive sections of one meeting, in order.
+            Combine them into a JSON object with exactly these fields:
+
+            full_summary: A detailed summary of the whole meeting (200-300 words)
+            key_points: Array of 3-5 main topics discussed
+            action_items: Array of specific action items mentioned, merging duplicates
+            conclusion: Overall conclusion and next steps (100-150 words)
+
+            Return ONLY valid JSON.
+
+            SECTION SUMMARIES:
+            {json.dumps(partials, ensure_ascii=False, indent=1)}
+            """
+        return [
+            {"role": "system", "content": "You are an expert meeting analyst. Provide structured, actionable insights from meeting transcriptions in valid JSON format."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _parse_partial(self, content: Optional[str]) -> Dict[str, Any]:
+        """Parse a section summary; raises ValueError when the reply is unusable."""
+        result_text = (content or "").strip()
+        start, end = result_text.find("{"), result_text.rfind("}")
+        if start < 0 or end < start:
+            raise ValueError("section summary is not a JSON object")
+        data = json.loads(result_text[start:end + 1])
+        if not isinstance(data, dict) or not str(data.get("summary") or "").strip():
+            raise ValueError("section summary has no summary text")
+        return {
+            "summary": str(data["summary"]).strip(),
+            "key_points": [str(k) for k in data.get("key_points") or [] if str(k).strip()],
+            "action_items": [str(a) for a in data.get("action_items") or [] if str(a).strip()]
+        }
+
+    def _partials_summary(self, partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Comprehensive summary assembled from section summaries when the reduce call failed."""
+        key_points = list(dict.fromkeys(k for p in partials for k in p.get("key_points", [])))
+        action_items = list(dict.fromkeys(a for p in partials for a in p.get("action_items", [])))
+        return {
+            "full_summary": " ".join(p.get("summary", "") for p in partials).strip(),
+            "key_points": key_points[:5],
+            "action_items": action_items,
+            "conclusion": partials[-1].get("summary", "") if partials else "",
+            "fallback": True
+        }
+
+    def _comprehensive_messages(self, text: str) -> List[Dict[str, str]]:
+        prompt = f"""
             Analyze this meeting transcription and return a JSON object with exactly these fields:
 
             full_summary: A detailed summary of the meeting (200-300 words)
@@ -196,47 +444,39 @@ class Summarizer:
             TRANSCRIPTION:
             {text}
             """
-
-            response = self.client.chat.completions.create(
-                model=GROQ_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are an expert meeting analyst. Provide structured, actionable insights from meeting transcriptions in valid JSON format."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1500,
-                temperature=0.3
-            )
-
-            result_text = response.choices[0].message.content.strip() if response.choices[0].message.content else None
-            if result_text:
-                logger.info(f"LLM Response: {result_text[:500]}...")  # Debug logging
-            else:
-                logger.warning("LLM returned empty response")
-
-            if result_text:
-                try:
-                    # Clean the response text to ensure valid JSON
-                    result_text = result_text.strip()
-                    if result_text.startswith('```json'):
-                        result_text = result_text[7:]
-                    if result_text.startswith('```'):
-                        result_text = result_text[3:]
-                    if result_text.endswith('```'):
-                        result_text = result_text[:-3]
-                    result_text = result_text.strip()
-
-                    # Try to parse as JSON
-                    result = json.loads(result_text)
-                    return result
-                except json.JSONDecodeError as e:
-                    logger.warning(f"JSON parsing failed: {str(e)}, attempting manual parsing")
-                    # If JSON parsing fails, try to extract information from the text
-                    return self._extract_from_text_response(result_text)
-            else:
-                return self._fallback_comprehensive_summary(text)
-
-        except Exception as e:
-            logger.error(f"Comprehensive summarization failed: {str(e)}")
+        return [
+            {"role": "system", "content": "You are an expert meeting analyst. Provide structured, actionable insights from meeting transcriptions in valid JSON format."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _parse_comprehensive_response(self, content: Optional[str], text: str) -> Dict[str, Any]:
+        """Turn the model's reply into the summary dict, falling back when it is unusable."""
+        result_text = content.strip() if content else None
+        if result_text:
+            logger.info(f"LLM Response: {result_text[:500]}...")  # Debug logging
+        else:
+            logger.warning("LLM returned empty response")
+
+        if result_text:
+            try:
+                # Clean the response text to ensure valid JSON
+                result_text = result_text.strip()
+                if result_text.startswith('```json'):
+                    result_text = result_text[7:]
+                if result_text.startswith('```'):
+                    result_text = result_text[3:]
+                if result_text.endswith('```'):
+                    result_text = result_text[:-3]
+                result_text = result_text.strip()
+
+                # Try to parse as JSON
+                result = json.loads(result_text)
+                return result
+            except json.JSONDecodeError as e:
+                logger.warning(f"JSON parsing failed: {str(e)}, attempting manual parsing")
+                # If JSON parsing fails, try to extract information from the text
+                return self._extract_from_text_response(result_text)
+        else:
             return self._fallback_comprehensive_summary(text)
 
     def _extract_from_text_response(self, text: str) -> Dict[str, Any]:
@@ -313,8 +553,23 @@ class Summarizer:
             logger.error(f"Text extraction failed: {str(e)}")
             return self._fallback_comprehensive_summary(text)
 
+    async def generate_extractive_summary(self, text: str) -> Dict[str, Any]:
+        """Comprehensive summary fields extracted locally from the transcript (no API call)."""
+        result = await asyncio.to_thread(extractive_summary, text)
+        result["extractive"] = True
+        return result
+
     def _fallback_comprehensive_summary(self, text: str) -> Dict[str, Any]:
         """Fallback comprehensive summary when AI processing fails."""
+        try:
+            result = extractive_summary(text)
+            if result["full_summary"]:
+                result["key_points"] = result["key_points"] or ["Main discussion topics were addressed"]
+                result["conclusion"] = result["conclusion"] or result["full_summary"]
+                return {**result, "extractive": True, "fallback": True}
+        except Exception as e:
+            logger.error(f"Extractive summarization failed: {str(e)}")
+
         # Extract key information from the text for a better fallback
         words = text.split()
         word_count = len(words)
@@ -333,5 +588,6 @@ class Summarizer:
                 "Review meeting outcomes and decisions",
                 "Follow up on discussed items and responsibilities"
             ],
-            "conclusion": f"The meeting successfully covered the intended topics with active participation. With {word_count} words transcribed, the session provided valuable insights and discussion. Next steps should focus on implementing the discussed points and following up on identified action items."
+            "conclusion": f"The meeting successfully covered the intended topics with active participation. With {word_count} words transcribed, the session provided valuable insights and discussion. Next steps should focus on implementing the discussed points and following up on identified action items.",
+            "fallback": True
         }
\ No newline at end of file
@@ -0,0 +1,90 @@
+import re
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from app.config import LLM_CORRECTION_CHUNK_TOKENS, LLM_CORRECTION_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+# Sentence ends: terminal punctuation (plus closing quotes/brackets) followed by whitespace
+_SENTENCE_END = re.compile(r'(?:(?<=[.!?])|(?<=[.!?]["\')\]]))\s+')
+
+# Rough characters per token for English text with the Llama/GPT tokenizers
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of `text` (no tokenizer dependency)."""
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN) if text else 0
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences on terminal punctuation; unpunctuated text is one sentence."""
+    return [s.strip() for s in _SENTENCE_END.split(text.strip()) if s.strip()]
+
+def chunk_text(text: str, max_tokens: int = LLM_CORRECTION_CHUNK_TOKENS) -> List[str]:
+    """
+    Pack whole sentences into chunks of at most `max_tokens` (estimated).
+    A sentence longer than the budget is split on word boundaries.
+    Runs in linear time: chunk sizes are tracked as running totals.
+    """
+    max_chars = max(1, max_tokens) * CHARS_PER_TOKEN
+    chunks: List[str] = []
+    current: List[str] = []
+    current_chars = 0
+
+    def flush():
+        nonlocal current, current_chars
+        if current:
+            chunks.append(" ".join(current))
+            current, current_chars = [], 0
+
+    for sentence in split_sentences(text):
+        pieces = [sentence]
+        if len(sentence) > max_chars:
+            flush()
+            pieces = []
+            words: List[str] = []
+            size = 0
+            for word in sentence.split():
+                if words and size + 1 + len(word) > max_chars:
+                    pieces.append(" ".join(words))
+                    words, size = [], 0
+                size += len(word) + (1 if words else 0)
+                words.append(word)
+            if words:
+                pieces.append(" ".join(words))
+
+        for piece in pieces:
+            added = len(piece) + (1 if current else 0)
+            if current and current_chars + added > max_chars:
+                flush()
+                added = len(piece)
+            current.append(piece)
+            current_chars += added
+    flush()
+    return chunks
+
+async def map_chunks(chunks: List[str], correct: Callable[[str], Awaitable[Optional[str]]],
+                     concurrency: int = LLM_CORRECTION_CONCURRENCY) -> Dict[str, Any]:
+    """
+    Run `correct` over every chunk with at most `concurrency` calls in flight.
+    Results are reassembled in chunk order; a chunk whose call raises or returns
+    nothing keeps its original text. Returns {"text", "chunks", "failed"}.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(index: int, chunk: str) -> Optional[str]:
+        async with semaphore:
+            try:
+                corrected = await correct(chunk)
+            except Exception as e:
+                logger.warning(f"Correction of chunk {index} failed, keeping original: {str(e)}")
+                return None
+        return corrected.strip() if corrected and corrected.strip() else None
+
+    results = await asyncio.gather(*(run(i, chunk) for i, chunk in enumerate(chunks)))
+    failed = sum(1 for r in results if r is None)
+    return {
+        "text": " ".join(r if r is not None else chunk for r, chunk in zip(results, chunks)),
+        "chunks": len(chunks),
+        "failed": failed
+    }
@@ -0,0 +1,145 @@
+import re
+import logging
+from difflib import SequenceMatcher
+from typing import Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+_NORMALIZE_RE = re.compile(r"[^\w']+")
+
+def normalize_word(word: str) -> str:
+    """Lower-case a word and strip punctuation for matching."""
+    return _NORMALIZE_RE.sub("", word.lower())
+
+def segments_from_whisper(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Timestamps, text and decode metrics of the segments in a `transcribe` result."""
+    return [
+        {
+            "start": segment["start"],
+            "end": segment["end"],
+            "text": str(segment.get("text", "")).strip(),
+            "avg_logprob": segment.get("avg_logprob"),
+            "no_speech_prob": segment.get("no_speech_prob"),
+            "compression_ratio": segment.get("compression_ratio")
+        }
+        for segment in result.get("segments", [])
+    ]
+
+class TranscriptStitcher:
+    """
+    Joins transcriptions of overlapping audio chunks without losing or
+    duplicating words at the seams.
+
+    Each chunk carries Whisper segments with absolute timestamps. Words are
+    given times by interpolating inside their segment; where two chunks
+    overlap, the words of both sides that fall in the overlap are aligned by
+    token matching and the seam is placed in the middle of the longest
+    agreeing run. Without an agreeing run the seam falls back to the middle
+    of the overlap in time.
+    """
+
+    def __init__(self, slack_seconds: float = 0.5, min_match_words: int = 2):
+        self.slack_seconds = slack_seconds
+        self.min_match_words = min_match_words
+
+    def stitch(self, chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Stitch chunks ({"chunk_id", "start_time", "end_time", "segments"}) in chunk order.
+        Returns the combined text and the stitched segments.
+        """
+        ordered = sorted(chunks, key=lambda c: c["chunk_id"])
+        words: List[Dict[str, Any]] = []
+        previous_end = None
+        duplicates_removed = 0
+
+        for chunk in ordered:
+            chunk_words = self._chunk_words(chunk)
+            if not chunk_words:
+                previous_end = max(previous_end or 0.0, chunk.get("end_time", 0.0))
+                continue
+            if words and previous_end is not None and chunk["start_time"] < previous_end:
+                before = len(words) + len(chunk_words)
+                words = self._merge_overlap(words, chunk_words, chunk["start_time"], previous_end)
+                duplicates_removed += before - len(words)
+            else:
+                words.extend(chunk_words)
+            previous_end = max(previous_end or 0.0, chunk.get("end_time", chunk["start_time"]))
+
+        segments = self._regroup(words)
+        text = re.sub(r"\s+", " ", " ".join(w["word"] for w in words)).strip()
+        return {
+            "text": text,
+            "segments": segments,
+            "duplicates_removed": duplicates_removed
+        }
+
+    def _chunk_words(self, chunk: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Split a chunk's segments into words with interpolated times."""
+        words = []
+        for seg_index, segment in enumerate(chunk.get("segments", [])):
+            text = str(segment.get("text", "")).strip()
+            tokens = text.split()
+            if not tokens:
+                continue
+            start, end = float(segment["start"]), float(segment["end"])
+            span = max(end - start, 0.0)
+            total_chars = sum(len(t) for t in tokens) or 1
+            consumed = 0
+            for token in tokens:
+                word_start = start + span * consumed / total_chars
+                consumed += len(token)
+                word_end = start + span * consumed / total_chars
+                words.append({
+                    "word": token,
+                    "norm": normalize_word(token),
+                    "start": word_start,
+                    "end": word_end,
+                    "segment_key": (chunk["chunk_id"], seg_index),
+                    "segment": segment
+                })
+        return words
+
+    def _merge_overlap(self, left: List[Dict[str, Any]], right: List[Dict[str, Any]],
+                       overlap_start: float, overlap_end: float) -> List[Dict[str, Any]]:
+        """Merge two word lists whose audio overlaps in [overlap_start, overlap_end]."""
+        tail_from = len(left)
+        while tail_from > 0 and left[tail_from - 1]["end"] > overlap_start - self.slack_seconds:
+            tail_from -= 1
+        head_to = 0
+        while head_to < len(right) and right[head_to]["start"] < overlap_end + self.slack_seconds:
+            head_to += 1
+
+        tail = [w["norm"] for w in left[tail_from:]]
+        head = [w["norm"] for w in right[:head_to]]
+        if tail and head:
+            matcher = SequenceMatcher(None, tail, head, autojunk=False)
+            match = matcher.find_longest_match(0, len(tail), 0, len(head))
+            if match.size >= min(self.min_match_words, len(tail), len(head)) and match.size > 0:
+                # Cut in the middle of the agreeing run, away from both chunk edges
+                half = match.size // 2
+                return left[:tail_from + match.a + half] + right[match.b + half:]
+
+        # No textual agreement: split the overlap in time
+        cut = (overlap_start + overlap_end) / 2.0
+        kept_left = [w for w in left if (w["start"] + w["end"]) / 2.0 < cut]
+        kept_right = [w for w in right if (w["start"] + w["end"]) / 2.0 >= cut]
+        return kept_left + kept_right
+
+    def _regroup(self, words: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Rebuild segments from consecutive words that came from the same source segment."""
+        segments: List[Dict[str, Any]] = []
+        current_key = None
+        for word in words:
+            if word["segment_key"] != current_key:
+                source = word["segment"]
+                segments.append({
+                    "start": round(word["start"], 3),
+                    "end": round(word["end"], 3),
+                    "text": word["word"],
+                    **{k: source[k] for k in ("avg_logprob", "no_speech_prob", "compression_ratio") if k in source}
+                })
+                current_key = word["segment_key"]
+            else:
+                segments[-1]["text"] += " " + word["word"]
+                segments[-1]["end"] = round(word["end"], 3)
+        return segments
@@ -0,0 +1,244 @@
+import os
+import json
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, Optional
+import numpy as np
+from app.config import TRANSCRIPTION_CACHE, TRANSCRIPTION_CACHE_DIR, TRANSCRIPTION_CACHE_MAX_MB
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached payload layout changes so old entries stop matching
+CACHE_SCHEMA_VERSION = 1
+
+def _settings_digest(settings: Dict[str, Any]):
+    digest = hashlib.sha256()
+    digest.update(json.dumps({"schema": CACHE_SCHEMA_VERSION, **settings}, sort_keys=True).encode("utf-8"))
+    return digest
+
+def audio_cache_key(audio: np.ndarray, settings: Dict[str, Any]) -> str:
+    """Key for decoded PCM: any container or bitrate of the same audio maps to the same key."""
+    digest = _settings_digest(settings)
+    digest.update(b"pcm")
+    digest.update(memoryview(np.ascontiguousarray(audio, dtype=np.float32)).cast("B"))
+    return digest.hexdigest()
+
+def file_cache_key(file_path: str, settings: Dict[str, Any]) -> str:
+    """Key for the raw file bytes, checked before the (slow) audio decode."""
+    digest = _settings_digest(settings)
+    digest.update(b"file")
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _json_default(value: Any):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+class TranscriptionCache:
+    """
+    Persistent, content-addressed cache of processed recordings.
+
+    Entries are JSON files named by the hash of the decoded PCM plus the
+    pipeline settings, so re-runs, retries and the same meeting uploaded by
+    several attendees are served from disk. A raw-file hash is kept as an
+    alias of the PCM key, which lets an identical re-upload skip decoding too.
+    Total size is bounded; the least recently used entries are evicted.
+    """
+
+    def __init__(self, directory: str = TRANSCRIPTION_CACHE_DIR,
+                 max_bytes: int = int(TRANSCRIPTION_CACHE_MAX_MB * 1024 * 1024),
+                 enabled: bool = TRANSCRIPTION_CACHE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._aliases: Dict[str, str] = {}
+        self._total_bytes = 0
+        self._loaded = False
+
+        self.hits = 0
+        self.alias_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load_index(self):
+        """
+        Rebuild the LRU order from file mtimes (last access) on first use, and the alias
+        map from the alias files, dropping aliases whose entry no longer exists.
+        """
+        if self._loaded:
+            return
+        self._loaded = True
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                stat = os.stat(os.path.join(self.directory, name))
+                files.append((stat.st_mtime, name[:-5], stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+
+        alias_dir = os.path.join(self.directory, "aliases")
+        if not os.path.isdir(alias_dir):
+            return
+        for alias in os.listdir(alias_dir):
+            alias_path = os.path.join(alias_dir, alias)
+            try:
+                with open(alias_path, "r", encoding="utf-8") as f:
+                    key = f.read().strip()
+                if key in self._entries:
+                    self._aliases[alias] = key
+                else:
+                    os.remove(alias_path)
+            except OSError:
+                pass
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        if key not in self._entries:
+            return None
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable cache entry {key[:12]}: {str(e)}")
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        for alias in record.get("aliases", []):
+            self._aliases[alias] = key
+        return record["value"]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached payload for a PCM key, or None."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._load_index()
+            value = self._read(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def get_by_alias(self, alias: str) -> Optional[Dict[str, Any]]:
+        """Cached payload for a raw-file key, without counting a miss (the PCM lookup follows)."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._load_index()
+            alias_path = os.path.join(self.directory, "aliases", alias)
+            key = self._aliases.get(alias)
+            if key is None:
+                try:
+                    with open(alias_path, "r", encoding="utf-8") as f:
+                        key = f.read().strip()
+                except OSError:
+                    return None
+            value = self._read(key)
+            if value is None:
+                # The entry was evicted; the alias is stale
+                self._aliases.pop(alias, None)
+                try:
+                    os.remove(alias_path)
+                except OSError:
+                    pass
+                return None
+            self.hits += 1
+            self.alias_hits += 1
+            return value
+
+    def put(self, key: str, value: Dict[str, Any], aliases: Iterable[str] = ()):
+        """Store a payload (atomically) and evict least recently used entries over the size bound."""
+        if not self.enabled:
+            return
+        aliases = [a for a in aliases if a]
+        with self._lock:
+            self._load_index()
+            path = self._entry_path(key)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            try:
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump({"key": key, "aliases": aliases, "value": value}, f, default=_json_default)
+                os.replace(temp_path, path)
+                self._write_aliases(key, aliases)
+            except (OSError, TypeError) as e:
+                logger.warning(f"Could not cache transcription {key[:12]}: {str(e)}")
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                return
+
+            size = os.path.getsize(path)
+            self._total_bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            for alias in aliases:
+                self._aliases[alias] = key
+            self._evict()
+
+    def add_alias(self, key: str, alias: str):
+        """Point a raw-file key at an existing PCM entry."""
+        if not self.enabled or not alias:
+            return
+        with self._lock:
+            self._load_index()
+            if key in self._entries:
+                self._write_aliases(key, [alias])
+                self._aliases[alias] = key
+
+    def _write_aliases(self, key: str, aliases: Iterable[str]):
+        alias_dir = os.path.join(self.directory, "aliases")
+        os.makedirs(alias_dir, exist_ok=True)
+        for alias in aliases:
+            with open(os.path.join(alias_dir, alias), "w", encoding="utf-8") as f:
+                f.write(key)
+
+    def _remove(self, key: str):
+        self._total_bytes -= self._entries.pop(key, 0)
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
+        for alias in [a for a, k in self._aliases.items() if k == key]:
+            del self._aliases[alias]
+            try:
+                os.remove(os.path.join(self.directory, "aliases", alias))
+            except OSError:
+                pass
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "alias_hits": self.alias_hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions
+            }
+
+# Shared cache for the whole process
+transcription_cache = TranscriptionCache()
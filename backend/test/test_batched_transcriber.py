@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for batched Whisper decoding when a batch fails, with Whisper stubbed out.
+"""
+
+import contextlib
+from types import SimpleNamespace
+import numpy as np
+import app.services.batched_transcriber as batched_module
+from app.services.batched_transcriber import BatchedTranscriber
+from app.services.selective_correction import SelectiveCorrector
+
+class FakeModel:
+    is_multilingual = False
+    num_languages = 1
+    dims = SimpleNamespace(n_mels=80)
+    device = "cpu"
+
+    def embed_audio(self, mel):
+        return mel
+
+    def transcribe(self, chunk, **options):
+        if np.isnan(chunk).any():
+            raise ValueError("bad audio")
+        return {"text": f" chunk of {len(chunk)}", "segments": []}
+
+def stub_whisper(monkeypatch):
+    def log_mel_spectrogram(chunk, n_mels, device=None):
+        if np.isnan(chunk).any():
+            raise ValueError("bad audio")
+        return chunk
+
+    def decode(model, mel, options):
+        return [SimpleNamespace(text=" batched", tokens=[], avg_logprob=-0.2, no_speech_prob=0.01,
+                                compression_ratio=1.2) for _ in mel]
+
+    monkeypatch.setattr(batched_module, "torch", SimpleNamespace(no_grad=contextlib.nullcontext, stack=list))
+    monkeypatch.setattr(batched_module, "log_mel_spectrogram", log_mel_spectrogram)
+    monkeypatch.setattr(batched_module, "pad_or_trim", lambda chunk, n: chunk)
+    monkeypatch.setattr(batched_module, "get_tokenizer", lambda *a, **k: SimpleNamespace(timestamp_begin=50000))
+    monkeypatch.setattr(batched_module.whisper, "DecodingOptions", lambda **k: k, raising=False)
+    monkeypatch.setattr(batched_module.whisper, "decode", decode)
+
+def test_failed_batch_is_decoded_chunk_by_chunk(monkeypatch):
+    stub_whisper(monkeypatch)
+    bad = np.zeros(1600, dtype=np.float32)
+    bad[10] = np.nan
+    chunks = [np.zeros(1600, dtype=np.float32), np.zeros(1600, dtype=np.float32), bad, np.zeros(3200, dtype=np.float32)]
+
+    results = BatchedTranscriber(batch_size=2).transcribe_chunks(FakeModel(), chunks, language="en")
+
+    assert [r["chunk_id"] for r in results] == [0, 1, 2, 3]
+    assert [r["text"] for r in results] == ["batched", "batched", "", "chunk of 3200"]
+    assert "success" not in results[0]
+    assert results[2]["success"] is False and "bad audio" in results[2]["error"]
+    assert results[3]["success"] is True and results[3]["fallback"] is True
+    assert results[3]["batch_index"] == 1
+
+def test_segments_get_their_own_decode_metrics(monkeypatch):
+    stub_whisper(monkeypatch)
+    # Two segments: <|0.00|> 1 2 <|1.00|> 3 3 3 <|2.00|>
+    tokens = [50000, 1, 2, 50050, 3, 3, 3, 50100]
+    monkeypatch.setattr(batched_module.whisper, "decode", lambda model, mel, options: [
+        SimpleNamespace(text=" confident mumbled", tokens=tokens, avg_logprob=-0.5, no_speech_prob=0.05,
+                        compression_ratio=1.1)
+    ])
+    monkeypatch.setattr(batched_module, "get_tokenizer", lambda *a, **k: SimpleNamespace(
+        timestamp_begin=50000, decode=lambda ids: " ".join({1: "quite", 2: "clear", 3: "um"}[i] for i in ids)
+    ))
+    monkeypatch.setattr(BatchedTranscriber, "_token_logprobs",
+                        lambda self, model, features, decoded, language: [[0.0, -0.1, -0.1, 0.0, -2.0, -2.0, -2.0, 0.0]])
+
+    segments = BatchedTranscriber().transcribe_chunks(FakeModel(), [np.zeros(32000, dtype=np.float32)])[0]["segments"]
+
+    assert [(s["start"], s["end"]) for s in segments] == [(0.0, 1.0), (1.0, 2.0)]
+    assert segments[0]["avg_logprob"] == -0.1
+    assert segments[1]["avg_logprob"] == -2.0
+    assert all(s["no_speech_prob"] == 0.05 for s in segments)
+
+def test_segments_without_scores_are_not_skipped_by_selective_correction(monkeypatch):
+    stub_whisper(monkeypatch)
+    monkeypatch.setattr(batched_module.whisper, "decode", lambda model, mel, options: [
+        SimpleNamespace(text=" hello", tokens=[50000, 1, 50050], avg_logprob=-0.1, no_speech_prob=0.01,
+                        compression_ratio=1.0)
+    ])
+    monkeypatch.setattr(batched_module, "get_tokenizer", lambda *a, **k: SimpleNamespace(
+        timestamp_begin=50000, decode=lambda ids: "hello"
+    ))
+    monkeypatch.setattr(BatchedTranscriber, "_token_logprobs", lambda self, *args: None)
+
+    segments = BatchedTranscriber().transcribe_chunks(FakeModel(), [np.zeros(16000, dtype=np.float32)])[0]["segments"]
+
+    assert segments[0]["avg_logprob"] is None
+    assert SelectiveCorrector().needs_correction(segments[0])
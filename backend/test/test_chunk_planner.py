@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for speech-aware chunk planning on synthetic tone-and-silence audio.
+"""
+
+import numpy as np
+from app.services.chunk_planner import ChunkPlanner
+
+SAMPLE_RATE = 16000
+
+def synthetic_audio(layout):
+    """Concatenate (kind, seconds) pieces: a 220 Hz tone for "speech", faint noise for "silence"."""
+    rng = np.random.default_rng(0)
+    pieces = []
+    for kind, seconds in layout:
+        n = int(seconds * SAMPLE_RATE)
+        if kind == "speech":
+            pieces.append(0.5 * np.sin(2 * np.pi * 220 * np.arange(n) / SAMPLE_RATE))
+        else:
+            pieces.append(0.001 * rng.standard_normal(n))
+    return np.concatenate(pieces).astype(np.float32)
+
+def speech_spans(layout):
+    spans, position = [], 0.0
+    for kind, seconds in layout:
+        if kind == "speech":
+            spans.append((position, position + seconds))
+        position += seconds
+    return spans
+
+def make_planner():
+    return ChunkPlanner(max_chunk_seconds=30.0, min_silence_seconds=0.5, speech_pad_seconds=0.2,
+                        min_speech_seconds=0.25, max_merge_gap_seconds=2.0, threshold_db=8.0,
+                        overlap_seconds=1.0)
+
+LAYOUT = [("silence", 5), ("speech", 3), ("silence", 10), ("speech", 70), ("silence", 4)]
+
+def test_speech_islands_are_kept():
+    plan = make_planner().plan(synthetic_audio(LAYOUT), SAMPLE_RATE)
+    for start, end in speech_spans(LAYOUT):
+        # Every speech second falls inside some chunk
+        for t in np.arange(start, end, 0.1):
+            assert any(c["start_time"] <= t <= c["end_time"] for c in plan["chunks"]), t
+    # Nothing is planned in the middle of the long silences
+    for t in (2.5, 13.0, 90.0):
+        assert not any(c["start_time"] <= t <= c["end_time"] for c in plan["chunks"]), t
+
+def test_chunks_fit_the_whisper_window_and_split_pieces_overlap():
+    plan = make_planner().plan(synthetic_audio(LAYOUT), SAMPLE_RATE)
+    chunks = plan["chunks"]
+    assert all(c["end_time"] - c["start_time"] <= 30.0 for c in chunks)
+
+    long_island = [c for c in chunks if c["end_time"] > 18 + 0.5]
+    assert len(long_island) >= 3
+    for previous, current in zip(long_island, long_island[1:]):
+        assert current["start_sample"] < previous["end_sample"]
+        assert previous["end_time"] - current["start_time"] <= 1.0 + 1e-9
+
+def test_skipped_seconds_match_the_removed_silence():
+    audio = synthetic_audio(LAYOUT)
+    plan = make_planner().plan(audio, SAMPLE_RATE)
+    silence = sum(seconds for kind, seconds in LAYOUT if kind == "silence")
+    # Each of the two islands is padded by 0.2 s on both sides
+    assert abs(plan["skipped_seconds"] - (silence - 4 * 0.2)) < 0.1
+    assert abs(plan["planned_seconds"] + plan["skipped_seconds"] - len(audio) / SAMPLE_RATE) < 1e-6
+
+def test_silence_only_plans_nothing():
+    plan = make_planner().plan(synthetic_audio([("silence", 8)]), SAMPLE_RATE)
+    assert plan["chunks"] == []
+    assert plan["skipped_seconds"] == plan["total_seconds"]
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the edit-only correction protocol.
+"""
+
+import asyncio
+import pytest
+from app.services.edit_protocol import parse_edits, apply_edits, number_words, EditProtocolError
+from app.services.multi_api_processor import MultiAPIProcessor
+
+WORDS = "their going to the the meeting tomorow".split()
+
+def test_edits_are_parsed_and_applied():
+    edits = parse_edits('```json\n[[0, "They\'re"], [3, 4, "the"], [6, "tomorrow."]]\n```', len(WORDS))
+    assert edits == [(0, 0, "They're"), (3, 4, "the"), (6, 6, "tomorrow.")]
+    assert apply_edits(WORDS, edits) == "They're going to the meeting tomorrow."
+
+def test_empty_edit_list_and_deletion():
+    assert apply_edits(WORDS, parse_edits("[]", len(WORDS))) == " ".join(WORDS)
+    assert apply_edits(WORDS, parse_edits('[[4, ""]]', len(WORDS))) == "their going to the meeting tomorow"
+
+INVALID_REPLIES = [
+    "They're going to the meeting tomorrow.",
+    '[[9, "x"]]',
+    '[[2, 1, "x"]]',
+    '[[1, 2, "a"], [2, "b"]]',
+    '[["1", "x"]]',
+    '[[1, "' + " ".join(["word"] * 20) + '"]]',
+    '[[1, "x"',
+]
+
+def test_invalid_replies_are_rejected():
+    for reply in INVALID_REPLIES:
+        with pytest.raises(EditProtocolError):
+            parse_edits(reply, len(WORDS))
+
+def test_words_are_numbered_for_the_prompt():
+    assert number_words(["a", "b"]) == "0:a 1:b"
+
+class _FakeLLM:
+    def __init__(self, edit_reply):
+        self.edit_reply = edit_reply
+        self.calls = []
+
+    async def chat(self, provider, model, messages, call_site=None, **params):
+        self.calls.append((call_site, params["max_tokens"]))
+        if call_site.endswith(":edits"):
+            return self.edit_reply
+        return "Full corrected text."
+
+def _processor(llm):
+    processor = MultiAPIProcessor.__new__(MultiAPIProcessor)
+    processor.llm = llm
+    return processor
+
+def test_processor_applies_edits_without_full_reply():
+    llm = _FakeLLM('[[0, "They\'re"]]')
+    result = asyncio.run(_processor(llm)._improve_with_groq_llama33(" ".join(WORDS)))
+    assert result["text"] == "They're going to the the meeting tomorow"
+    assert result["protocol"] == "edits"
+    assert [site for site, _ in llm.calls] == ["_improve_with_groq_llama33:edits"]
+
+def test_processor_falls_back_to_full_text_on_bad_edits():
+    llm = _FakeLLM("Sure! Here is the corrected text.")
+    result = asyncio.run(_processor(llm)._improve_with_groq_llama33(" ".join(WORDS)))
+    assert result["text"] == "Full corrected text."
+    assert result["protocol"] == "full"
+    assert [site for site, _ in llm.calls] == ["_improve_with_groq_llama33:edits", "_improve_with_groq_llama33"]
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the decode-once ensemble mode.
+"""
+
+import asyncio
+import pytest
+import numpy as np
+from app.services.multi_api_processor import MultiAPIProcessor, ENSEMBLE_MEMBERS
+from app.services.rover_combiner import RoverCombiner
+
+class _FakeLLM:
+    def __init__(self, failing=()):
+        self.calls = []
+        self.failing = set(failing)
+
+    async def chat(self, provider, model, messages, call_site=None, **params):
+        self.calls.append(call_site)
+        await asyncio.sleep(0.01)
+        if call_site in self.failing:
+            raise RuntimeError("provider down")
+        return "improved: " + messages[-1]["content"].split(": ", 1)[1]
+
+def _processor(llm):
+    processor = MultiAPIProcessor.__new__(MultiAPIProcessor)
+    processor.llm = llm
+    processor.combiner = RoverCombiner()
+    processor.decodes = 0
+
+    async def whisper(audio, **options):
+        processor.decodes += 1
+        return {"text": "hello world"}
+    processor._whisper_transcribe = whisper
+    return processor
+
+def test_whisper_runs_once_for_all_members():
+    llm = _FakeLLM(failing={"_transcribe_with_openrouter_claude"})
+    processor = _processor(llm)
+    result = asyncio.run(processor.process_transcription_ensemble(np.zeros(16000, dtype=np.float32)))
+
+    assert processor.decodes == 1
+    assert result["transcription"] == "improved: hello world"
+    assert "_combine_multiple_transcriptions" not in llm.calls
+    assert set(result["provider_latency"]) == set(ENSEMBLE_MEMBERS)
+    assert "openrouter_claude_haiku" not in result["models_successful"]
+    assert len(result["models_successful"]) == len(ENSEMBLE_MEMBERS) - 1
+    assert result["confidence"] == 1.0
+
+def test_members_are_aligned_once_for_text_and_confidence():
+    class CountingCombiner(RoverCombiner):
+        calls = 0
+
+        def combine(self, texts):
+            CountingCombiner.calls += 1
+            return super().combine(texts)
+
+    llm = _FakeLLM()
+    processor = _processor(llm)
+    processor.combiner = CountingCombiner()
+    result = asyncio.run(processor.process_transcription_ensemble(np.zeros(16000, dtype=np.float32)))
+
+    assert CountingCombiner.calls == 1
+    assert result["transcription"] == "improved: hello world"
+    assert result["confidence"] == 1.0
+
+def test_unknown_members_are_reported_and_none_left_is_an_error(caplog):
+    processor = _processor(_FakeLLM())
+    known = next(iter(ENSEMBLE_MEMBERS))
+    result = asyncio.run(processor.process_transcription_ensemble(
+        np.zeros(16000, dtype=np.float32), members=[known, "groq_llama_typo"]))
+    assert result["ensemble_models"] == [known]
+    assert "groq_llama_typo" in caplog.text
+
+    with pytest.raises(ValueError, match="No known ensemble members"):
+        asyncio.run(processor.process_transcription_ensemble(
+            np.zeros(16000, dtype=np.float32), members=["groq_llama_typo"]))
+    assert processor.decodes == 1
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for first-acceptable racing and hedged calls.
+"""
+
+import asyncio
+import time
+from app.services.hedging import first_acceptable
+
+def _call(delay, text, log):
+    async def call():
+        log.append(text)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            log.append(f"{text} cancelled")
+            raise
+        return {"text": text}
+    return call
+
+def _accept(result):
+    return bool(result.get("text")) and result["text"] != "bad"
+
+def test_race_returns_the_faster_call_and_cancels_the_other():
+    log = []
+    start = time.perf_counter()
+    race = asyncio.run(first_acceptable([_call(0.3, "slow", log), _call(0.02, "fast", log)], _accept))
+    assert race["index"] == 1 and race["result"]["text"] == "fast"
+    assert time.perf_counter() - start < 0.2
+    assert "slow cancelled" in log
+    assert [a["status"] for a in race["attempts"]] == ["cancelled", "won"]
+
+def test_rejected_result_waits_for_the_next_one():
+    race = asyncio.run(first_acceptable([_call(0.01, "bad", []), _call(0.05, "good", [])], _accept))
+    assert race["result"]["text"] == "good"
+    assert race["attempts"][0]["status"] == "rejected"
+
+def test_hedge_only_calls_backup_when_primary_is_slow():
+    log = []
+    quick = asyncio.run(first_acceptable([_call(0.01, "primary", log), _call(0.01, "backup", log)],
+                                         _accept, hedge_delay=0.1))
+    assert quick["index"] == 0 and not quick["hedged"] and log == ["primary"]
+
+    slow = asyncio.run(first_acceptable([_call(0.5, "primary", []), _call(0.01, "backup", [])],
+                                        _accept, hedge_delay=0.05))
+    assert slow["index"] == 1 and slow["hedged"]
+
+def test_failed_primary_starts_backup_immediately():
+    async def broken():
+        raise RuntimeError("503")
+    start = time.perf_counter()
+    race = asyncio.run(first_acceptable([broken, _call(0.01, "backup", [])], _accept, hedge_delay=5.0))
+    assert race["result"]["text"] == "backup"
+    assert time.perf_counter() - start < 1.0
+    assert race["attempts"][0]["status"] == "failed"
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for the Whisper inference thread pool.
+"""
+
+import asyncio
+import time
+import threading
+import pytest
+import app.services.inference_executor as executor_module
+from app.services.inference_executor import InferenceExecutor
+
+def test_jobs_on_one_model_are_serialized_and_other_models_run_alongside():
+    executor = InferenceExecutor(max_workers=4, torch_threads=1)
+    active = {"a": 0, "b": 0}
+    peak = {"a": 0, "b": 0}
+    guard = threading.Lock()
+
+    def job(name):
+        with guard:
+            active[name] += 1
+            peak[name] = max(peak[name], active[name])
+        time.sleep(0.05)
+        with guard:
+            active[name] -= 1
+        return name
+
+    model_a, model_b = object(), object()
+
+    async def main():
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *[executor.run(job, "a", model=model_a) for _ in range(3)],
+            *[executor.run(job, "b", model=model_b) for _ in range(3)]
+        )
+        return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(main())
+    executor.shutdown(wait=True)
+    assert sorted(results) == ["a", "a", "a", "b", "b", "b"]
+    assert peak == {"a": 1, "b": 1}
+    # Three serialized jobs per model, the two models in parallel
+    assert elapsed < 0.3
+    stats = executor.stats()
+    assert stats["completed"] == 6 and stats["in_flight"] == 0
+
+def test_failures_and_timeouts_are_counted():
+    executor = InferenceExecutor(max_workers=2, torch_threads=1)
+
+    def boom():
+        raise ValueError("decode failed")
+
+    async def main():
+        with pytest.raises(ValueError):
+            await executor.run(boom)
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(time.sleep, 0.2, timeout=0.01)
+
+    asyncio.run(main())
+    executor.shutdown(wait=True)
+    stats = executor.stats()
+    assert stats["failed"] == 1 and stats["timed_out"] == 1 and stats["completed"] == 0
+
+def test_torch_threads_are_set_on_first_job_not_on_construction(monkeypatch):
+    calls = []
+    monkeypatch.setattr(executor_module.torch, "set_num_threads", calls.append, raising=False)
+    executor = InferenceExecutor(max_workers=1, torch_threads=3)
+    assert calls == []
+
+    async def main():
+        await executor.run(lambda: None)
+        await executor.run(lambda: None)
+
+    asyncio.run(main())
+    executor.shutdown(wait=True)
+    assert calls == [3]
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental parser of streamed JSON summaries.
+"""
+
+import json
+
+from app.services.json_stream import SummaryStreamParser
+
+SUMMARY = {
+    "full_summary": "The team reviewed the \"Q3\" budget.\nCosts are up.",
+    "key_points": ["Budget review", "Hiring plan"],
+    "action_items": ["Send report – Friday"],
+    "conclusion": "Agreed to reconvene."
+}
+
+def _feed_all(text, step):
+    parser = SummaryStreamParser()
+    events = []
+    for i in range(0, len(text), step):
+        events.extend(parser.feed(text[i:i + step]))
+    return parser, events
+
+def test_events_match_document_for_any_chunking():
+    document = "```json\n" + json.dumps(SUMMARY, indent=2) + "\n```"
+    for step in (1, 3, 7, len(document)):
+        parser, events = _feed_all(document, step)
+        assert parser.done
+        deltas = "".join(e["text"] for e in events if e["type"] == "field_delta" and e["field"] == "full_summary")
+        assert deltas == SUMMARY["full_summary"]
+        fields = {e["field"]: e["value"] for e in events if e["type"] == "field"}
+        assert fields == {"full_summary": SUMMARY["full_summary"], "conclusion": SUMMARY["conclusion"]}
+        items = [(e["field"], e["index"], e["text"]) for e in events if e["type"] == "item"]
+        assert items == [
+            ("key_points", 0, "Budget review"),
+            ("key_points", 1, "Hiring plan"),
+            ("action_items", 0, "Send report – Friday"),
+        ]
+
+def test_unicode_escape_split_across_feeds():
+    parser = SummaryStreamParser()
+    events = parser.feed('{"key_points": ["caf\\u00')
+    assert events == []
+    events = parser.feed('e9"]}')
+    assert events == [{"type": "item", "field": "key_points", "index": 0, "text": "café"}]
+
+def test_partial_summary_is_reported_before_the_string_closes():
+    parser = SummaryStreamParser()
+    assert parser.feed('{"full_summary": "Hello') == [{"type": "field_delta", "field": "full_summary", "text": "Hello"}]
+    assert parser.feed(' world') == [{"type": "field_delta", "field": "full_summary", "text": " world"}]
+    assert parser.feed('"') == [{"type": "field", "field": "full_summary", "value": "Hello world"}]
+    assert not parser.done
+
+def test_nested_values_are_ignored():
+    parser, events = _feed_all('{"meta": {"note": "x"}, "count": 3, "key_points": ["a"]}', 1)
+    assert events == [{"type": "item", "field": "key_points", "index": 0, "text": "a"}]
+    assert parser.done
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for the LLM response cache tiers, expiry and eviction.
+"""
+
+import asyncio
+import threading
+from app.services.llm_cache import LLMResponseCache
+
+MESSAGES = [{"role": "user", "content": "fix this"}]
+
+def _cache(tmp_path, **options):
+    options.setdefault("db_path", str(tmp_path / "llm.sqlite3"))
+    return LLMResponseCache(enabled=True, **options)
+
+def test_key_covers_model_messages_and_sampling(tmp_path):
+    cache = _cache(tmp_path)
+    key = cache.key("groq", "m", MESSAGES, {"temperature": 0.1, "max_tokens": 100})
+    assert key == cache.key("groq", "m", MESSAGES, {"max_tokens": 100, "temperature": 0.1})
+    assert key != cache.key("groq", "m", MESSAGES, {"temperature": 0.1, "max_tokens": 200})
+    assert key != cache.key("openrouter", "m", MESSAGES, {"temperature": 0.1, "max_tokens": 100})
+    assert cache.key("groq", "m", MESSAGES, {"temperature": 0.7}) is None
+    assert cache.key("groq", "m", MESSAGES, {}) is None
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    cache = _cache(tmp_path)
+    key = cache.key("groq", "m", MESSAGES, {"temperature": 0.0})
+    cache.put(key, "fixed this")
+    cache.close()
+
+    restarted = _cache(tmp_path)
+    assert restarted.get(key, "site") == "fixed this"
+    assert restarted.stats()["disk_hits"] == 1
+    # Promoted into memory: the next hit does not touch the disk
+    assert restarted.get(key, "site") == "fixed this"
+    assert restarted.stats()["disk_hits"] == 1
+
+def test_entries_expire_after_the_ttl(tmp_path, monkeypatch):
+    import app.services.llm_cache as llm_cache_module
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache_module.time, "time", lambda: now[0])
+    cache = _cache(tmp_path, ttl_seconds=60)
+    cache.put("k", "value")
+    assert cache.get("k", "site") == "value"
+    now[0] += 61
+    assert cache.get("k", "site") is None
+
+def test_memory_tier_is_lru_bounded(tmp_path):
+    cache = _cache(tmp_path, max_entries=2, db_path="")
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a", "site")
+    cache.put("c", "3")
+    assert cache.get("b", "site") is None
+    assert cache.get("a", "site") == "1" and cache.get("c", "site") == "3"
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and not stats["persistent"]
+    assert stats["call_sites"]["site"]["hits"] == 3
+
+def test_async_calls_touch_sqlite_only_off_the_event_loop(tmp_path):
+    cache = _cache(tmp_path)
+    key = cache.key("groq", "m", MESSAGES, {"temperature": 0.0})
+    disk_threads = []
+    for name in ("_disk_get", "_disk_put"):
+        original = getattr(cache, name)
+
+        def traced(*args, original=original):
+            disk_threads.append(threading.current_thread())
+            return original(*args)
+        setattr(cache, name, traced)
+
+    async def scenario():
+        loop_thread = threading.current_thread()
+        await cache.aput(key, "fixed this")
+        # Served from memory without a disk lookup
+        hit = await cache.aget(key, "site")
+        miss = await cache.aget("missing", "site")
+        return loop_thread, hit, miss
+
+    loop_thread, hit, miss = asyncio.run(scenario())
+    assert hit == "fixed this" and miss is None
+    assert len(disk_threads) == 2
+    assert all(thread is not loop_thread for thread in disk_threads)
+    cache.close()
+
+    restarted = _cache(tmp_path)
+    assert asyncio.run(restarted.aget(key, "site")) == "fixed this"
+    assert restarted.stats()["disk_hits"] == 1
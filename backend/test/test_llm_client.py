@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared async LLM client against a local OpenAI-compatible stub.
+"""
+
+import asyncio
+import json
+import time
+import pytest
+from aiohttp import web
+
+from app.services import llm_client as llm_client_module
+from app.services.llm_client import LLMClient, LLMError
+
+async def _start_stub(delay: float = 0.0, status: int = 200):
+    async def chat(request):
+        body = await request.json()
+        await asyncio.sleep(delay)
+        if status != 200:
+            return web.json_response({"error": "boom"}, status=status)
+        return web.json_response({
+            "choices": [{"message": {"content": f"echo:{body['messages'][-1]['content']}"}}],
+            "usage": {"prompt_tokens": 5, "completion_tokens": 3}
+        })
+
+    app = web.Application()
+    app.router.add_post("/chat/completions", chat)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+def _with_stub(monkeypatch, base_url):
+    monkeypatch.setitem(llm_client_module.PROVIDERS, "stub", {"base_url": base_url, "api_key": "test"})
+
+def test_concurrent_calls_overlap(monkeypatch):
+    async def scenario():
+        runner, base_url = await _start_stub(delay=0.3)
+        _with_stub(monkeypatch, base_url)
+        client = LLMClient()
+        try:
+            start = time.perf_counter()
+            results = await asyncio.gather(*[
+                client.chat("stub", model="m", messages=[{"role": "user", "content": str(i)}], call_site="test")
+                for i in range(4)
+            ])
+            elapsed = time.perf_counter() - start
+        finally:
+            await client.close()
+            await runner.cleanup()
+        return results, elapsed, client.stats()
+
+    results, elapsed, stats = asyncio.run(scenario())
+    assert results == ["echo:0", "echo:1", "echo:2", "echo:3"]
+    # Four 0.3 s calls should cost roughly one call, not four
+    assert elapsed < 0.9
+    assert stats["call_sites"]["test"]["calls"] == 4
+    assert stats["call_sites"]["test"]["completion_tokens"] == 12
+
+def test_http_error_raises_llm_error(monkeypatch):
+    async def scenario():
+        runner, base_url = await _start_stub(status=429)
+        _with_stub(monkeypatch, base_url)
+        client = LLMClient()
+        try:
+            with pytest.raises(LLMError) as excinfo:
+                await client.chat("stub", model="m", messages=[{"role": "user", "content": "x"}])
+        finally:
+            await client.close()
+            await runner.cleanup()
+        return excinfo.value
+
+    error = asyncio.run(scenario())
+    assert error.status == 429
+    assert error.provider == "stub"
+
+def test_identical_low_temperature_requests_are_cached(monkeypatch, tmp_path):
+    from app.services.llm_cache import LLMResponseCache
+
+    async def scenario():
+        runner, base_url = await _start_stub()
+        _with_stub(monkeypatch, base_url)
+        client = LLMClient(cache=LLMResponseCache(db_path=str(tmp_path / "cache.sqlite3"), enabled=True))
+        try:
+            messages = [{"role": "user", "content": "same"}]
+            first = await client.chat("stub", model="m", messages=messages, call_site="cached", temperature=0.1)
+            second = await client.chat("stub", model="m", messages=messages, call_site="cached", temperature=0.1)
+            await client.chat("stub", model="m", messages=messages, call_site="sampled", temperature=0.9)
+            await client.chat("stub", model="m", messages=messages, call_site="sampled", temperature=0.9)
+        finally:
+            await client.close()
+            await runner.cleanup()
+        return first, second, client.stats()
+
+    first, second, stats = asyncio.run(scenario())
+    assert first == second == "echo:same"
+    assert stats["call_sites"]["cached"]["calls"] == 1
+    assert stats["call_sites"]["sampled"]["calls"] == 2
+    assert stats["cache"]["call_sites"]["cached"] == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+    assert "sampled" not in stats["cache"]["call_sites"]
+
+def test_rate_limited_call_is_retried_after_retry_after(monkeypatch):
+    attempts = []
+
+    async def scenario():
+        async def chat(request):
+            attempts.append(time.perf_counter())
+            if len(attempts) == 1:
+                return web.json_response({"error": "slow down"}, status=429, headers={"Retry-After": "0.2"})
+            return web.json_response({"choices": [{"message": {"content": "ok"}}]})
+
+        app = web.Application()
+        app.router.add_post("/chat/completions", chat)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        _with_stub(monkeypatch, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}")
+        client = LLMClient()
+        try:
+            return await client.chat("stub", model="m", messages=[{"role": "user", "content": "x"}]), client.stats()
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    content, stats = asyncio.run(scenario())
+    assert content == "ok"
+    assert attempts[1] - attempts[0] >= 0.19
+    assert stats["rate_limits"]["stub"]["rate_limited"] == 1
+
+def test_chat_stream_yields_deltas_and_records_usage(monkeypatch):
+    async def scenario():
+        async def chat(request):
+            body = await request.json()
+            assert body["stream"] is True
+            response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+            await response.prepare(request)
+            for piece in ("Hel", "lo"):
+                chunk = {"choices": [{"delta": {"content": piece}}]}
+                await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            usage = {"choices": [], "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7}}
+            await response.write(f"data: {json.dumps(usage)}\n\ndata: [DONE]\n\n".encode())
+            return response
+
+        app = web.Application()
+        app.router.add_post("/chat/completions", chat)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        _with_stub(monkeypatch, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}")
+        client = LLMClient()
+        try:
+            deltas = [d async for d in client.chat_stream(
+                "stub", model="m", messages=[{"role": "user", "content": "x"}], call_site="streamed"
+            )]
+        finally:
+            await client.close()
+            await runner.cleanup()
+        return deltas, client.stats()
+
+    deltas, stats = asyncio.run(scenario())
+    assert deltas == ["Hel", "lo"]
+    assert stats["call_sites"]["streamed"]["calls"] == 1
+    assert stats["call_sites"]["streamed"]["completion_tokens"] == 2
+
+def test_session_from_a_finished_loop_is_closed_when_replaced():
+    client = LLMClient()
+
+    async def session():
+        session = client._get_session()
+        # Let the close of the replaced session run
+        await asyncio.sleep(0)
+        return session
+
+    first = asyncio.run(session())
+    second = asyncio.run(session())
+    assert first is not second
+    assert first.closed
+    assert not second.closed
+    asyncio.run(client.close())
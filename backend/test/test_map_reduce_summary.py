@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for section splitting and the map-reduce collapse of long transcripts.
+"""
+
+import asyncio
+
+from app.services.llm_cache import LLMResponseCache
+from app.services.map_reduce_summary import MapReduceSummarizer, split_sections, topic_boundaries
+from app.services.summarizer import Summarizer
+from app.services.text_chunker import estimate_tokens
+
+BUDGET_TOPIC = [
+    "The budget for the next quarter is tight.",
+    "Marketing budget spending went over the forecast.",
+    "Finance wants the budget forecast revised by Friday.",
+    "The quarter budget review continues next week.",
+]
+HIRING_TOPIC = [
+    "Hiring two engineers for the platform team is approved.",
+    "Engineers interviews start Monday with the platform lead.",
+    "Recruiting will post the engineers job openings.",
+    "Platform hiring should finish before summer.",
+]
+
+def _transcript(sections):
+    return " ".join(f"Topic {i} sentence number {j} talks about item{i} detail{j}." for i in range(sections) for j in range(20))
+
+def _collapse(summarizer, text, calls, fail=()):
+    async def summarize_section(section):
+        calls.append(section)
+        await asyncio.sleep(0.01)
+        if any(marker in section for marker in fail):
+            raise RuntimeError("provider down")
+        return {"summary": f"summary of {len(section)} chars " + "x" * 40, "key_points": ["point"], "action_items": []}
+
+    async def merge(partials):
+        calls.append(("merge", len(partials)))
+        return {"summary": "merged", "key_points": ["point"], "action_items": []}
+
+    return asyncio.run(summarizer.collapse(text, summarize_section, merge))
+
+def test_sections_respect_budget_and_keep_all_words():
+    text = _transcript(6)
+    sections = split_sections(text, max_tokens=120)
+    assert len(sections) > 1
+    assert all(estimate_tokens(s) <= 120 for s in sections)
+    assert " ".join(sections).split() == text.split()
+
+def test_sections_cut_at_topic_shift():
+    boundaries = topic_boundaries(BUDGET_TOPIC + HIRING_TOPIC)
+    assert boundaries[len(BUDGET_TOPIC)]
+    sections = split_sections(" ".join(BUDGET_TOPIC + HIRING_TOPIC), max_tokens=70)
+    assert sections[0] == " ".join(BUDGET_TOPIC)
+
+def test_only_changed_sections_are_summarized_again(tmp_path):
+    cache = LLMResponseCache(db_path=str(tmp_path / "cache.sqlite3"), enabled=True)
+    summarizer = MapReduceSummarizer(section_tokens=120, reduce_tokens=100000, concurrency=2, cache=cache)
+    text = _transcript(6)
+    first_calls = []
+    first = _collapse(summarizer, text, first_calls)
+    assert first["sections"] == len(first_calls) > 2
+    assert first["cached"] == 0
+
+    for edit in ("item2 detail7", "item5 detail19"):
+        edited = text.replace(edit, "item revised")
+        second_calls = []
+        second = _collapse(summarizer, edited, second_calls)
+        assert len(second_calls) == 1
+        assert "item revised" in second_calls[0]
+        assert second["cached"] == second["sections"] - 1
+
+def test_partials_are_merged_until_they_fit():
+    cache = LLMResponseCache(db_path="", enabled=False)
+    summarizer = MapReduceSummarizer(section_tokens=120, reduce_tokens=40, concurrency=3, cache=cache)
+    calls = []
+    result = _collapse(summarizer, _transcript(6), calls)
+    assert result["levels"] >= 1
+    assert any(isinstance(c, tuple) for c in calls)
+    assert len(result["partials"]) == 1
+
+def test_failed_section_falls_back_to_its_text():
+    cache = LLMResponseCache(db_path="", enabled=False)
+    summarizer = MapReduceSummarizer(section_tokens=120, reduce_tokens=100000, concurrency=2, cache=cache)
+    result = _collapse(summarizer, _transcript(3), [], fail=("item1",))
+    assert result["failed"] >= 1
+    assert any("item1" in p["summary"] for p in result["partials"])
+
+def test_summary_with_failed_sections_is_a_fallback():
+    # The upload route only caches results whose summary is not a fallback
+    summarizer = Summarizer()
+
+    async def collapse(text, summarize_section, merge):
+        return {"partials": [{"summary": "opening sentences", "key_points": [], "action_items": []}],
+                "sections": 3, "cached": 0, "failed": 1, "levels": 0}
+
+    class Router:
+        async def chat(self, task, **params):
+            return '{"summary": "reduced", "key_points": [], "action_items": []}'
+
+    summarizer.map_reduce.collapse = collapse
+    summarizer.router = Router()
+    summary = asyncio.run(summarizer._map_reduce_comprehensive_summary("long transcript"))
+    assert summary["summary"] == "reduced"
+    assert summary["fallback"] is True
+    assert summary["map_reduce"]["failed"] == 1
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared Whisper model registry, with the model loader stubbed out.
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import app.services.model_registry as registry_module
+from app.services.model_registry import WhisperModelRegistry
+
+def stub_loader(monkeypatch, delay=0.0):
+    loads = []
+
+    def load_model(name, device=None):
+        loads.append((name, device))
+        time.sleep(delay)
+        return object()
+
+    monkeypatch.setattr(registry_module.whisper, "load_model", load_model)
+    return loads
+
+def test_acquire_and_release_count_references(monkeypatch):
+    loads = stub_loader(monkeypatch)
+    registry = WhisperModelRegistry()
+
+    first = registry.acquire("base", "cpu", "fp32")
+    second = registry.acquire("base", "cpu", "fp32")
+    assert first is second
+    assert loads == [("base", "cpu")]
+    assert registry.stats()["loaded_models"][0]["refcount"] == 2
+
+    registry.release("base", "cpu", "fp32")
+    assert registry.stats()["loaded_models"][0]["refcount"] == 1
+    # Without unload the model stays loaded at zero references
+    registry.release("base", "cpu", "fp32")
+    assert registry.stats()["loaded_models"][0]["refcount"] == 0
+    assert registry.acquire("base", "cpu", "fp32") is first
+    assert len(loads) == 1
+
+    registry.release("base", "cpu", "fp32", unload=True)
+    assert registry.stats() == {"loaded_models": []}
+    assert registry.acquire("base", "cpu", "fp32") is not first
+    assert len(loads) == 2
+
+def test_fp16_key_only_on_cuda():
+    registry = WhisperModelRegistry()
+    cpu_key = registry.resolve_key("base", "cpu", "fp16")
+    cuda_key = registry.resolve_key("base", "cuda", "fp16")
+    assert cpu_key == ("base", "cpu", "fp32")
+    assert cuda_key == ("base", "cuda", "fp16")
+    assert not registry.is_fp16(cpu_key)
+    assert registry.is_fp16(cuda_key)
+    assert registry.resolve_key("base", "cuda", "auto")[2] == "fp16"
+    assert registry.resolve_key("base", "cpu", "auto")[2] == "fp32"
+
+def test_concurrent_acquires_load_once(monkeypatch):
+    loads = stub_loader(monkeypatch, delay=0.05)
+    registry = WhisperModelRegistry()
+    start = threading.Barrier(8)
+
+    def acquire():
+        start.wait()
+        return registry.acquire("small", "cpu", "fp32")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        models = list(pool.map(lambda _: acquire(), range(8)))
+
+    assert len(loads) == 1
+    assert all(model is models[0] for model in models)
+    assert registry.stats()["loaded_models"][0]["refcount"] == 8
+
+def test_processors_sharing_a_model_unload_it_after_the_last_release(monkeypatch):
+    loads = stub_loader(monkeypatch)
+    registry = WhisperModelRegistry()
+    registry.acquire("base", "cpu", "fp32")
+    registry.acquire("base", "cpu", "fp32")
+
+    registry.release("base", "cpu", "fp32", unload=True)
+    assert registry.stats()["loaded_models"][0]["refcount"] == 1
+    registry.release("base", "cpu", "fp32", unload=True)
+    assert registry.stats() == {"loaded_models": []}
+    assert len(loads) == 1
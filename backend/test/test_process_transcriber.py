@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Tests for shared-memory chunk transcription, with a thread pool and a fake
+model standing in for the worker processes.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import app.services.process_transcriber as process_module
+from app.services.process_transcriber import ProcessPoolTranscriber
+
+class FakeModel:
+    def transcribe(self, chunk, fp16=False, language=None):
+        if chunk[0] < 0:
+            raise RuntimeError("decode failed")
+        return {"text": f" {chunk[0]:.0f}-{chunk[-1]:.0f} ", "segments": []}
+
+def test_slices_are_read_from_shared_memory_in_chunk_order(monkeypatch):
+    monkeypatch.setattr(process_module, "_worker_model", FakeModel())
+    transcriber = ProcessPoolTranscriber(workers=2, threads_per_worker=1)
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(transcriber, "_get_pool", lambda model_key: pool)
+
+    audio = np.arange(100, dtype=np.float64)
+    audio[60] = -1.0
+    bounds = [(0, 40), (30, 70), (60, 100), (90, 100)]
+    results = asyncio.run(transcriber.transcribe(audio, bounds, ("base", "cpu", "fp32")))
+    pool.shutdown(wait=True)
+
+    assert [r["chunk_id"] for r in results] == [0, 1, 2, 3]
+    assert [r["text"] for r in results] == ["0-39", "30-69", "", "90-99"]
+    assert results[2]["success"] is False and "decode failed" in results[2]["error"]
+    assert all(r["success"] for i, r in enumerate(results) if i != 2)
+
+def test_no_chunks_starts_no_pool():
+    transcriber = ProcessPoolTranscriber(workers=2)
+    assert asyncio.run(transcriber.transcribe(np.zeros(10, dtype=np.float32), [], ("base", "cpu", "fp32"))) == []
+    assert transcriber._pool is None
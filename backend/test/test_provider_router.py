@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for latency-ranked provider routing with circuit breakers.
+"""
+
+import asyncio
+import pytest
+from app.services.llm_client import LLMError
+from app.services.provider_router import ProviderRouter, parse_backends
+
+class _FakeLLM:
+    def __init__(self, latency, failing=()):
+        self.latency = latency
+        self.failing = set(failing)
+        self.observers = []
+        self.calls = []
+        # Providers whose replies come from the response cache (no observer call)
+        self.cached = set()
+
+    def add_observer(self, observer):
+        self.observers.append(observer)
+
+    async def chat(self, provider, model, messages, call_site=None, **params):
+        self.calls.append(provider)
+        if provider in self.cached:
+            return f"{provider} cached reply"
+        error = LLMError(f"{provider} down", provider=provider, status=503) if provider in self.failing else None
+        for observer in self.observers:
+            observer(provider, model, self.latency[provider], error)
+        if error:
+            raise error
+        return f"{provider} reply"
+
+BACKENDS = {"correct": [("groq", "a"), ("openrouter", "b")]}
+
+def _router(llm, **options):
+    return ProviderRouter(task_backends=BACKENDS, llm=llm, **options)
+
+def test_routes_to_the_fastest_backend_once_measured():
+    llm = _FakeLLM({"groq": 2.0, "openrouter": 0.5})
+    router = _router(llm)
+    messages = [{"role": "user", "content": "hi"}]
+    for _ in range(3):
+        asyncio.run(router.chat("correct", messages))
+    # Both get measured first (untried backends rank first), then the faster one wins
+    assert llm.calls[:2] == ["groq", "openrouter"]
+    assert llm.calls[2] == "openrouter"
+    assert router.status()["tasks"]["correct"]["ranking"] == ["openrouter:b", "groq:a"]
+
+def test_failures_fail_over_and_open_the_circuit():
+    llm = _FakeLLM({"groq": 0.1, "openrouter": 1.0}, failing={"groq"})
+    router = _router(llm, failure_threshold=2, cooldown_seconds=60)
+    messages = [{"role": "user", "content": "hi"}]
+    assert asyncio.run(router.chat("correct", messages)) == "openrouter reply"
+    asyncio.run(router.chat("correct", messages))
+    assert router.status()["backends"]["groq:a"]["state"] == "open"
+
+    llm.calls.clear()
+    asyncio.run(router.chat("correct", messages))
+    assert llm.calls == ["openrouter"]
+
+def test_half_open_probe_closes_the_circuit_on_success():
+    llm = _FakeLLM({"groq": 0.1, "openrouter": 1.0}, failing={"groq"})
+    router = _router(llm, failure_threshold=1, cooldown_seconds=0.0)
+    messages = [{"role": "user", "content": "hi"}]
+    asyncio.run(router.chat("correct", messages))
+    assert router.status()["backends"]["groq:a"]["consecutive_failures"] == 1
+
+    llm.failing.clear()
+    llm.calls.clear()
+    asyncio.run(router.chat("correct", messages))
+    assert llm.calls[0] == "groq"
+    assert router.status()["backends"]["groq:a"]["state"] == "closed"
+
+def test_half_open_probe_answered_from_cache_closes_the_circuit():
+    llm = _FakeLLM({"groq": 0.1, "openrouter": 1.0}, failing={"groq"})
+    router = _router(llm, failure_threshold=1, cooldown_seconds=0.0)
+    messages = [{"role": "user", "content": "hi"}]
+    asyncio.run(router.chat("correct", messages))
+    assert router.status()["backends"]["groq:a"]["state"] == "half_open"
+
+    llm.cached.add("groq")
+    assert asyncio.run(router.chat("correct", messages)) == "groq cached reply"
+    assert router.status()["backends"]["groq:a"]["state"] == "closed"
+
+def test_rate_limit_opens_the_circuit_at_once():
+    llm = _FakeLLM({"groq": 0.1, "openrouter": 1.0})
+    router = _router(llm, failure_threshold=5, cooldown_seconds=60)
+    router.observe("groq", "a", 0.1, LLMError("slow down", provider="groq", status=429))
+    assert router.candidates("correct") == [("openrouter", "b")]
+
+def test_all_backends_failing_raises_the_last_error():
+    llm = _FakeLLM({"groq": 0.1, "openrouter": 0.1}, failing={"groq", "openrouter"})
+    router = _router(llm)
+    with pytest.raises(LLMError) as error:
+        asyncio.run(router.chat("correct", [{"role": "user", "content": "hi"}]))
+    assert error.value.provider == "openrouter"
+
+def test_backend_spec_parsing():
+    assert parse_backends("groq:llama, openrouter:meta/llama:free,bad") == [
+        ("groq", "llama"), ("openrouter", "meta/llama:free")
+    ]
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-provider request/token rate limiter.
+"""
+
+import asyncio
+import time
+from app.services.rate_limiter import ProviderRateLimiter, estimate_request_tokens
+
+def test_requests_over_the_limit_wait_instead_of_failing():
+    # 600/min = one request every 0.1 s once the burst allowance is used up
+    limiter = ProviderRateLimiter("p", requests_per_minute=600, tokens_per_minute=0)
+    limiter.requests.level = 1
+
+    async def scenario():
+        start = time.perf_counter()
+        await asyncio.gather(*(limiter.acquire(10) for _ in range(4)))
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(scenario())
+    assert 0.25 < elapsed < 0.6
+    stats = limiter.stats()
+    assert stats["acquired"] == 4 and stats["delayed"] == 3
+    # The first request goes straight through; the other three queue behind it
+    assert stats["max_queue_depth"] == 3 and stats["queue_depth"] == 0
+
+def test_queue_is_first_come_first_served():
+    limiter = ProviderRateLimiter("p", requests_per_minute=0, tokens_per_minute=6000)
+    limiter.tokens.level = 0
+    order = []
+
+    async def request(name, tokens):
+        await limiter.acquire(tokens)
+        order.append(name)
+
+    async def scenario():
+        big = asyncio.ensure_future(request("big", 20))
+        await asyncio.sleep(0)
+        small = asyncio.ensure_future(request("small", 1))
+        await asyncio.gather(big, small)
+
+    asyncio.run(scenario())
+    # The small request arrived later and must not overtake the large one
+    assert order == ["big", "small"]
+
+def test_unused_tokens_are_returned():
+    limiter = ProviderRateLimiter("p", requests_per_minute=0, tokens_per_minute=1000)
+    asyncio.run(limiter.acquire(600))
+    limiter.settle(600, 100)
+    assert 890 < limiter.tokens.level <= 1000
+
+def test_pause_holds_the_queue():
+    limiter = ProviderRateLimiter("p", requests_per_minute=0, tokens_per_minute=0)
+    limiter.pause(0.2)
+    start = time.perf_counter()
+    asyncio.run(limiter.acquire(1))
+    assert time.perf_counter() - start >= 0.19
+    assert limiter.stats()["rate_limited"] == 1
+
+def test_cost_estimate_includes_the_completion_budget():
+    messages = [{"role": "user", "content": "x" * 400}]
+    assert estimate_request_tokens(messages, 300) == 100 + 4 + 300
+    assert estimate_request_tokens(messages, None) == 104
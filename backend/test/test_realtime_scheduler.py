@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests for cross-session micro-batching of real-time chunks.
+"""
+
+import asyncio
+import numpy as np
+from app.services.realtime_scheduler import RealtimeBatchScheduler
+
+class _FakeTranscriber:
+    def __init__(self):
+        self.batches = []
+
+    def transcribe_chunks(self, model, chunks, language=None, fp16=False):
+        self.batches.append(len(chunks))
+        return [{"text": f"chunk {int(chunk[0])}", "chunk_id": i} for i, chunk in enumerate(chunks)]
+
+def _submit_all(scheduler, count, model=object()):
+    async def run():
+        chunks = [np.full(1600, i, dtype=np.float32) for i in range(count)]
+        return await asyncio.gather(*(scheduler.submit(model, chunk, "en") for chunk in chunks))
+    return asyncio.run(run())
+
+def test_concurrent_chunks_share_batches_and_keep_their_results():
+    transcriber = _FakeTranscriber()
+    scheduler = RealtimeBatchScheduler(max_batch_size=4, max_wait_ms=20, transcriber=transcriber)
+    results = _submit_all(scheduler, 6)
+
+    assert [r["text"] for r in results] == [f"chunk {i}" for i in range(6)]
+    assert sorted(transcriber.batches) == [2, 4]
+    stats = scheduler.stats()
+    assert stats["batches"] == 2 and stats["chunks"] == 6
+    assert stats["batch_sizes"] == {2: 1, 4: 1}
+
+def test_lone_chunk_waits_at_most_max_wait():
+    transcriber = _FakeTranscriber()
+    scheduler = RealtimeBatchScheduler(max_batch_size=8, max_wait_ms=30, transcriber=transcriber)
+    result = _submit_all(scheduler, 1)[0]
+
+    assert transcriber.batches == [1]
+    assert 0.02 <= result["queue_wait"] < 0.5
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the rolling summary of live sessions.
+"""
+
+import asyncio
+
+from app.services.rolling_summary import RollingSummary
+
+def _folder(seen, fail=False, delay=0.0):
+    async def fold(state, new_text):
+        seen.append(new_text)
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError("provider down")
+        return {"summary": (state["summary"] + " | " + new_text).strip(" |"), "key_points": [], "action_items": []}
+    return fold
+
+def test_due_on_size_or_interval_but_not_below_minimum():
+    rolling = RollingSummary(interval_seconds=60, min_tokens=5, max_tokens=50)
+    rolling.add("short")
+    assert not rolling.due(now=rolling._last_update + 120)
+    rolling.add("enough words here to pass the minimum")
+    assert not rolling.due(now=rolling._last_update + 1)
+    assert rolling.due(now=rolling._last_update + 61)
+    rolling.add("x" * 200)
+    assert rolling.due(now=rolling._last_update + 1)
+
+def test_each_fold_sees_only_new_text():
+    rolling = RollingSummary(min_tokens=1)
+    seen = []
+
+    async def scenario():
+        rolling.add("first part.")
+        await rolling.fold(_folder(seen))
+        rolling.add("second part.")
+        rolling.add("third part.")
+        await rolling.fold(_folder(seen))
+
+    asyncio.run(scenario())
+    assert seen == ["first part.", "second part. third part."]
+    assert rolling.state["summary"] == "first part. | second part. third part."
+    assert rolling.version == 2
+    assert rolling.text == "first part. second part. third part."
+
+def test_failed_fold_keeps_text_for_the_next_one():
+    rolling = RollingSummary(min_tokens=1)
+    seen = []
+
+    async def scenario():
+        rolling.add("kept.")
+        assert not await rolling.fold(_folder(seen, fail=True))
+        rolling.add("later.")
+        assert await rolling.fold(_folder(seen))
+
+    asyncio.run(scenario())
+    assert seen == ["kept.", "kept. later."]
+    assert rolling.stats()["failed_folds"] == 1
+    assert rolling.pending_tokens == 0
+
+def test_one_background_fold_at_a_time_and_finish_folds_the_rest():
+    rolling = RollingSummary(interval_seconds=0, min_tokens=1, max_tokens=1000)
+    seen, updates = [], []
+
+    async def on_update(message):
+        updates.append(message)
+
+    async def scenario():
+        fold = _folder(seen, delay=0.05)
+        rolling.add("one.")
+        rolling.schedule(fold, on_update)
+        await asyncio.sleep(0)
+        # Arrives while the first fold is running: no second fold is started
+        rolling.add("two.")
+        rolling.schedule(fold, on_update)
+        assert await rolling.finish(fold)
+
+    asyncio.run(scenario())
+    assert seen == ["one.", "two."]
+    assert [u["type"] for u in updates] == ["summary_update"]
+    assert updates[0]["version"] == 1
+    assert rolling.version == 2
+
+def test_fold_takes_at_most_max_tokens_and_leaves_the_rest():
+    rolling = RollingSummary(min_tokens=1, max_tokens=25)
+    pieces = [f"piece {i} " + "x" * 40 for i in range(6)]
+    seen = []
+
+    async def scenario():
+        # Text piling up while the provider is down
+        for piece in pieces:
+            rolling.add(piece)
+        assert not await rolling.fold(_folder(seen, fail=True))
+        assert await rolling.fold(_folder(seen))
+        assert rolling.pending_tokens > 0
+        return await rolling.finish(_folder(seen))
+
+    assert asyncio.run(scenario())
+    assert seen[0] == seen[1] == " ".join(pieces[:2])
+    assert seen[2:] == [" ".join(pieces[2:4]), " ".join(pieces[4:])]
+    assert rolling.pending_tokens == 0
+    assert rolling.state["summary"] == " | ".join(seen[1:])
+
+def test_oversized_piece_is_still_folded_alone():
+    rolling = RollingSummary(min_tokens=1, max_tokens=5)
+    seen = []
+
+    async def scenario():
+        rolling.add("y" * 200)
+        rolling.add("tail.")
+        await rolling.fold(_folder(seen))
+
+    asyncio.run(scenario())
+    assert seen == ["y" * 200]
+    assert rolling.pending_tokens > 0
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the local ROVER transcription combiner.
+"""
+
+import random
+import time
+from difflib import SequenceMatcher
+import numpy as np
+from app.services.rover_combiner import RoverCombiner, edit_alignment
+
+def test_majority_vote_per_word():
+    result = RoverCombiner().combine([
+        "the team will ship the release on friday",
+        "the team will ship a release on friday",
+        "a team will ship the release on friday today",
+    ])
+    assert result["text"] == "the team will ship the release on friday"
+    assert 0.8 < result["confidence"] < 1.0
+
+def test_agreeing_candidates_have_full_confidence():
+    result = RoverCombiner().combine(["Budget is approved.", "budget is approved"])
+    assert result["text"] == "Budget is approved."
+    assert result["confidence"] == 1.0
+
+def test_edit_alignment_is_minimal():
+    a, b = np.array([1, 2, 3, 4, 5]), np.array([1, 3, 4, 9, 5, 6])
+    pairs = edit_alignment(a, b)
+    edits = sum(1 for i, j in pairs if i is None or j is None or a[i] != b[j])
+    assert edits == 3
+
+def test_hour_long_transcripts_combine_quickly():
+    rng = random.Random(0)
+    vocabulary = [f"word{i}" for i in range(2000)]
+    reference = [rng.choice(vocabulary) for _ in range(9000)]
+
+    def noisy():
+        out = []
+        for word in reference:
+            roll = rng.random()
+            if roll < 0.01:
+                continue
+            if roll < 0.02:
+                out.append("uh")
+            out.append("wrong" if 0.02 <= roll < 0.03 else word)
+        return " ".join(out)
+
+    candidates = [noisy() for _ in range(5)]
+    start = time.perf_counter()
+    result = RoverCombiner().combine(candidates)
+    assert time.perf_counter() - start < 2.0
+    matcher = SequenceMatcher(None, result["text"].split(), reference, autojunk=False)
+    assert matcher.ratio() > 0.995
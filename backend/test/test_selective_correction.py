@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for confidence-driven selective LLM correction.
+"""
+
+import asyncio
+from app.services.selective_correction import SelectiveCorrector
+
+def _segment(text, avg_logprob=-0.2, no_speech_prob=0.05, compression_ratio=1.4):
+    return {"start": 0.0, "end": 1.0, "text": text, "avg_logprob": avg_logprob,
+            "no_speech_prob": no_speech_prob, "compression_ratio": compression_ratio}
+
+def _segments():
+    return [
+        _segment("We agreed on the budget."),
+        _segment("the vendor sed they will", avg_logprob=-0.8),
+        _segment("ship next week", avg_logprob=-0.9),
+        _segment("Any other business?"),
+        _segment("yes yes yes yes yes yes", compression_ratio=3.1),
+        _segment("Thanks everyone."),
+    ]
+
+def test_confident_segments_are_not_sent():
+    corrector = SelectiveCorrector(logprob_threshold=-0.6, compression_threshold=2.4, context_segments=1)
+    assert corrector.plan_spans(_segments()) == [(1, 3), (4, 5)]
+    assert corrector.needs_correction({"text": "no metrics"})
+
+def test_spans_are_corrected_with_context_and_reassembled():
+    corrector = SelectiveCorrector(logprob_threshold=-0.6, context_segments=1)
+    calls = []
+
+    async def correct(passage, before, after):
+        calls.append((passage, before, after))
+        if passage.startswith("yes"):
+            raise RuntimeError("provider down")
+        return "The vendor said they will ship next week."
+
+    result = asyncio.run(corrector.correct(_segments(), correct))
+    assert calls[0] == ("the vendor sed they will ship next week", "We agreed on the budget.", "Any other business?")
+    assert result["text"] == ("We agreed on the budget. The vendor said they will ship next week. "
+                              "Any other business? yes yes yes yes yes yes Thanks everyone.")
+    assert result["segments"][1]["text"] == "The vendor said they will"
+    assert result["segments"][2]["text"] == "ship next week."
+    assert result["segments"][1]["corrected"] and "corrected" not in result["segments"][0]
+    assert result["spans"] == 2 and result["failed"] == 1
+    assert 0.3 < result["skipped_fraction"] < 0.7
+
+def test_clean_transcript_skips_the_llm_entirely():
+    corrector = SelectiveCorrector()
+
+    async def correct(passage, before, after):
+        raise AssertionError("confident text must not be sent")
+
+    segments = [_segment(f"Sentence {i} was transcribed cleanly.") for i in range(50)]
+    result = asyncio.run(corrector.correct(segments, correct))
+    assert result["spans"] == 0
+    assert result["skipped_fraction"] == 1.0
+    assert result["text"] == " ".join(s["text"] for s in segments)
+
+def test_long_runs_are_split_at_the_token_budget():
+    corrector = SelectiveCorrector(max_tokens=20)
+    segments = [_segment("a fairly long uncertain stretch of words", avg_logprob=-1.5) for _ in range(6)]
+    spans = corrector.plan_spans(segments)
+    assert len(spans) > 1
+    assert spans[0][0] == 0 and spans[-1][1] == 6
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for coalescing concurrent identical jobs.
+"""
+
+import asyncio
+from app.services.single_flight import SingleFlight
+
+def test_concurrent_callers_share_one_run():
+    flights = SingleFlight()
+    runs = []
+
+    async def job():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return {"transcription": "hello"}
+
+    async def main():
+        results = await asyncio.gather(*(flights.run("same", job) for _ in range(5)))
+        later, shared_later = await flights.run("same", job)
+        return results, shared_later
+
+    results, shared_later = asyncio.run(main())
+    assert len(runs) == 2
+    assert all(r == {"transcription": "hello"} for r, _ in results)
+    assert [shared for _, shared in results].count(False) == 1
+    assert shared_later is False
+    assert flights.stats() == {"in_flight": 0, "started": 2, "coalesced": 4}
+
+def test_failure_reaches_every_caller_and_cancelled_caller_does_not_stop_the_job():
+    flights = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("decode failed")
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        outcomes = await asyncio.gather(*(flights.run("bad", failing) for _ in range(3)), return_exceptions=True)
+        first = asyncio.ensure_future(flights.run("slow", slow))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flights.run("slow", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return outcomes, await second
+
+    outcomes, second = asyncio.run(main())
+    assert all(isinstance(o, RuntimeError) for o in outcomes)
+    assert second == ("done", True)
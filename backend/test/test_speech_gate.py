@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Tests for the real-time no-speech gate.
+"""
+
+import numpy as np
+from app.services.speech_gate import SpeechGate, speech_gate_metrics
+
+SR = 16000
+rng = np.random.default_rng(0)
+
+def _noise(seconds, level=0.003):
+    return (rng.standard_normal(int(seconds * SR)) * level).astype(np.float32)
+
+def _voice(seconds, level=0.2):
+    """Harmonic 'vowel' at 150 Hz with syllable-rate amplitude modulation, over room noise."""
+    t = np.arange(int(seconds * SR)) / SR
+    harmonics = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 12))
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t))
+    return (level * envelope * harmonics / 3).astype(np.float32) + _noise(seconds)
+
+def test_silence_and_noise_are_gated_speech_passes():
+    gate = SpeechGate()
+    avoided_before = speech_gate_metrics.decodes_avoided
+
+    assert not gate.has_speech(np.zeros(SR, dtype=np.float32))
+    assert not gate.has_speech(_noise(1.0))
+    assert gate.has_speech(_voice(1.0))
+    assert speech_gate_metrics.decodes_avoided - avoided_before == 2
+
+def test_noise_floor_adapts_to_a_louder_room():
+    gate = SpeechGate()
+    # Loud broadband noise (fan, traffic) is rejected and raises the floor
+    for _ in range(5):
+        assert not gate.has_speech(_noise(1.0, level=0.05))
+    assert gate.noise_floor_db > -30
+    assert gate.has_speech(_voice(1.0, level=0.6) + _noise(1.0, level=0.05))
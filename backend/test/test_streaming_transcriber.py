@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for rolling-buffer streaming transcription.
+"""
+
+import asyncio
+import numpy as np
+from app.services.streaming_transcriber import StreamingSession
+
+SR = 16000
+SCRIPT = "the quarterly numbers look good so we will hire two more engineers next month".split()
+
+def _fake_transcribe(calls):
+    """Each word takes 0.5 s; audio samples carry their own stream time so the fake knows where it is."""
+    async def transcribe(audio, prompt, language):
+        calls.append(len(audio) / SR)
+        start = float(audio[0])
+        end = start + len(audio) / SR
+        segments = []
+        # Two-word segments; a segment still being spoken is returned with a wrong last word
+        for first in range(0, len(SCRIPT), 2):
+            seg_start, seg_end = first * 0.5, (first + 2) * 0.5
+            if seg_start < start - 1e-3 or seg_start >= end:
+                continue
+            words = SCRIPT[first:first + 2]
+            if seg_end > end + 1e-3:
+                words = words[:1] + ["uh"]
+            segments.append({"start": seg_start - start, "end": min(seg_end, end) - start,
+                             "text": " " + " ".join(words)})
+        return {"segments": segments}
+    return transcribe
+
+def _stream(session, seconds, step=0.25):
+    finals, partials = [], []
+    times = (np.arange(int(seconds * SR)) / SR).astype(np.float32)
+    for i in range(0, len(times), int(step * SR)):
+        update = asyncio.run(session.add_audio(times[i:i + int(step * SR)]))
+        if update["final"]:
+            finals.append(update["final"])
+        if update["decoded"]:
+            partials.append(update["partial"])
+    update = asyncio.run(session.finish())
+    if update["final"]:
+        finals.append(update["final"])
+    return finals, partials
+
+def test_finals_cover_the_stream_without_duplicates():
+    calls = []
+    session = StreamingSession(_fake_transcribe(calls), min_decode_seconds=1.0, max_buffer_seconds=15)
+    finals, partials = _stream(session, len(SCRIPT) * 0.5)
+    assert " ".join(finals).split() == SCRIPT
+    assert any(partials)
+
+def test_committed_audio_is_not_decoded_again():
+    calls = []
+    session = StreamingSession(_fake_transcribe(calls), min_decode_seconds=1.0, max_buffer_seconds=15)
+    _stream(session, len(SCRIPT) * 0.5)
+    # Without trimming the last decode would cover the whole 7 s stream
+    assert max(calls) < 3.0
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for token-budgeted transcript chunking and the concurrent correction map.
+"""
+
+import asyncio
+import time
+from app.services.text_chunker import chunk_text, map_chunks, split_sentences, estimate_tokens
+
+def _transcript(sentences):
+    return " ".join(f"This is sentence number {i} of the meeting." for i in range(sentences))
+
+def test_chunks_keep_whole_sentences_within_budget():
+    text = _transcript(200)
+    chunks = chunk_text(text, max_tokens=50)
+    assert len(chunks) > 1
+    assert " ".join(chunks) == text
+    for chunk in chunks:
+        assert estimate_tokens(chunk) <= 50
+        assert chunk.endswith(".")
+
+def test_overlong_sentence_is_split_on_words():
+    text = " ".join(f"word{i}" for i in range(500))
+    chunks = chunk_text(text, max_tokens=20)
+    assert " ".join(chunks) == text
+    assert all(len(chunk) <= 80 for chunk in chunks)
+
+def test_split_sentences_handles_quotes_and_unpunctuated_text():
+    assert split_sentences('He said "stop." Then we left! Why? ok') == ['He said "stop."', "Then we left!", "Why?", "ok"]
+    assert split_sentences("no punctuation at all") == ["no punctuation at all"]
+
+def test_chunking_is_linear_on_long_transcripts():
+    text = _transcript(50000)
+    start = time.perf_counter()
+    chunks = chunk_text(text, max_tokens=600)
+    assert time.perf_counter() - start < 2.0
+    assert " ".join(chunks) == text
+
+def test_map_runs_concurrently_in_order_with_fallback():
+    chunks = [f"chunk {i}" for i in range(8)]
+    in_flight = 0
+    peak = 0
+
+    async def correct(chunk):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02 if chunk != "chunk 0" else 0.05)
+        in_flight -= 1
+        if chunk == "chunk 3":
+            raise RuntimeError("provider down")
+        if chunk == "chunk 5":
+            return ""
+        return chunk.upper()
+
+    result = asyncio.run(map_chunks(chunks, correct, concurrency=3))
+    assert peak == 3
+    assert result["failed"] == 2
+    assert result["text"] == "CHUNK 0 CHUNK 1 CHUNK 2 chunk 3 CHUNK 4 chunk 5 CHUNK 6 CHUNK 7"
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for stitching overlapping chunk transcriptions.
+"""
+
+from app.services.transcript_stitcher import TranscriptStitcher
+
+def _chunk(chunk_id, start, end, segments):
+    return {
+        "chunk_id": chunk_id,
+        "start_time": start,
+        "end_time": end,
+        "segments": [{"start": s, "end": e, "text": t} for s, e, t in segments]
+    }
+
+def test_overlap_duplicates_are_removed():
+    chunks = [
+        _chunk(0, 0.0, 12.0, [(0.0, 6.0, "we should ship the release"), (6.0, 12.0, "on friday after the final review")]),
+        _chunk(1, 10.0, 22.0, [(10.0, 14.0, "the final review of the"), (14.0, 22.0, "billing changes is done")]),
+    ]
+    result = TranscriptStitcher().stitch(chunks)
+    assert result["text"] == "we should ship the release on friday after the final review of the billing changes is done"
+    assert result["duplicates_removed"] == 3
+
+def test_non_overlapping_chunks_are_concatenated_in_order():
+    chunks = [
+        _chunk(1, 20.0, 30.0, [(20.0, 30.0, "second part.")]),
+        _chunk(0, 0.0, 10.0, [(0.0, 10.0, "First part,")]),
+    ]
+    result = TranscriptStitcher().stitch(chunks)
+    assert result["text"] == "First part, second part."
+    assert [s["start"] for s in result["segments"]] == [0.0, 20.0]
+
+def test_time_cut_when_overlap_text_disagrees():
+    chunks = [
+        _chunk(0, 0.0, 10.0, [(0.0, 10.0, "alpha beta gamma delta epsilon")]),
+        _chunk(1, 8.0, 18.0, [(8.0, 18.0, "zeta eta theta iota kappa")]),
+    ]
+    result = TranscriptStitcher().stitch(chunks)
+    words = result["text"].split()
+    # Nothing duplicated and the seam falls inside the overlap
+    assert len(words) == len(set(words))
+    assert words[0] == "alpha" and words[-1] == "kappa"
+
+def test_segment_metrics_are_kept():
+    chunks = [{
+        "chunk_id": 0, "start_time": 0.0, "end_time": 5.0,
+        "segments": [{"start": 0.0, "end": 5.0, "text": "hello there", "avg_logprob": -0.2}]
+    }]
+    result = TranscriptStitcher().stitch(chunks)
+    assert result["segments"][0]["avg_logprob"] == -0.2
+    assert result["segments"][0]["end"] == 5.0
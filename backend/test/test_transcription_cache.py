@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-addressed transcription cache.
+"""
+
+import numpy as np
+from app.services.transcription_cache import TranscriptionCache, audio_cache_key, file_cache_key
+
+SETTINGS = {"mode": "ultra_fast", "whisper": ["large-v3", "cpu", "fp32"], "language": "en"}
+
+def _payload(text):
+    return {"transcription": text, "segments": [{"start": 0.0, "end": 1.0, "text": text}],
+            "summary": {"full_summary": text}, "speaker_count": np.int64(2), "speakers": []}
+
+def test_keys_depend_on_audio_and_settings():
+    audio = np.linspace(-1, 1, 16000, dtype=np.float32)
+    assert audio_cache_key(audio, SETTINGS) == audio_cache_key(audio.copy(), dict(SETTINGS))
+    assert audio_cache_key(audio, SETTINGS) != audio_cache_key(audio[::-1], SETTINGS)
+    assert audio_cache_key(audio, SETTINGS) != audio_cache_key(audio, {**SETTINGS, "language": "de"})
+
+def test_hits_survive_restart_and_file_alias(tmp_path):
+    upload = tmp_path / "meeting.mp3"
+    upload.write_bytes(b"fake mp3 bytes")
+    file_key = file_cache_key(str(upload), SETTINGS)
+
+    cache = TranscriptionCache(str(tmp_path / "cache"), max_bytes=1 << 20, enabled=True)
+    assert cache.get("abc") is None
+    cache.put("abc", _payload("hello"), aliases=[file_key])
+
+    reopened = TranscriptionCache(str(tmp_path / "cache"), max_bytes=1 << 20, enabled=True)
+    assert reopened.get_by_alias(file_key)["transcription"] == "hello"
+    assert reopened.get("abc")["speaker_count"] == 2
+    assert reopened.stats()["hits"] == 2 and reopened.stats()["alias_hits"] == 1
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = TranscriptionCache(str(tmp_path), max_bytes=10_000, enabled=True)
+    for key in ("a", "b", "c"):
+        cache.put(key, _payload(key * 1000))
+    cache.get("a")  # refresh a, so b is the oldest
+    cache.put("d", _payload("d" * 1000))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("d") is not None
+    assert cache.stats()["evictions"] >= 1
+    assert cache.stats()["bytes"] <= 10_000
+
+def test_eviction_removes_aliases_written_by_an_earlier_process(tmp_path):
+    directory = tmp_path / "cache"
+    first = TranscriptionCache(str(directory), max_bytes=10_000, enabled=True)
+    first.put("a", _payload("a" * 1000), aliases=["upload-a"])
+    first.put("b", _payload("b" * 1000))
+
+    # A later process adds an alias and evicts "a" without ever reading it
+    later = TranscriptionCache(str(directory), max_bytes=10_000, enabled=True)
+    later.add_alias("a", "reupload-a")
+    for key in ("c", "d"):
+        later.put(key, _payload(key * 1000))
+
+    assert later.get("a") is None
+    assert not (directory / "aliases" / "upload-a").exists()
+    assert not (directory / "aliases" / "reupload-a").exists()
+
+def test_dangling_alias_files_are_dropped_on_load(tmp_path):
+    directory = tmp_path / "cache"
+    (directory / "aliases").mkdir(parents=True)
+    (directory / "aliases" / "orphan").write_text("gone")
+    cache = TranscriptionCache(str(directory), max_bytes=1 << 20, enabled=True)
+    assert cache.stats()["entries"] == 0
+    assert cache.get_by_alias("orphan") is None
+    assert not (directory / "aliases" / "orphan").exists()
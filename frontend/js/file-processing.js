@@ -20,8 +20,8 @@ function processAudioFile(file, callbacks) {
         }
     }, 150);
 
-    // Upload to backend
-    fetch('http://localhost:8000/api/process-audio', {
+    // Upload to backend; the summary is streamed separately (streamSummary)
+    fetch('http://localhost:8000/api/process-audio?summary=false', {
         method: 'POST',
         body: formData
     })
@@ -72,6 +72,64 @@ function processAudioFile(file, callbacks) {
     });
 }
 
-// Make function globally available
+// Stream the AI summary of a transcript as it is generated.
+// handlers: onDraft(summary), onDelta(field, text), onItem(field, index, text), onDone(summary), onError(error)
+function streamSummary(text, handlers) {
+    const { onDraft, onDelta, onItem, onDone, onError } = handlers;
+
+    fetch('http://localhost:8000/api/summary/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ text })
+    })
+    .then(async response => {
+        if (!response.ok || !response.body) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let finished = false;
+
+        while (!finished) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            // Server-sent events are separated by a blank line
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const frame = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                const dataLine = frame.split('\n').find(line => line.startsWith('data: '));
+                if (!dataLine) continue;
+
+                const event = JSON.parse(dataLine.slice(6));
+                if (event.type === 'draft' && onDraft) {
+                    onDraft(event.summary || {});
+                } else if (event.type === 'field_delta' && onDelta) {
+                    onDelta(event.field, event.text);
+                } else if (event.type === 'item' && onItem) {
+                    onItem(event.field, event.index, event.text);
+                } else if (event.type === 'done') {
+                    finished = true;
+                    onDone(event.summary || {});
+                }
+            }
+        }
+
+        if (!finished) {
+            throw new Error('Summary stream ended early');
+        }
+    })
+    .catch(error => {
+        console.error('Error streaming summary:', error);
+        onError(error);
+    });
+}
+
+// Make functions globally available
 window.processAudioFile = processAudioFile;
+window.streamSummary = streamSummary;
 console.log('✅ File-processing.js loaded - Ready for backend integration');
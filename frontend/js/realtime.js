@@ -29,9 +29,23 @@
     let bufferSize = 0;
     let lastSpeaker = null;  // Track last speaker to append text
     let lastTranscriptElement = null;  // Track last transcript DOM element
+    let partialElement = null;  // Uncommitted streaming hypothesis
     const BUFFER_THRESHOLD = 32000;  // ~2 seconds at 16kHz (minimum for Whisper)
 
     const BACKEND_URL = 'ws://localhost:8000/ws/audio';
+    // Streaming transcription (live partial text, committed as it stabilizes) is opt-in:
+    // open the page with ?streaming=1 or set pref.streaming in the saved profile
+    const STREAMING = new URLSearchParams(window.location.search).get('streaming') === '1'
+        || readStreamingPreference();
+
+    function readStreamingPreference() {
+        try {
+            const profile = JSON.parse(localStorage.getItem('userProfile')) || {};
+            return !!(profile.pref && profile.pref.streaming);
+        } catch {
+            return false;
+        }
+    }
 
     // Initialize button states
     if (startBtn) startBtn.disabled = true;
@@ -95,8 +109,13 @@
             const data = JSON.parse(event.data);
             console.log('📩 Received from backend:', data);
             
-            if (data.type === 'transcription') {
+            if (data.type === 'transcription' || data.type === 'final') {
+                clearPartial();
                 addTranscriptItem(data.text, data.speaker_id || 1);
+            } else if (data.type === 'partial') {
+                showPartial(data.text);
+            } else if (data.type === 'summary_update' || data.type === 'final_summary') {
+                applyBackendSummary(data);
             } else if (data.type === 'error') {
                 console.error('Backend error:', data.message);
                 showAlert('Error: ' + data.message, 'error');
@@ -190,6 +209,11 @@
         
         // Stop audio capture
         stopAudioCapture();
+
+        // Ask the backend to commit the rest of the session and send its final summary
+        if (websocket && websocket.readyState === WebSocket.OPEN) {
+            websocket.send(JSON.stringify({ type: 'end_session', timestamp: Date.now() }));
+        }
         
         // Show and generate AI summary if we have transcript data
         if (transcriptData.length > 0) {
@@ -254,7 +278,9 @@
                     websocket.send(JSON.stringify({
                         type: 'audio_chunk',
                         audio_data: Array.from(combined),
-                        timestamp: Date.now()
+                        timestamp: Date.now(),
+                        // Only sent when opted in, so the server default applies otherwise
+                        ...(STREAMING ? { streaming: true } : {})
                     }));
                     
                     console.log(`📡 Sent ${bufferSize} samples (${(bufferSize/16000).toFixed(2)}s of audio)`);
@@ -354,7 +380,31 @@
         transcript.scrollTop = transcript.scrollHeight;
     }
 
+    function showPartial(text) {
+        if (!transcript) return;
+        if (!text) {
+            clearPartial();
+            return;
+        }
+        if (!partialElement) {
+            partialElement = document.createElement('div');
+            partialElement.className = 'transcript-partial';
+        }
+        partialElement.textContent = text;
+        // Always the last line, after the committed text
+        transcript.appendChild(partialElement);
+        transcript.scrollTop = transcript.scrollHeight;
+    }
+
+    function clearPartial() {
+        if (partialElement) {
+            partialElement.remove();
+            partialElement = null;
+        }
+    }
+
     function clearTranscript() {
+        clearPartial();
         transcriptData = [];
         aiSummary = null;
         lastSpeaker = null;  // Reset speaker tracking
@@ -417,6 +467,25 @@
         displaySummary();
     }
 
+    function applyBackendSummary(data) {
+        // Rolling updates during the session, then the comprehensive summary at its end
+        const isFinal = data.type === 'final_summary';
+        const overview = isFinal ? data.full_summary : data.summary;
+        if (!overview || !summaryContainer || !summaryGenerating) return;
+
+        summaryContainer.style.display = 'block';
+        summaryGenerating.style.display = 'none';
+        aiSummary = {
+            overview: overview,
+            keyPoints: data.key_points && data.key_points.length > 0 ? data.key_points : ["Review transcript for detailed discussion"],
+            actionItems: data.action_items && data.action_items.length > 0 ? data.action_items : ["No specific action items identified"]
+        };
+        if (isFinal && data.conclusion) {
+            aiSummary.overview += ' ' + data.conclusion;
+        }
+        displaySummary();
+    }
+
     function displaySummary() {
         if (!summaryContent || !aiSummary) return;
         